@@ -1,36 +1,56 @@
 # region Chapter 1: Imports
 
 import streamlit as st
-import yaml
-from yaml.loader import SafeLoader
-from PIL import Image
-import streamlit_authenticator as stauth
 import time
-from streamlit_lottie import st_lottie
-import plotly.graph_objects as go
-from datetime import datetime
-import pandas as pd
 
 # Custom Modules
 from conference_app import config as cfg
 
 from conference_app.functions import (
     init_db,
+    get_engine,
+    send_email,
+    get_smtp_pool,
     get_bookings,
+    normalize_bookings,
+    bookings_table,
+    get_bookings_version,
+    BookingsUnavailableError,
     booking_form,
     render_header_bar,
-    build_vertical_day_time_timeline,  # using cached version from below
-    build_timeline_figure_cached,
+    add_today_marker,
     st_red_alert,
     load_lottiefile,
+    load_page_icon,
     get_random_quote,
+    render_cache_admin,
+    render_timing_admin,
+    render_query_admin,
+    render_memory_admin,
+    start_rerun_trace,
+    finish_rerun_trace,
+    build_bookings_bundle,
+    get_authenticator,
 )
+from conference_app.outbox import EmailOutboxWorker
+from conference_app.telemetry import QUERIES, TELEMETRY, timed
+from conference_app.cache import (
+    BookingsCache,
+    BookingsSnapshot,
+    register_cache,
+    clear_caches,
+)
+
+# Per-rerun spans, queries and (on request) a tracemalloc trace; no-op unless enabled
+TELEMETRY.start_rerun()
+QUERIES.start_rerun()
+start_rerun_trace()
 
 # endregion
 
 # region Chapter 2: Page Layout
 
-icon = Image.open("assets/logo.ico")
+icon = load_page_icon("assets/logo.ico")
 
 st.set_page_config(
     page_title="Booking App",
@@ -51,15 +71,7 @@ st.set_page_config(
 UserAuth = False
 
 if UserAuth:
-    with open(".streamlit/cred.yaml") as file:
-        auth_config = yaml.load(file, Loader=SafeLoader)
-
-    authenticator = stauth.Authenticate(
-        auth_config["credentials"],
-        auth_config["cookie"]["name"],
-        auth_config["cookie"]["key"],
-        auth_config["cookie"]["expiry_days"],
-    )
+    authenticator = get_authenticator(".streamlit/cred.yaml")
 
     authenticator.login(location="sidebar")
 
@@ -92,68 +104,111 @@ render_header_bar(
 
 
 # region Chapter 5: Load the MySQL Database
-init_db()
 
 
-@st.cache_data(ttl=1 * 24 * 60 * 60)  # 1 day
+@st.cache_resource
+def ensure_db(page_id: str = "conference"):
+    """Creates the table/index once per process, on the first DB load (not on every rerun)."""
+    _ = page_id  # intentionally keep param to make cache key unique
+    try:
+        init_db()
+    except Exception as e:
+        raise BookingsUnavailableError(f"init_db: {e}") from e
+    return True
+
+
+@timed("load_bookings")
 def load_bookings(page_id: str = "conference"):
-    """Load bookings without timezone conversion for caching compatibility"""
     _ = page_id  # intentionally keep param to make cache key unique
-    df = get_bookings()
-
-    # Remove timezone info before caching to avoid pickle issues
-    if "created_at" in df.columns and not df["created_at"].isna().all():
-        try:
-            # Convert created_at to plain string BEFORE caching
-            # This avoids datetime64[ns] pickle issues across pandas versions
-            df["created_at"] = pd.to_datetime(
-                df["created_at"], errors="coerce"
-            ).dt.strftime("%Y-%m-%d %H:%M:%S")
-        except Exception as e:
-            print(f"load_bookings: created_at conversion error: {e}")
-            df["created_at"] = df["created_at"].astype(str)
-
-    # Also ensure booking_date is stored as plain string for cache safety
-    if "booking_date" in df.columns:
-        try:
-            df["booking_date"] = pd.to_datetime(
-                df["booking_date"], errors="coerce"
-            ).dt.strftime("%Y-%m-%d")
-        except Exception as e:
-            print(f"load_bookings: booking_date conversion error: {e}")
-            df["booking_date"] = df["booking_date"].astype(str)
-
-    return df
-
-
-def prepare_bookings_display(df):
-    """Add IST timezone conversion for display after loading from cache"""
-    if df.empty:
-        return df
-
-    df = df.copy()
-
-    # Now add IST conversion for display
-    if "created_at" in df.columns and not df["created_at"].isna().all():
-        try:
-            # Treat cached datetime as UTC and convert to IST
-            df["created_at_ist"] = (
-                pd.to_datetime(df["created_at"])
-                .dt.tz_localize("UTC")
-                .dt.tz_convert("Asia/Kolkata")
-                .dt.tz_localize(None)
-                .dt.strftime("%Y-%m-%d %H:%M:%S")
-            )
-        except Exception as e:
-            print(f"Error converting to IST: {e}")
-            df["created_at_ist"] = df["created_at"]
-
-    return df
+    ensure_db(page_id)
+    return get_bookings(raise_errors=True)
+
+
+def load_bookings_bundle(df=None, loaded_at=None):
+    """Bookings frame + timeline figure dict, (re)built together by the bookings cache."""
+    if df is None:
+        df = load_bookings("conference")
+    return build_bookings_bundle(df, loaded_at)
+
+
+def snapshot_bundle(snapshot: BookingsSnapshot):
+    """Warm start: the bundle rebuilt from the on-disk snapshot, with the DB version it was taken at."""
+    loaded = snapshot.load()
+    if loaded is None:
+        return None
+    df, meta = loaded
+    # Parquet keeps the typed columns; normalizing also upgrades snapshots saved with string columns
+    df = normalize_bookings(df)
+    return load_bookings_bundle(df, meta.get("saved_at")), meta.get("version")
+
+
+@st.cache_resource
+def bookings_cache(page_id: str = "conference"):
+    """Stale-while-revalidate: reruns get the cached bundle, refreshes happen in the background."""
+    _ = page_id  # intentionally keep param to make cache key unique
+    snapshot = BookingsSnapshot(cfg.BOOKINGS_SNAPSHOT_PATH)
+    return register_cache(
+        f"bookings:{page_id}",
+        BookingsCache(
+            load_bookings_bundle,
+            version_probe=get_bookings_version,
+            soft_ttl=cfg.BOOKINGS_SOFT_TTL,
+            check_interval=cfg.BOOKINGS_VERSION_CHECK_INTERVAL,
+            error_ttl=cfg.BOOKINGS_ERROR_TTL,
+            namespace=f"bookings:{page_id}",
+            warm_start=lambda: snapshot_bundle(snapshot),
+            persist=lambda bundle, version: snapshot.save(bundle["df"], version),
+        ),
+    )
+
+
+@st.cache_resource
+def email_worker(page_id: str = "conference"):
+    """Background delivery of queued confirmation emails (one worker per process)."""
+    _ = page_id  # intentionally keep param to make cache key unique
+    return EmailOutboxWorker(
+        get_engine,
+        lambda to_email, subject, body, cc: send_email(
+            to_email, subject, body, raise_errors=True, cc=cc
+        ),
+        source=page_id,
+        poll_interval=cfg.OUTBOX_POLL_INTERVAL,
+        batch_size=cfg.OUTBOX_BATCH_SIZE,
+        max_attempts=cfg.OUTBOX_MAX_ATTEMPTS,
+        backoff_base=cfg.OUTBOX_BACKOFF_BASE,
+        backoff_max=cfg.OUTBOX_BACKOFF_MAX,
+    ).start()
+
+
+def after_booking():
+    """
+    Reloads bookings on a background thread (the submit never waits on a rebuild; the new booking shows
+    once it lands) and sends its confirmation without waiting for the next poll.
+    """
+    bookings_cache("conference").refresh(force=True)
+    email_worker("conference").wake()
 
 
 with st.spinner("Loading bookings…"):
-    df = load_bookings("conference")
-    df = prepare_bookings_display(df)
+    try:
+        bookings = bookings_cache("conference").get()  # shared: treat as read-only
+    except BookingsUnavailableError as e:
+        print("load bookings error:", e)
+        st_red_alert(
+            "Booking database is unreachable and no saved snapshot exists yet."
+        )
+        st.stop()
+    df = bookings["df"]
+
+email_worker(
+    "conference"
+)  # started once per process; drains queued confirmation emails
+
+db_offline = bookings_cache("conference").degraded
+if db_offline:
+    st.warning(
+        f"⚠️ Booking database is unreachable: showing bookings saved at {bookings['loaded_at']} (read-only)."
+    )
 
 # endregion
 
@@ -166,38 +221,12 @@ with left_col:
     with st.container(border=True):
         st.write("📊 Current Bookings Timeline (Date & Time)")
 
-        df_json = df.to_json(date_format="iso", orient="split")
-        nrows = len(df)
-        max_created = None
-        if "created_at" in df.columns and not df["created_at"].isna().all():
-            # using string because datetimes are not stable cache keys otherwise
-            max_created = str(df["created_at"].max())
-
-        fig, info = build_timeline_figure_cached(nrows, max_created, df_json)
+        # Figure dict is prebuilt with the bookings (no build in the request path)
+        fig, info = bookings["fig"], bookings["info"]
 
         if fig is not None:
-            # creates a fresh display copy so cached figure object is left intact
-            fig_display = go.Figure(fig)
-
-            # Adds a live "Today" marker
-            now_dt = datetime.now()
-            today = now_dt.date()
-            fig_display.add_vline(
-                x=today,
-                line_width=1,
-                line_dash=cfg.LINE_STYLE,
-                line_color=cfg.LINE_COLOR,
-            )
-            fig_display.add_annotation(
-                x=today,
-                y=1,
-                xref="x",
-                yref="paper",
-                text="Today",
-                showarrow=False,
-                font=dict(color=cfg.LINE_COLOR),
-                yanchor="bottom",
-            )
+            # Adds a live "Today" marker on a shallow copy, so the cached figure dict is left intact
+            fig_display = add_today_marker(fig)
 
             st.plotly_chart(fig_display, use_container_width=True)
         else:
@@ -223,25 +252,7 @@ with left_col:
     st.subheader("📌 All Existing Bookings")
 
     if not df.empty:
-        st.dataframe(
-            df[
-                [
-                    "booking_date",
-                    "start_time",
-                    "end_time",
-                    "conference_type",
-                    "person_name",
-                    "company_name",
-                    "affiliation",
-                    "email",
-                    "booking_description",
-                    "created_at_ist",
-                ]
-            ]
-            .sort_values(by=["booking_date", "start_time"])
-            .reset_index(drop=True),
-            height=cfg.TABLE_HEIGHT,
-        )
+        st.dataframe(bookings_table(df), height=cfg.TABLE_HEIGHT)
     else:
         st.info("No bookings to show in the table yet.")
 
@@ -266,6 +277,8 @@ with left_col:
 
         # Lottie Animation
         with st.container(border=False):
+            from streamlit_lottie import st_lottie
+
             lottie_animation = load_lottiefile("assets/conference_lottie.json")
             if lottie_animation:
                 st_lottie(lottie_animation, speed=1, height=220, key="conference")
@@ -273,7 +286,10 @@ with left_col:
 # Right Column: Booking Form
 with right_col:
 
-    booking_form()
+    booking_form(
+        on_booked=after_booking,
+        read_only=db_offline,
+    )
     if "_flash" in st.session_state:
         st.success(st.session_state.pop("_flash"))
 
@@ -282,9 +298,20 @@ with right_col:
 
 # region Chapter 7: Clear Cache
 
+render_cache_admin()
+render_timing_admin()
+render_query_admin()
+render_memory_admin(bookings["df"])
+
 if st.button("🔄 Clear Cache"):
+    clear_caches()
     st.cache_data.clear()
-    st.cache_resource.clear()
+    # Not st.cache_resource.clear(): that also drops the outbox worker and SMTP pool (of both pages),
+    # orphaning a running worker thread while the next rerun starts a second one on the same outbox
+    bookings_cache.clear()
+    ensure_db.clear()
+    get_engine.clear()
+    get_smtp_pool().close_all()  # idle SMTP sessions reopen on demand
     st.success("All caches cleared. Refreshing the page...")
     time.sleep(3)
     st.rerun()
@@ -303,3 +330,12 @@ if quote_data:
     )
 
 # endregion
+
+
+# region Chapter 9: Rerun timings
+
+st.session_state["_rerun_spans"] = TELEMETRY.end_rerun("conference")
+st.session_state["_rerun_queries"] = QUERIES.end_rerun()
+finish_rerun_trace()
+
+# endregion
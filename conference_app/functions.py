@@ -1,29 +1,67 @@
 # region Chapter 1: Imports
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import base64
-import plotly.graph_objects as go
 import tempfile, os
 import re
 import smtplib
 import datetime as _dt
-import json
-import requests
+import copy
+import threading
+import tracemalloc
 
-from io import StringIO
+# plotly.graph_objects, requests and PIL are imported where used (see import_bench.py)
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta, date, time as dtime
 from pathlib import Path
 from email.mime.text import MIMEText
 from sqlalchemy import create_engine, text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, OperationalError, InterfaceError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 # Custom Modules
 from conference_app import config as cfg
+from conference_app.cache import (
+    bounded_cache,
+    cache_stats,
+    file_asset,
+    frame_columns,
+    memory_report,
+    top_allocations,
+)
+from conference_app.lottie_optimizer import load_optimized_lottie
+from conference_app.outbox import OUTBOX_TABLE_SQL, enqueue_email
+from conference_app.smtp_pool import SMTPPool
+from conference_app.telemetry import QUERIES, TELEMETRY, timed
 
 # endregion
 
 
 # region Chapter 2: Initialise MySQL connection
+# Hot-path timings and SQL profiling (shared by all sessions of this process; no-op unless enabled in secrets)
+TELEMETRY.configure(
+    cfg.TELEMETRY_ENABLED,
+    window=cfg.TELEMETRY_WINDOW,
+    jsonl_path=cfg.TELEMETRY_JSONL_PATH,
+    prom_path=cfg.TELEMETRY_PROM_PATH,
+    export_interval=cfg.TELEMETRY_EXPORT_INTERVAL,
+)
+QUERIES.configure(
+    cfg.QUERY_PROFILER_ENABLED,
+    slow_ms=cfg.SLOW_QUERY_MS,
+    max_rows=cfg.SLOW_QUERY_ROWS,
+    log_path=cfg.SLOW_QUERY_LOG_PATH,
+)
+
+
 @st.cache_resource
 def get_engine():
     user = st.secrets.get("mysql_user")
@@ -46,14 +84,81 @@ def get_engine():
     else:
         ssl_args = {}
 
+    # Timeout budgets: client-side socket timeouts (PyMySQL) + a server-side lock-wait limit, so a slow
+    # or locked MySQL fails fast with OperationalError instead of hanging the script thread. The SELECT
+    # time limit is per statement (max_execution_hint), so bulk loads are not cut off by it.
+    timeouts = cfg.DB_TIMEOUTS
+    connect_args = {
+        **ssl_args,
+        "connect_timeout": timeouts["connect"],
+        "read_timeout": timeouts["read"],
+        "write_timeout": timeouts["write"],
+        "init_command": f"SET SESSION innodb_lock_wait_timeout={int(timeouts['lock_wait'])}",
+    }
+
     db_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{dbname}?charset=utf8mb4"
-    return create_engine(db_url, connect_args=ssl_args, pool_pre_ping=True)
+    engine = create_engine(
+        db_url,
+        connect_args=connect_args,
+        pool_pre_ping=True,
+        pool_timeout=timeouts["connect"],
+    )
+    return QUERIES.attach(engine)
+
+
+# Transient DB errors (lost/refused connection, server gone away, pool timeout) are retried
+# with jittered exponential backoff; anything else fails on the first attempt.
+TRANSIENT_DB_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError)
+
+db_retry = retry(
+    retry=retry_if_exception_type(TRANSIENT_DB_ERRORS),
+    stop=stop_after_attempt(cfg.DB_RETRY_ATTEMPTS),
+    wait=wait_random_exponential(multiplier=0.25, max=cfg.DB_RETRY_MAX_WAIT),
+    reraise=True,
+)
+
+
+class BookingLockTimeoutError(SQLAlchemyError):
+    """Another submit held the date's booking lock past lock_wait (not retried; the form asks to try again)."""
+
+
+def max_execution_hint() -> str:
+    """
+    Optimizer hint capping one interactive SELECT (the booking form's conflict check) at
+    DB_TIMEOUTS["max_execution_ms"]; goes right after SELECT. Other databases read it as a comment.
+    """
+    ms = int(cfg.DB_TIMEOUTS["max_execution_ms"])
+    return f"/*+ MAX_EXECUTION_TIME({ms}) */ " if ms else ""
+
+
+# MySQL/PyMySQL error codes for: lock wait timeout, lost connection (read timeout), max_execution_time hit
+DB_TIMEOUT_CODES = {1205, 2013, 3024}
+
+
+def is_db_timeout(e) -> bool:
+    orig = getattr(e, "orig", None)
+    code = orig.args[0] if orig is not None and orig.args else None
+    return (
+        code in DB_TIMEOUT_CODES
+        or isinstance(e, PoolTimeoutError)
+        or "timed out" in str(e).lower()
+    )
+
+
+def db_error_message(e) -> str:
+    """User-facing (degraded mode) message for a failed DB step in the booking form."""
+    if isinstance(e, BookingLockTimeoutError):
+        return "⏳ Another booking for this date is being saved. Your booking was not saved, please try again."
+    if is_db_timeout(e):
+        return "⏳ The booking database did not respond in time. Your booking was not saved, please try again."
+    return "⚠️ The booking database is unreachable. Your booking was not saved, please try again later."
 
 
 # endregion
 
 
 # region  Chapter 3: Initialise MySQL database
+@timed("init_db")
 def init_db():
     engine = get_engine()
     create_table_sql = """
@@ -71,18 +176,29 @@ def init_db():
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
     """
 
-    idx_sql = "CREATE INDEX idx_booking_date_conference_type ON conference_bookings (booking_date, conference_type);"
+    # (booking_date, id) serves the reminders' keyset pagination (WHERE booking_date = ? AND id > ? ORDER BY id)
+    indexes = {
+        "idx_booking_date_conference_type": "(booking_date, conference_type)",
+        "idx_booking_date_id": "(booking_date, id)",
+    }
     try:
         with engine.begin() as conn:
             conn.execute(text(create_table_sql))
-            # create index if missing
+            conn.execute(text(OUTBOX_TABLE_SQL))
+            # create indexes if missing
             schema = st.secrets.get("mysql_db") or engine.url.database
             idx_check = text(
-                "SELECT COUNT(*) FROM information_schema.statistics WHERE table_schema=:schema AND table_name='conference_bookings' AND index_name='idx_booking_date_conference_type'"
+                "SELECT COUNT(*) FROM information_schema.statistics WHERE table_schema=:schema AND table_name='conference_bookings' AND index_name=:name"
             )
-            cnt = int(conn.execute(idx_check, {"schema": schema}).scalar() or 0)
-            if cnt == 0:
-                conn.execute(text(idx_sql))
+            for name, columns in indexes.items():
+                cnt = int(
+                    conn.execute(idx_check, {"schema": schema, "name": name}).scalar()
+                    or 0
+                )
+                if cnt == 0:
+                    conn.execute(
+                        text(f"CREATE INDEX {name} ON conference_bookings {columns};")
+                    )
     except SQLAlchemyError as e:
         print("init_db error:", e)
         raise
@@ -92,6 +208,7 @@ def init_db():
 
 
 # region Chapter 4: Add Booking function
+@timed("add_booking")
 def add_booking(
     booking_date: date,
     start_time: dtime,
@@ -102,9 +219,14 @@ def add_booking(
     affiliation: str,
     email: str,
     booking_description: str = "",
+    confirmation=None,
+    conn=None,
 ):
     """
     Inserts python date/time objects directly - SQLAlchemy will bind them to DATE/TIME.
+    - confirmation: optional (subject, body) queued in email_outbox in the same transaction.
+    - conn: run on this connection inside the caller's transaction (booking_lock commits it); otherwise in
+      a transaction of its own.
     """
     engine = get_engine()
     insert_sql = text(
@@ -126,8 +248,12 @@ def add_booking(
         "booking_description": booking_description,
     }
     try:
-        with engine.begin() as conn:
+        with nullcontext(conn) if conn is not None else engine.begin() as conn:
             conn.execute(insert_sql, params)
+            if confirmation is not None:
+                subject, body = confirmation
+                cc = cfg.CC_EMAILS if cfg.CC_EACH_CONFIRMATION else None
+                enqueue_email(conn, "conference", email, subject, body, cc=cc)
     except SQLAlchemyError as e:
         print("add_booking error:", e)
         raise
@@ -137,10 +263,32 @@ def add_booking(
 
 
 # region Chapter 5: Get Bookings function
-def get_bookings() -> pd.DataFrame:
+class BookingsUnavailableError(RuntimeError):
+    """Bookings could not be read from the DB (after retries); callers keep their last good frame."""
+
+
+@db_retry
+def read_sql_with_retry(sql, engine) -> pd.DataFrame:
+    """
+    Query rows straight into Arrow arrays: pyarrow infers date/duration/timestamp/string columns from the
+    DB-API values, and the frame wraps those arrays (no object columns or pandas type inference in between).
+    """
+    with engine.connect() as conn:
+        result = conn.execute(text(sql))
+        names = list(result.keys())
+        rows = result.fetchall()
+    columns = zip(*rows) if rows else [[] for _ in names]
+    table = pa.table([pa.array(column) for column in columns], names=names)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+@timed("get_bookings")
+def get_bookings(raise_errors: bool = False) -> pd.DataFrame:
     """
     Returns a dataframe of bookings. Assumes rows were inserted from the controlled streamlit form (date/time objects).
-    Note: created_at timezone conversion is handled in the app layer for caching compatibility.
+    - Transient DB errors are retried (db_retry).
+    - raise_errors=True raises BookingsUnavailableError instead of returning an empty frame (so cached/snapshot data is kept).
+    - The frame is typed and Arrow-backed (normalize_bookings); created_at is UTC and shown in IST by bookings_table.
     """
     engine = get_engine()
     sql = """
@@ -150,10 +298,12 @@ def get_bookings() -> pd.DataFrame:
         ORDER BY booking_date ASC, start_time ASC, id ASC
     """
     try:
-        df = pd.read_sql_query(sql, con=engine)
+        df = read_sql_with_retry(sql, engine)
     except Exception as e:
         print("get_bookings() sql error:", e)
-        return pd.DataFrame(
+        if raise_errors:
+            raise BookingsUnavailableError(f"get_bookings: {e}") from e
+        empty = pd.DataFrame(
             columns=[
                 "id",
                 "booking_date",
@@ -168,7 +318,88 @@ def get_bookings() -> pd.DataFrame:
                 "created_at",
             ]
         )
+        return normalize_bookings(empty)
+
+    return normalize_bookings(df)
+
+
+# Typed, Arrow-backed bookings frame (normalize_bookings): every column is a pyarrow array, so the cache,
+# the Parquet snapshot and st.dataframe take it without conversion. Repeated text is dictionary-encoded,
+# times are time32[s], dates date32 and created_at a UTC timestamp.
+CATEGORY_COLUMNS = ["conference_type", "company_name", "affiliation"]
+TEXT_COLUMNS = ["person_name", "email", "booking_description"]
+DATE_COLUMNS = ["booking_date"]
+TIME_COLUMNS = ["start_time", "end_time"]
+
+ID_DTYPE = pd.ArrowDtype(pa.int64())
+CATEGORY_DTYPE = pd.ArrowDtype(pa.dictionary(pa.int32(), pa.string()))
+TEXT_DTYPE = pd.ArrowDtype(pa.string())
+DATE_DTYPE = pd.ArrowDtype(pa.date32())
+TIME_DTYPE = pd.ArrowDtype(pa.time32("s"))
+TIMESTAMP_DTYPE = pd.ArrowDtype(pa.timestamp("us", tz="UTC"))
+
+
+def to_times(values: pd.Series) -> pd.Series:
+    """
+    Times -> Arrow time32[s] (null when unparsable).
+    Accepts Arrow times/durations (PyMySQL TIME), timedeltas, datetime.time, 'HH:MM[:SS]' / '0 days HH:MM:SS'
+    strings or seconds since midnight.
+    """
+    arrow_type = getattr(values.dtype, "pyarrow_dtype", None)
+    if arrow_type is not None and pa.types.is_time(arrow_type):
+        return values.astype(TIME_DTYPE)
+    if arrow_type is not None and pa.types.is_duration(arrow_type):
+        seconds = values.dt.total_seconds()
+    elif pd.api.types.is_numeric_dtype(values):
+        seconds = values
+    elif pd.api.types.is_timedelta64_dtype(values):
+        seconds = values.dt.total_seconds()
+    else:
+        # Parse each distinct string once: bookings repeat a few dozen slot times
+        codes, uniques = pd.factorize(values)
+        s = (
+            pd.Series(uniques, dtype="string")
+            .str.strip()
+            .str.replace(".", ":", regex=False)
+        )
+        s = s.where(s.str.count(":") != 1, s + ":00")
+        parsed = pd.to_timedelta(s, errors="coerce").dt.total_seconds()
+        seconds = parsed.reindex(codes).set_axis(values.index)
+    return seconds.round().astype(pd.ArrowDtype(pa.int32())).astype(TIME_DTYPE)
+
+
+def to_dates(values: pd.Series) -> pd.Series:
+    """Dates -> Arrow date32 (null when unparsable)."""
+    try:
+        # date objects, timestamps and 'YYYY-MM-DD' strings cast directly
+        return values.astype(DATE_DTYPE)
+    except (TypeError, ValueError, pa.ArrowException):
+        return pd.to_datetime(values, errors="coerce").dt.normalize().astype(DATE_DTYPE)
+
 
+def to_categories(values: pd.Series) -> pd.Series:
+    """Text -> dictionary-encoded Arrow strings (int32 indices)."""
+    arrow_type = getattr(values.dtype, "pyarrow_dtype", None)
+    if arrow_type is not None and arrow_type != pa.string():
+        # pandas' astype treats dictionary dtypes as equal whatever their index/value types: decode first
+        values = values.astype(TEXT_DTYPE)
+    return values.astype(CATEGORY_DTYPE)
+
+
+def to_timestamps(values: pd.Series) -> pd.Series:
+    """Timestamps -> Arrow timestamp[us, UTC]; naive values are taken as UTC (null when unparsable)."""
+    arrow_type = getattr(values.dtype, "pyarrow_dtype", None)
+    if arrow_type is not None and pa.types.is_timestamp(arrow_type):
+        return values.astype(TIMESTAMP_DTYPE)
+    return pd.to_datetime(values, utc=True, errors="coerce").astype(TIMESTAMP_DTYPE)
+
+
+def normalize_bookings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Post-processing of the raw bookings query (get_bookings), kept DB-free so it can be benchmarked:
+    missing columns are added and every column becomes Arrow-backed (see CATEGORY_COLUMNS / TEXT_COLUMNS /
+    DATE_COLUMNS / TIME_COLUMNS). Idempotent, so typed frames and older snapshots both come out the same.
+    """
     expected_cols = [
         "id",
         "booking_date",
@@ -186,57 +417,77 @@ def get_bookings() -> pd.DataFrame:
         if c not in df.columns:
             df[c] = None
 
-    # Converts start_time/end_time to strings 'HH:MM:SS' for consistent downstream use (plotting & tooltip)
-    def to_hhmmss(v):
-        # use module alias _dt (imported at top) to access timedelta safely
-        if pd.isna(v):
-            return None
-
-        # pandas Timedelta or datetime.timedelta (use _dt.timedelta)
-        if isinstance(v, (pd.Timedelta, _dt.timedelta)):
-            total_seconds = int(pd.Timedelta(v).total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
-        # datetime.time or datetime.datetime
-        if hasattr(v, "strftime") and not isinstance(v, str):
-            return v.strftime("%H:%M:%S")
-
-        s = str(v).strip()
-        s = s.replace(".", ":")
-        # If format like '0 days HH:MM:SS', takes last token
-        if "days" in s:
-            parts = s.split()
-            s = parts[-1]
-
-        parts = s.split(":")
-        if len(parts) == 2:
-            return f"{int(parts[0]):02d}:{int(parts[1]):02d}:00"
-
-        # Fallback: tries parsing with pandas datetime
-        try:
-            t = pd.to_datetime(s, errors="coerce")
-            if not pd.isna(t):
-                return t.strftime("%H:%M:%S")
-        except Exception:
-            pass
+    df["id"] = df["id"].astype(ID_DTYPE)
+    for c in DATE_COLUMNS:
+        df[c] = to_dates(df[c])
+    for c in TIME_COLUMNS:
+        df[c] = to_times(df[c])
+    # Stored in UTC; shown in IST by bookings_table
+    df["created_at"] = to_timestamps(df["created_at"])
+    for c in CATEGORY_COLUMNS:
+        df[c] = to_categories(df[c])
+    for c in TEXT_COLUMNS:
+        df[c] = df[c].astype(TEXT_DTYPE)
+    return df
 
-        return s
 
-    df["start_time"] = df["start_time"].apply(to_hhmmss)
-    df["end_time"] = df["end_time"].apply(to_hhmmss)
-    return df
+TABLE_COLUMNS = [
+    "booking_date",
+    "start_time",
+    "end_time",
+    "conference_type",
+    "person_name",
+    "company_name",
+    "affiliation",
+    "email",
+    "booking_description",
+    "created_at_ist",
+]
+
+
+def bookings_table(df: pd.DataFrame, columns=None) -> pa.Table:
+    """
+    The "All Existing Bookings" table: display columns, sorted by date and start time.
+    - A pyarrow Table taken from the Arrow-backed frame without copying columns; st.dataframe serializes it
+      as is (dates and times display natively, no strings are made).
+    - created_at_ist is derived here from the UTC created_at.
+    """
+    columns = columns or TABLE_COLUMNS
+    source = ["created_at" if c == "created_at_ist" else c for c in columns]
+    source = list(dict.fromkeys(source + ["booking_date", "start_time"]))
+    table = pa.Table.from_pandas(df[source], preserve_index=False).sort_by(
+        [("booking_date", "ascending"), ("start_time", "ascending")]
+    )
+    # No index to describe, and pandas can't parse back its metadata for dictionary columns
+    table = table.replace_schema_metadata(None)
+    if "created_at_ist" in columns:
+        ist = table["created_at"].cast(pa.timestamp("us", tz="Asia/Kolkata"))
+        table = table.append_column("created_at_ist", pc.local_timestamp(ist))
+    return table.select(columns)
+
+
+@db_retry
+def get_bookings_version():
+    """
+    Cheap data-version probe (row count, max id, max created_at) used to decide when cached bookings are outdated.
+    Note: in-place UPDATEs don't change it; the soft TTL covers those.
+    """
+    engine = get_engine()
+    sql = text("SELECT COUNT(*), MAX(id), MAX(created_at) FROM conference_bookings")
+    with engine.connect() as conn:
+        row = conn.execute(sql).one()
+    return tuple(str(v) for v in row)
 
 
 # endregion
 
 
 # region Chapter 6: Check Conflict function
-def check_conflict(booking_date, start_time, end_time, conference_type):
+@timed("check_conflict")
+def check_conflict(booking_date, start_time, end_time, conference_type, conn=None):
     """
     Combines date + time to datetimes and check overlaps for same date & conference_type.
+    - conn: run on this connection (booking_lock's) instead of checking one out.
     Returns (bool_conflict, details_or_None)
     """
     engine = get_engine()
@@ -249,14 +500,14 @@ def check_conflict(booking_date, start_time, end_time, conference_type):
         return True, "End time must be after start time."
 
     sql = text(
-        """
-        SELECT booking_date, start_time, end_time, conference_type, person_name, company_name
+        f"""
+        SELECT {max_execution_hint()}booking_date, start_time, end_time, conference_type, person_name, company_name
         FROM conference_bookings
         WHERE booking_date = :bdate AND conference_type = :ctype
     """
     )
     try:
-        with engine.connect() as conn:
+        with nullcontext(conn) if conn is not None else engine.connect() as conn:
             rows = (
                 conn.execute(sql, {"bdate": booking_date, "ctype": conference_type})
                 .mappings()
@@ -264,7 +515,7 @@ def check_conflict(booking_date, start_time, end_time, conference_type):
             )
     except Exception as e:
         print("check_conflict DB error:", e)
-        return False, None
+        raise  # fail closed: booking_form reports the DB error instead of skipping the check
 
     for r in rows:
         db_start = r.get("start_time")
@@ -326,45 +577,53 @@ def check_conflict(booking_date, start_time, end_time, conference_type):
     return False, None
 
 
-# endregion
+# Serialises check_conflict + add_booking per booking date, so sessions submitting the same free slot
+# at once can't both pass the check (found by load_test.py): a striped thread lock (hash of the date, a fixed
+# set) for the sessions of this process, plus a MySQL named lock (GET_LOCK) for other app processes on the
+# same database. The named lock, the conflict SELECT and the INSERT share one pooled connection, and the
+# insert is committed before the named lock is released. load_test.py runs on SQLite, so the GET_LOCK
+# branch is only exercised against MySQL.
+BOOKING_LOCK_STRIPES = 64
+_booking_locks = [threading.Lock() for _ in range(BOOKING_LOCK_STRIPES)]
 
 
-# region Chapter 7: Fractional Hours functions
-def to_fractional_hours(val):
-    """Convert time value (string or datetime.time) into fractional hours (float)."""
-    if val is None or (isinstance(val, float) and pd.isna(val)):
-        return None
+@contextmanager
+def booking_lock(booking_date):
+    """Yields the connection to run check_conflict + add_booking on; commits when the block exits cleanly."""
+    key = f"conference_bookings:{booking_date}"
+    with _booking_locks[hash(key) % BOOKING_LOCK_STRIPES]:
+        engine = get_engine()
+        named = engine.dialect.name == "mysql"
+        with engine.connect() as conn:
+            if named:
+                acquired = conn.execute(
+                    text("SELECT GET_LOCK(:key, :timeout)"),
+                    {"key": key, "timeout": cfg.DB_TIMEOUTS["lock_wait"]},
+                ).scalar()
+                if acquired != 1:
+                    raise BookingLockTimeoutError(f"booking lock {key} timed out")
+                conn.commit()  # the check's snapshot (REPEATABLE READ) starts after the lock is held
+            try:
+                yield conn
+                conn.commit()
+            finally:
+                if named:
+                    try:
+                        conn.rollback()  # no-op after the commit; ends a failed transaction first
+                        conn.execute(text("SELECT RELEASE_LOCK(:key)"), {"key": key})
+                        conn.commit()
+                    except SQLAlchemyError as e:
+                        # a dropped session releases its named locks on the server
+                        print("booking_lock release error:", e)
 
-    # pandas Timedelta or datetime.timedelta
-    if isinstance(val, (pd.Timedelta, _dt.timedelta)):
-        total_seconds = int(pd.Timedelta(val).total_seconds())
-        return total_seconds / 3600.0
 
-    # datetime.time or datetime.datetime (has hour attribute)
-    if hasattr(val, "hour") and not isinstance(val, str):
-        try:
-            h = int(val.hour)
-            m = int(getattr(val, "minute", 0))
-            s = int(getattr(val, "second", 0))
-            return h + m / 60.0 + s / 3600.0
-        except Exception:
-            pass
+# endregion
 
-    try:
-        s = str(val)
-        # handle '0 days HH:MM:SS'
-        if "days" in s:
-            s = s.split()[-1]
-        t = pd.to_datetime(s, format="%H:%M:%S", errors="coerce")
-        if pd.isna(t):
-            t = pd.to_datetime(s, format="%H:%M", errors="coerce")
-        if pd.isna(t):
-            t = pd.to_datetime(s, errors="coerce")
-            if pd.isna(t):
-                return None
-        return float(t.hour + t.minute / 60.0 + t.second / 3600.0)
-    except Exception:
-        return None
+
+# region Chapter 7: Fractional Hours functions
+def fractional_hours(times: pd.Series) -> pd.Series:
+    """Arrow time32[s] times (normalize_bookings) -> float64 fractional hours; nulls become NaN."""
+    return times.astype(pd.ArrowDtype(pa.int32())).astype("float64") / 3600.0
 
 
 # endregion
@@ -394,8 +653,60 @@ def st_red_alert(msg: str):
 
 
 # region Chapter 9: Booking Form function
-def booking_form():
+def submit_booking(
+    booking_date,
+    start_time,
+    end_time,
+    conference_type,
+    person_name,
+    company_name,
+    affiliation,
+    email,
+    booking_description="",
+    confirmation=None,
+    on_booked=None,
+):
+    """
+    The booking form's submit path once the input is valid.
+    - Conflict check + insert run under the date's booking lock, so concurrent submits can't both take a free slot.
+    - confirmation=(subject, body) is queued in email_outbox with the booking; on_booked runs after a booking is saved.
+    - Returns (conflict, details); DB errors propagate (SQLAlchemyError).
+    """
+    with booking_lock(booking_date) as conn:
+        conflict, details = check_conflict(
+            booking_date, start_time, end_time, conference_type, conn=conn
+        )
+        if not conflict:
+            add_booking(
+                booking_date,
+                start_time,
+                end_time,
+                conference_type,
+                person_name,
+                company_name,
+                affiliation,
+                email,
+                booking_description,
+                confirmation=confirmation,
+                conn=conn,
+            )
+    if not conflict and on_booked is not None:
+        on_booked()
+    return conflict, details
+
+
+def booking_form(on_booked=None, read_only=False):
+    """
+    - on_booked: optional callback run after a booking is saved (e.g. to refresh cached bookings).
+    - read_only: the database is unreachable; shows a notice instead of the form.
+    """
     st.subheader(":red[**👉 Book Conference Room**]")
+    if read_only:
+        st.info(
+            "New bookings are paused while the booking database is unreachable. Please try again later."
+        )
+        return
+
     with st.form("booking_form"):
         booking_date = st.date_input("Booking Date (YYYY-MM-DD)*")
         start_time = st.time_input("Start Time (24hrs Format)*")
@@ -467,13 +778,24 @@ def booking_form():
                 # Clean booking_description: strip multiple whitespaces
                 cleaned_description = " ".join(booking_description.split()).strip()
 
-                conflict, details = check_conflict(
-                    booking_date, start_time, end_time, conference_type
+                subject = f"Booking confirmation for {conference_type} Conference Room on {booking_date}"
+                body = (
+                    f"Hello {person_name},\n\n"
+                    f"Your booking for {conference_type} conference room has been confirmed.\n\n"
+                    f"Date: {booking_date} (YYYY/MM/DD)\n"
+                    f"From: {start_time}\n"
+                    f"To: {end_time}\n"
+                    f"Company: {company_name}\n"
+                    f"Affiliation: {affiliation}\n"
+                    f"Description: {cleaned_description if cleaned_description else 'N/A'}\n\n"
+                    ""
+                    "Thank you!"
+                    f"\n\nPrimary Contact: {cfg.PRIMARY_CONTACT}\n"
+                    f"Secondary Contact: {cfg.SECONDARY_CONTACT}\n"
                 )
-                if conflict:
-                    st_red_alert(f"❌ Time conflict! {details}")
-                else:
-                    add_booking(
+
+                try:
+                    conflict, details = submit_booking(
                         booking_date,
                         start_time,
                         end_time,
@@ -483,51 +805,47 @@ def booking_form():
                         affiliation,
                         email,
                         cleaned_description,
+                        confirmation=(subject, body),
+                        on_booked=on_booked,
                     )
+                except SQLAlchemyError as e:
+                    st_red_alert(db_error_message(e))
+                    return
+                if conflict:
+                    st_red_alert(f"❌ Time conflict! {details}")
+                    return
 
-                    subject = f"Booking confirmation for {conference_type} Conference Room on {booking_date}"
-                    body = (
-                        f"Hello {person_name},\n\n"
-                        f"Your booking for {conference_type} conference room has been confirmed.\n\n"
-                        f"Date: {booking_date} (YYYY/MM/DD)\n"
-                        f"From: {start_time}\n"
-                        f"To: {end_time}\n"
-                        f"Company: {company_name}\n"
-                        f"Affiliation: {affiliation}\n"
-                        f"Description: {cleaned_description if cleaned_description else 'N/A'}\n\n"
-                        ""
-                        "Thank you!"
-                        f"\n\nPrimary Contact: {cfg.PRIMARY_CONTACT}\n"
-                        f"Secondary Contact: {cfg.SECONDARY_CONTACT}\n"
-                    )
-
-                    with st.spinner("Sending confirmation email..."):
-                        # uses send_email unction defined at last
-                        email_ok = send_email(email, subject, body)
-
-                    if not email_ok:
-                        st.warning(
-                            "Booking saved, but confirmation email could not be sent."
-                        )
-                    else:
-                        st.success("Confirmation email sent.")
-                    st.session_state["_flash"] = "✅ Booking successfull, check email!"
-                    st.cache_data.clear()
-                    st.rerun()
+                st.session_state["_flash"] = "✅ Booking successfull, check email!"
+                st.rerun()
 
 
 # endregion
 
 
 # region Chapter 10: Header Bar function
+@file_asset
+def logo_data_uri(path: str) -> str:
+    """Logo file -> base64 data-URI for inline <img> tags (encoded once per file version)."""
+    b64 = base64.b64encode(Path(path).read_bytes()).decode()
+    return f"data:image/png;base64,{b64}"
+
+
+@file_asset
+def load_page_icon(path: str):
+    """Page icon for st.set_page_config, decoded once per file version (not on every rerun)."""
+    from PIL import Image
+
+    icon = Image.open(path)
+    icon.load()
+    return icon
+
+
 def render_header_bar(
     title: str, logo_path: str, logo_height: int = 50, bg_color: str = "#1E3A8A"
 ):
-    p = Path(logo_path)
     logo_html = ""
-    if p.exists():
-        b64 = base64.b64encode(p.read_bytes()).decode()
-        logo_html = f"<img src='data:image/png;base64,{b64}' height='{logo_height}'>"
+    if Path(logo_path).exists():
+        logo_html = f"<img src='{logo_data_uri(logo_path)}' height='{logo_height}'>"
 
     st.markdown(
         f"""
@@ -553,15 +871,30 @@ def render_header_bar(
 
 
 # region Chapter 11: Plotting function
+def to_epoch_ms(values: pd.Series):
+    """Datetime series -> float64 numpy array of epoch milliseconds (plotly date axes accept these)."""
+    if isinstance(values.dtype, pd.ArrowDtype):
+        # Arrow dates/timestamps: a cast, no per-value conversion
+        ms = values.astype(pd.ArrowDtype(pa.timestamp("ms")))
+        return ms.astype(pd.ArrowDtype(pa.int64())).to_numpy(dtype="float64")
+    return (
+        (pd.to_datetime(values) - pd.Timestamp("1970-01-01"))
+        / pd.Timedelta(milliseconds=1)
+    ).to_numpy(dtype="float64")
+
+
+@timed("build_vertical_day_time_timeline")
 def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
     """
-    Timeline builder. Expects get_bookings() style dataframe where start_time/end_time are strings 'HH:MM:SS'.
+    Timeline builder. Expects the Arrow-backed get_bookings() frame (normalize_bookings): date32 dates, time32 times.
 
     Features:
     - 4-week window from cfg.TIMELINE_START to cfg.TIMELINE_END (datetime at midnight)
     - one tick per day (dtick = 24h) aligned to start_window (tick0)
     - grouped bars (# offsetgroup + barmode='group') to avoid overlap
     """
+    import plotly.graph_objects as go
+
     if df is None or df.empty:
         return None, {"reason": "empty_df"}
 
@@ -580,10 +913,10 @@ def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
 
     df = df.copy()
 
-    # Convert booking_date to normalized datetime (midnight) and compute start/end in fractional hours
-    df["DateOnly"] = pd.to_datetime(df["booking_date"], errors="coerce").dt.normalize()
-    df["StartH"] = df["start_time"].apply(to_fractional_hours)
-    df["EndH"] = df["end_time"].apply(to_fractional_hours)
+    # booking_date is already a date; start/end in fractional hours
+    df["DateOnly"] = df["booking_date"]
+    df["StartH"] = fractional_hours(df["start_time"])
+    df["EndH"] = fractional_hours(df["end_time"])
 
     mask = df["DateOnly"].notna() & df["StartH"].notna() & df["EndH"].notna()
     df = df[mask]
@@ -628,72 +961,38 @@ def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
         "I-HUB 5th floor": "#43A047",
         "Mendeleev": "#FB8C00",
     }
-    seen_ctypes = set()
-
-    for _, row in dfw.iterrows():
-        ctype = str(row.get("conference_type") or "")
-        color = color_map.get(ctype, default_color)
-
-        show_legend = False
-        name = ""
-
-        if ctype not in seen_ctypes:
-            show_legend = True
-            name = ctype
-            seen_ctypes.add(ctype)
-
-        # Ensure hover shows only time strings (HH:MM:SS) — avoids Plotly coercing to full datetimes (which add today's date)
-        def _fmt_time_for_hover(v):
-            if pd.isna(v) or v is None:
-                return ""
-            s = str(v).strip()
-            # handle "0 days HH:MM:SS" style
-            if "days" in s:
-                s = s.split()[-1].strip()
-            # if already in H:M or H:M:S form produce H:M:S
-            try:
-                t = pd.to_datetime(s, format="%H:%M:%S", errors="coerce")
-                if pd.isna(t):
-                    t = pd.to_datetime(s, format="%H:%M", errors="coerce")
-                if pd.isna(t):
-                    t = pd.to_datetime(s, errors="coerce")
-                if not pd.isna(t):
-                    return t.strftime("%H:%M:%S")
-            except Exception:
-                pass
-            return s
-
-        start_disp = _fmt_time_for_hover(row.get("start_time"))
-        end_disp = _fmt_time_for_hover(row.get("end_time"))
-
-        # Get booking description
-        desc = row.get("booking_description", "")
-        if pd.isna(desc) or not desc:
-            desc = "N/A"
 
+    # Hover data prepared column-wise (no per-row loop)
+    desc = dfw.get("booking_description", pd.Series("", index=dfw.index))
+    dfw = dfw.assign(
+        _ctype=dfw["conference_type"].astype(object).fillna(""),
+        _x_ms=to_epoch_ms(dfw["DateOnly"]),
+        # 'HH:MM:SS' strings (Arrow cast): Plotly would turn times into full datetimes (adding today's date)
+        _start_disp=dfw["start_time"].astype(TEXT_DTYPE),
+        _end_disp=dfw["end_time"].astype(TEXT_DTYPE),
+        _desc=desc.where(desc.notna() & (desc.astype(str) != ""), "N/A"),
+    )
+    hover_cols = ["person_name", "company_name", "_start_disp", "_end_disp", "_desc"]
+
+    # One trace per conference type (in order of first appearance): colour, width and
+    # hovertemplate are sent once per type instead of once per bar, and numeric arrays
+    # are NumPy-backed so Plotly ships them as base64 typed arrays.
+    for ctype, subset in dfw.groupby("_ctype", sort=False):
         fig.add_bar(
-            x=[row["DateOnly"]],
-            y=[row["DurH"]],
-            base=[row["StartH"]],
-            marker_color=color,
-            width=[bar_width_ms],
-            name=name,
+            x=subset["_x_ms"].to_numpy(),
+            y=subset["DurH"].to_numpy(dtype="float64"),
+            base=subset["StartH"].to_numpy(dtype="float64"),
+            marker_color=color_map.get(ctype, default_color),
+            width=bar_width_ms,
+            name=ctype,
             offsetgroup=ctype,
             hovertemplate=(
                 "<b>%{customdata[0]}</b> (%{customdata[1]})<br>Date: %{x|%Y-%m-%d}<br>"
                 "From: %{customdata[2]}<br>To: %{customdata[3]}<br>"
                 "Description: %{customdata[4]}<extra></extra>"
             ),
-            customdata=[
-                [
-                    row.get("person_name"),
-                    row.get("company_name"),
-                    start_disp,
-                    end_disp,
-                    desc,
-                ]
-            ],
-            showlegend=show_legend,
+            customdata=subset[hover_cols].to_numpy(dtype=object),
+            showlegend=True,
         )
 
     # Y axis simple ticks (every 2 hours)
@@ -754,67 +1053,119 @@ def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
 
 # endregion
 
-# region Chapter 12: Cached wrapper to build the timeline figure
-
 
-@st.cache_data(ttl=1 * 24 * 60 * 60)  # 1 day
-def build_timeline_figure_cached(n_rows: int, max_created_at: str, df_json: str):
+# region Chapter 12: Cached timeline bundle and Today marker
+def add_today_marker(fig_dict: dict, today=None) -> dict:
     """
-    - n_rows and max_created_at are cheap cache keys (fingerprint).
-    - df_json: small JSON serialization of the dataframe (orient='split' recommended).
+    Returns a display copy of a cached figure dict with a live "Today" marker.
+    Only the layout and the trace dicts are shallow-copied (trace arrays are shared), so the cost does not
+    grow with bookings. Plotly pops and restores each trace's "type" while validating, so sessions rendering
+    the same cached trace dicts concurrently could see a type-less trace (found by load_test.py).
     """
-    try:
-        # convert_dates=False prevents pd.read_json from auto-converting
-        # ISO date strings with UTC offset, which was shifting booking_date by 1 day
-        df = pd.read_json(StringIO(df_json), orient="split", convert_dates=False)
+    day = str(today or datetime.now().date())
+    layout = dict(fig_dict.get("layout") or {})
+    layout["shapes"] = list(layout.get("shapes") or []) + [
+        {
+            "type": "line",
+            "x0": day,
+            "x1": day,
+            "xref": "x",
+            "y0": 0,
+            "y1": 1,
+            "yref": "y domain",
+            "line": {"width": 1, "dash": cfg.LINE_STYLE, "color": cfg.LINE_COLOR},
+        }
+    ]
+    layout["annotations"] = list(layout.get("annotations") or []) + [
+        {
+            "x": day,
+            "y": 1,
+            "xref": "x",
+            "yref": "paper",
+            "text": "Today",
+            "showarrow": False,
+            "font": {"color": cfg.LINE_COLOR},
+            "yanchor": "bottom",
+        }
+    ]
+    data = [dict(trace) for trace in fig_dict.get("data") or []]
+    return {**fig_dict, "data": data, "layout": layout}
+
+
+def build_bookings_bundle(df: pd.DataFrame, loaded_at=None) -> dict:
+    """What the bookings cache holds: the frame + timeline figure dict, built together once per data version."""
+    fig, info = build_vertical_day_time_timeline(df)
+    return {
+        "df": df,
+        "fig": fig.to_dict() if fig is not None else None,
+        "info": info,
+        "loaded_at": loaded_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
 
-        # Explicitly parse booking_date as date-only (no timezone involved)
-        if "booking_date" in df.columns:
-            df["booking_date"] = pd.to_datetime(
-                df["booking_date"], errors="coerce"
-            ).dt.date
 
-    except Exception as e:
-        # If reconstruction fails, pass None so plotting function can handle it
-        print("build_timeline_figure_cached: failed to read df_json:", e)
-        return None, {"reason": "invalid_df_json"}
+# endregion
+
 
-    # Calls the main plotting function
-    return build_vertical_day_time_timeline(df)
+# region Chapter 13: Send Email function
+def open_smtp_connection():
+    """New logged-in SMTP session: SSL on port 465, otherwise plain + STARTTLS (unless disabled, e.g. a local sink)."""
+    if cfg.SMTP_PORT == 465:
+        # Uses SSL for port 465
+        server = smtplib.SMTP_SSL(
+            cfg.SMTP_HOST, cfg.SMTP_PORT, timeout=cfg.SMTP_TIMEOUT
+        )
+    else:
+        # Default: connects plain + upgrade to TLS
+        server = smtplib.SMTP(cfg.SMTP_HOST, cfg.SMTP_PORT, timeout=cfg.SMTP_TIMEOUT)
+        if cfg.SMTP_STARTTLS:
+            server.starttls()
+    try:
+        if cfg.SMTP_USER and cfg.SMTP_PASS:
+            server.login(cfg.SMTP_USER, cfg.SMTP_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
 
 
-# endregion
+@st.cache_resource
+def get_smtp_pool():
+    """Process-wide pool of authenticated SMTP sessions (shared by the form and the outbox worker)."""
+    return SMTPPool(
+        open_smtp_connection,
+        max_size=cfg.SMTP_POOL_SIZE,
+        idle_timeout=cfg.SMTP_IDLE_TIMEOUT,
+        max_age=cfg.SMTP_MAX_AGE,
+    )
 
 
-# region Chapter 13: Send Email function
-def send_email(to_email, subject, body):
-    """Sends an email using SMTP settings from config."""
+@timed("send_email")
+def send_email(to_email, subject, body, raise_errors=False, cc=None):
+    """
+    Sends an email using SMTP settings from config.
+    - raise_errors=True re-raises SMTP errors (the outbox worker retries them) instead of returning False.
+    - cc: CC addresses; None means the confirmation CC list (config.CC_EMAILS).
+    """
 
     msg = MIMEText(body, "plain")
     msg["Subject"] = subject
     msg["From"] = cfg.SMTP_USER
     msg["To"] = to_email
 
-    cc_list = cfg.CC_EMAILS
-    msg["Cc"] = ", ".join(cc_list)
+    cc_list = list(cfg.CC_EMAILS if cc is None else cc)
+    if cc_list:
+        msg["Cc"] = ", ".join(cc_list)
 
     recipients = [to_email] + cc_list
 
     try:
-        if cfg.SMTP_PORT == 465:
-            # Uses SSL for port 465
-            with smtplib.SMTP_SSL(cfg.SMTP_HOST, cfg.SMTP_PORT) as server:
-                server.login(cfg.SMTP_USER, cfg.SMTP_PASS)
-                server.sendmail(cfg.SMTP_USER, recipients, msg.as_string())
-        else:
-            # Default: connects plain + upgrade to TLS
-            with smtplib.SMTP(cfg.SMTP_HOST, cfg.SMTP_PORT) as server:
-                server.starttls()
-                server.login(cfg.SMTP_USER, cfg.SMTP_PASS)
-                server.sendmail(cfg.SMTP_USER, recipients, msg.as_string())
+        # Reuses a pooled, already logged-in session (no TLS handshake/login per email)
+        get_smtp_pool().send(cfg.SMTP_USER, recipients, msg.as_string())
         return True
     except Exception as e:
         print("Email sending failed:", e)
+        if raise_errors:
+            raise
         return False
 
 
@@ -823,12 +1174,17 @@ def send_email(to_email, subject, body):
 # region Chapter 14: Lottie Animation function
 
 
-@st.cache_data(ttl=1 * 24 * 60 * 60)  # 1 day
+@file_asset
+def read_lottie_json(path: str) -> dict:
+    """Compacted animation (prebuilt assets/*.min.json, or optimized here when that is missing/stale)."""
+    return load_optimized_lottie(path, cfg.LOTTIE_PRECISION)
+
+
 def load_lottiefile(filepath: str, page_id: str = "conference"):
-    _ = page_id  # intentionally keep param to make cache key unique
+    """Parsed Lottie animation, loaded once per file version (kept when the data caches are cleared)."""
+    _ = page_id  # kept for existing callers; assets are keyed by path
     try:
-        with open(filepath, "r", encoding="utf-8") as file:
-            return json.load(file)
+        return read_lottie_json(filepath)
     except Exception as e:
         st.error(f"Error loading local Lottie file: {e}")
         return None
@@ -840,9 +1196,12 @@ def load_lottiefile(filepath: str, page_id: str = "conference"):
 # region Chapter 15: Random Quotes function
 
 
-@st.cache_data(ttl=24 * 60 * 60)  # Cache for 1 day
+@timed("get_random_quote")
+@bounded_cache("quotes", **cfg.CACHE_BUDGETS["quotes"])
 def get_random_quote():
     """Fetch a random quote from Quotable API"""
+    import requests
+
     try:
         response = requests.get(
             "https://api.quotable.io/random?tags=technology",
@@ -881,3 +1240,197 @@ def get_random_quote():
 
 
 # endregion
+
+
+# region Chapter 16: Admin cache panel
+def is_admin() -> bool:
+    """True for logged-in users listed in admin_users, or when ?admin=<admin_token> is in the URL."""
+    username = st.session_state.get("username")
+    if username and username in cfg.ADMIN_USERS:
+        return True
+    token = st.query_params.get("admin")
+    return bool(cfg.ADMIN_TOKEN) and token == cfg.ADMIN_TOKEN
+
+
+def render_cache_admin():
+    """Per-namespace cache size and hit/miss/eviction counters (admins only)."""
+    if not is_admin():
+        return
+    with st.expander("🧮 Cache stats (admin)"):
+        stats = pd.DataFrame(cache_stats())
+        if stats.empty:
+            st.info("No caches registered yet.")
+            return
+        stats["hit_rate"] = (
+            stats["hits"] / (stats["hits"] + stats["misses"]).where(lambda n: n > 0)
+        ).round(3)
+        stats["MiB"] = (stats["bytes"] / (1024 * 1024)).round(2)
+        stats["budget_MiB"] = (stats["max_bytes"] / (1024 * 1024)).round(2)
+        st.dataframe(stats.drop(columns=["bytes", "max_bytes"]), hide_index=True)
+
+
+# endregion
+
+
+# region Chapter 17: Cached authenticator setup
+@file_asset
+def load_auth_config(path: str) -> dict:
+    """
+    cred.yaml parsed once per file version (reloaded when its mtime changes).
+    Plain-text passwords are bcrypt-hashed here, once, instead of by every Authenticate() (auto_hash).
+    """
+    import yaml
+    from yaml.loader import SafeLoader
+    from streamlit_authenticator import Hasher
+
+    with open(path) as file:
+        config = yaml.load(file, Loader=SafeLoader)
+    for user in (config["credentials"].get("usernames") or {}).values():
+        if "password" in user and not Hasher.is_hash(user["password"]):
+            user["password"] = Hasher.hash(user["password"])
+    return config
+
+
+def get_authenticator(path: str = ".streamlit/cred.yaml"):
+    """
+    The session's stauth.Authenticate, built from the process-cached cred.yaml.
+    - Each session gets its own copy of the credentials: login/logout update them (failed attempts,
+      logged_in), which must not leak between sessions.
+    - Logged-in reruns reuse the session's authenticator while cred.yaml is unchanged; login() has
+      nothing to check then (no YAML, cookie or bcrypt work).
+    - Logged-out reruns build a fresh one: its cookie component must render to read the re-auth cookie.
+    """
+    import streamlit_authenticator as stauth
+
+    config = load_auth_config(path)
+    cached = st.session_state.get("_authenticator")
+    if (
+        cached is not None
+        and cached[0] is config
+        and st.session_state.get("authentication_status")
+    ):
+        return cached[1]
+
+    authenticator = stauth.Authenticate(
+        copy.deepcopy(config["credentials"]),
+        config["cookie"]["name"],
+        config["cookie"]["key"],
+        config["cookie"]["expiry_days"],
+        auto_hash=False,
+    )
+    st.session_state["_authenticator"] = (config, authenticator)
+    return authenticator
+
+
+# endregion
+
+
+# region Chapter 18: Admin timing panels
+def render_timing_admin():
+    """Rolling hot-path timings and the previous rerun's spans (admins only, when telemetry is enabled)."""
+    if not (TELEMETRY.enabled and is_admin()):
+        return
+    with st.expander("⏱️ Rerun timings (admin)"):
+        summary = pd.DataFrame(TELEMETRY.summary())
+        if summary.empty:
+            st.info("No spans recorded yet.")
+            return
+        st.dataframe(summary, hide_index=True)
+        spans = st.session_state.get("_rerun_spans")
+        if spans:
+            st.caption("Previous rerun (start_ms: offset from the start of the rerun)")
+            st.dataframe(pd.DataFrame(spans).sort_values("start_ms"), hide_index=True)
+        st.download_button(
+            "Prometheus metrics",
+            TELEMETRY.prometheus_text(),
+            file_name=f"{TELEMETRY.app}_metrics.prom",
+            mime="text/plain",
+        )
+
+
+def render_query_admin():
+    """SQL statements by total time, the previous rerun's queries and the slow-query log (admins only)."""
+    if not (QUERIES.enabled and is_admin()):
+        return
+    with st.expander("🗄️ SQL queries (admin)"):
+        queries = st.session_state.get("_rerun_queries") or []
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Queries (previous rerun)", len(queries))
+        col2.metric("DB time (ms)", round(sum(q["ms"] for q in queries), 1))
+        col3.metric("Rows fetched", sum(q["rows"] or 0 for q in queries))
+        summary = pd.DataFrame(QUERIES.summary())
+        if summary.empty:
+            st.info("No queries recorded yet.")
+        else:
+            st.dataframe(summary, hide_index=True)
+        if QUERIES.slow:
+            st.caption(
+                f"Slow-query log (> {QUERIES.slow_ms} ms or > {QUERIES.max_rows:,} rows)"
+            )
+            st.dataframe(pd.DataFrame(list(QUERIES.slow)[::-1]), hide_index=True)
+
+
+# endregion
+
+
+# region Chapter 19: Admin memory panel
+def start_rerun_trace():
+    """Starts tracemalloc for this rerun when an admin asked for it on the previous one."""
+    if st.session_state.pop("_tracing_rerun", False) and tracemalloc.is_tracing():
+        # the traced rerun was cut short (st.rerun/st.stop): don't leave tracing on
+        tracemalloc.stop()
+    if (
+        st.session_state.pop("_trace_next_rerun", False)
+        and not tracemalloc.is_tracing()
+    ):
+        tracemalloc.start()
+        st.session_state["_tracing_rerun"] = True
+
+
+def finish_rerun_trace():
+    """Stops the rerun trace and keeps its peak and top allocators for the memory panel."""
+    if not st.session_state.pop("_tracing_rerun", False):
+        return
+    snapshot = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    st.session_state["_rerun_allocations"] = {
+        "peak_MiB": round(peak / (1024 * 1024), 2),
+        "top": top_allocations(snapshot),
+    }
+
+
+def render_memory_admin(df: pd.DataFrame = None):
+    """Cached frames (deep bytes) and figures (serialized size), plus a traced rerun (admins only)."""
+    if not is_admin():
+        return
+    with st.expander("📦 Memory (admin)"):
+        report = pd.DataFrame(memory_report())
+        if report.empty:
+            st.info("Nothing cached yet.")
+        else:
+            report["MiB"] = (report["bytes"] / (1024 * 1024)).round(2)
+            report["serialized_MiB"] = (
+                report["serialized_bytes"] / (1024 * 1024)
+            ).round(2)
+            st.caption(f"Cached values: {report['MiB'].sum():.1f} MiB in memory")
+            st.dataframe(
+                report.drop(columns=["bytes", "serialized_bytes"]), hide_index=True
+            )
+        if df is not None and not df.empty:
+            st.caption("Bookings frame by column")
+            st.dataframe(pd.DataFrame(frame_columns(df)), hide_index=True)
+
+        if st.button("Trace next rerun (tracemalloc)"):
+            st.session_state["_trace_next_rerun"] = True
+            st.rerun()
+        traced = st.session_state.get("_rerun_allocations")
+        if traced:
+            st.caption(
+                f"Last traced rerun: peak {traced['peak_MiB']} MiB traced "
+                "(all threads of the process, so concurrent sessions are included)"
+            )
+            st.dataframe(pd.DataFrame(traced["top"]), hide_index=True)
+
+
+# endregion
@@ -0,0 +1,263 @@
+# region Chapter 1: Imports
+import random
+import threading
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+# endregion
+
+
+# region Chapter 2: Outbox table + enqueue
+# One table for both apps ("source" = conference/resource); rows are written in the booking's own
+# transaction, so a saved booking always has its confirmation queued (and vice versa).
+# dedupe_key (e.g. "reminder:resource:42") keeps batch jobs from queuing the same email twice.
+OUTBOX_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    source VARCHAR(20) NOT NULL,
+    to_email VARCHAR(100) NOT NULL,
+    cc_emails VARCHAR(1000),
+    subject VARCHAR(255) NOT NULL,
+    body TEXT NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL,
+    last_error VARCHAR(500),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at DATETIME NULL,
+    dedupe_key VARCHAR(100) NULL,
+    INDEX idx_email_outbox_due (source, status, next_attempt_at),
+    UNIQUE KEY uq_email_outbox_dedupe (dedupe_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
+
+
+def enqueue_email(
+    conn,
+    source: str,
+    to_email: str,
+    subject: str,
+    body: str,
+    cc=None,
+    dedupe_key=None,
+):
+    """
+    Queues one email on an open connection/transaction (e.g. inside add_booking's engine.begin()).
+    - cc: list of CC addresses (None/empty: no CC).
+    """
+    conn.execute(
+        text(
+            """
+            INSERT INTO email_outbox
+            (source, to_email, cc_emails, subject, body, status, attempts, next_attempt_at, dedupe_key)
+            VALUES (:source, :to_email, :cc_emails, :subject, :body, 'pending', 0, :now, :dedupe_key)
+        """
+        ),
+        {
+            "source": source,
+            "to_email": to_email,
+            "cc_emails": ", ".join(cc) if cc else None,
+            "subject": subject,
+            "body": body,
+            "now": datetime.now(),
+            "dedupe_key": dedupe_key,
+        },
+    )
+
+
+def queued_dedupe_keys(conn, keys) -> set:
+    """The subset of dedupe keys that already have an outbox row (any status)."""
+    if not keys:
+        return set()
+    params = {f"k{i}": key for i, key in enumerate(keys)}
+    placeholders = ", ".join(f":{name}" for name in params)
+    rows = conn.execute(
+        text(
+            f"SELECT dedupe_key FROM email_outbox WHERE dedupe_key IN ({placeholders})"
+        ),
+        params,
+    )
+    return {row[0] for row in rows}
+
+
+# endregion
+
+
+# region Chapter 3: Background delivery worker
+class EmailOutboxWorker:
+    """
+    Daemon thread that drains email_outbox for one source.
+    - Wakes every poll_interval seconds, or immediately on wake() (e.g. right after a booking).
+    - Rows are claimed with a conditional UPDATE (status + lease), so several app processes can run a
+      worker each without double-sending; a row stuck in 'sending' is retried once its lease expires.
+    - A failed send is retried with exponential backoff + jitter, and marked 'failed' after max_attempts.
+    - sender(to_email, subject, body, cc) must raise on failure (cc: list of addresses, possibly empty).
+    """
+
+    def __init__(
+        self,
+        engine_factory,
+        sender,
+        source: str,
+        poll_interval=30,
+        batch_size=20,
+        max_attempts=8,
+        backoff_base=30,
+        backoff_max=60 * 60,
+        lease=10 * 60,
+    ):
+        self.engine_factory = engine_factory
+        self.sender = sender
+        self.source = source
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.sent = self.retried = self.failed = 0
+        self.last_error = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"email-outbox-{self.source}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                while self.drain() == self.batch_size and not self._stop.is_set():
+                    pass  # full batch: more may be due
+            except Exception as e:
+                self.last_error = str(e)
+                print("EmailOutboxWorker drain error:", e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds until the next try after `attempts` failed sends (full jitter)."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** max(0, attempts - 1))
+        return random.uniform(delay / 2, delay)
+
+    def drain(self) -> int:
+        """Sends one batch of due emails; returns how many rows were due."""
+        engine = self.engine_factory()
+        now = datetime.now()
+        with engine.connect() as conn:
+            rows = (
+                conn.execute(
+                    text(
+                        """
+                        SELECT id, to_email, cc_emails, subject, body, status, attempts
+                        FROM email_outbox
+                        WHERE source = :source AND status IN ('pending', 'sending')
+                          AND next_attempt_at <= :now
+                        ORDER BY next_attempt_at, id
+                        LIMIT :limit
+                    """
+                    ),
+                    {"source": self.source, "now": now, "limit": self.batch_size},
+                )
+                .mappings()
+                .all()
+            )
+
+        for row in rows:
+            if self._claim(engine, row, now):
+                self._deliver(engine, row)
+        return len(rows)
+
+    def _claim(self, engine, row, now) -> bool:
+        with engine.begin() as conn:
+            claimed = conn.execute(
+                text(
+                    """
+                    UPDATE email_outbox
+                    SET status = 'sending', attempts = attempts + 1, next_attempt_at = :lease_until
+                    WHERE id = :id AND status = :status AND next_attempt_at <= :now
+                """
+                ),
+                {
+                    "id": row["id"],
+                    "status": row["status"],
+                    "now": now,
+                    "lease_until": now + timedelta(seconds=self.lease),
+                },
+            )
+            return claimed.rowcount == 1
+
+    def _deliver(self, engine, row):
+        attempts = int(row["attempts"]) + 1
+        try:
+            cc = [a.strip() for a in (row["cc_emails"] or "").split(",") if a.strip()]
+            self.sender(row["to_email"], row["subject"], row["body"], cc)
+        except Exception as e:
+            self.last_error = str(e)
+            gave_up = attempts >= self.max_attempts
+            retry_at = datetime.now() + timedelta(seconds=self.backoff(attempts))
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        """
+                        UPDATE email_outbox
+                        SET status = :status, next_attempt_at = :retry_at, last_error = :error
+                        WHERE id = :id
+                    """
+                    ),
+                    {
+                        "id": row["id"],
+                        "status": "failed" if gave_up else "pending",
+                        "retry_at": retry_at,
+                        "error": str(e)[:500],
+                    },
+                )
+            if gave_up:
+                self.failed += 1
+                print(f"EmailOutboxWorker: giving up on email {row['id']}:", e)
+            else:
+                self.retried += 1
+            return
+
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    UPDATE email_outbox
+                    SET status = 'sent', sent_at = :now, last_error = NULL
+                    WHERE id = :id
+                """
+                ),
+                {"id": row["id"], "now": datetime.now()},
+            )
+        self.sent += 1
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "alive": self._thread is not None and self._thread.is_alive(),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_error": self.last_error,
+        }
+
+
+# endregion
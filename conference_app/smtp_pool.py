@@ -0,0 +1,176 @@
+# region Chapter 1: Imports
+import smtplib
+import threading
+import time
+
+from contextlib import contextmanager
+
+# endregion
+
+
+# region Chapter 2: SMTP session pool
+
+# Per-message refusals: the session itself is still usable
+MESSAGE_REFUSED = (
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPDataError,
+)
+
+
+class SMTPPool:
+    """
+    Reuses authenticated SMTP sessions across sends (one TLS handshake + login per session, not per email).
+    - connect() -> a logged-in smtplib.SMTP/SMTP_SSL; at most max_size sessions exist at a time.
+    - Idle sessions are closed after idle_timeout and any session after max_age (servers drop idle
+      clients anyway): on checkin, and by a timer armed for the earliest expiry while sessions sit idle.
+      A session idle for more than check_interval is NOOP-checked before reuse.
+    - A session that raised during a send is discarded, never returned to the pool, unless the server only
+      refused that message (4xx/5xx reply; smtplib has already RSET the session).
+    """
+
+    def __init__(
+        self, connect, max_size=2, idle_timeout=60, max_age=10 * 60, check_interval=15
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = []  # [(server, created_at, last_used)], most recently used last
+        self._sweeper = (
+            None  # threading.Timer for the next reap() while sessions are idle
+        )
+        self._sweep_at = 0.0
+        self.opened = self.reused = self.discarded = 0
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            server, created_at = self._checkout()
+            try:
+                yield server
+            except MESSAGE_REFUSED:
+                self._checkin(server, created_at)
+                raise
+            except Exception:
+                self._close(server)
+                raise
+            self._checkin(server, created_at)
+        finally:
+            self._slots.release()
+
+    def send(self, from_addr, recipients, message: str):
+        """sendmail() on a pooled session; retried once on a fresh session if a reused one was dropped."""
+        try:
+            with self.connection() as server:
+                return server.sendmail(from_addr, recipients, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close_all()
+            with self.connection() as server:
+                return server.sendmail(from_addr, recipients, message)
+
+    def _checkout(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, created_at, last_used = self._idle.pop()
+            if now - last_used > self.idle_timeout or now - created_at > self.max_age:
+                self._close(server)
+                continue
+            if now - last_used > self.check_interval and not self._healthy(server):
+                self._close(server)
+                continue
+            self.reused += 1
+            return server, created_at
+
+        server = self.connect()
+        self.opened += 1
+        return server, time.monotonic()
+
+    def _checkin(self, server, created_at):
+        if time.monotonic() - created_at > self.max_age:
+            self._close(server)
+        else:
+            with self._lock:
+                self._idle.append((server, created_at, time.monotonic()))
+        self.reap()
+
+    def _expires_at(self, created_at, last_used) -> float:
+        return min(last_used + self.idle_timeout, created_at + self.max_age)
+
+    def reap(self) -> int:
+        """Closes idle sessions past idle_timeout/max_age and re-arms the sweep timer; returns how many."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [e for e in self._idle if self._expires_at(e[1], e[2]) < now]
+            if expired:
+                self._idle = [e for e in self._idle if e not in expired]
+            self._arm_sweep(now)
+        for server, _, _ in expired:
+            self._close(server)
+        return len(expired)
+
+    def _arm_sweep(self, now):
+        # under _lock: one timer, due at the earliest idle expiry
+        if not self._idle:
+            return
+        due = min(self._expires_at(c, u) for _, c, u in self._idle)
+        if self._sweeper is not None:
+            if self._sweep_at <= due:
+                return
+            self._sweeper.cancel()
+        self._sweep_at = due
+        self._sweeper = threading.Timer(max(0.0, due - now) + 0.05, self._sweep)
+        self._sweeper.daemon = True
+        self._sweeper.start()
+
+    def _sweep(self):
+        with self._lock:
+            self._sweeper = None
+        self.reap()
+
+    @staticmethod
+    def _healthy(server) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _close(self, server):
+        self.discarded += 1
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            if self._sweeper is not None:
+                self._sweeper.cancel()
+                self._sweeper = None
+        for server, _, _ in idle:
+            self._close(server)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "idle": idle,
+            "max_size": self.max_size,
+            "opened": self.opened,
+            "reused": self.reused,
+            "discarded": self.discarded,
+        }
+
+
+# endregion
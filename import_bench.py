@@ -0,0 +1,137 @@
+# import_bench.py
+"""
+Cold-start import budget for home.py and both app pages (python -X importtime, one fresh interpreter per target).
+- Per target: total import time, the slowest top-level packages (self time summed per package), and any
+  deferred dependency that got imported anyway (auth, Lottie, requests, Parquet: loaded at the point of use).
+- --json writes the report; --baseline compares against an earlier report and exits 1 if a target got
+  slower than --tolerance (default 25%) or a deferred dependency is imported again.
+Run from the repo root (the page modules read .streamlit/secrets.toml), e.g.:
+    python import_bench.py --json import_times.json
+    python import_bench.py --baseline import_times.json
+"""
+import argparse
+import ast
+import json
+import re
+import statistics
+import subprocess
+import sys
+
+from collections import defaultdict
+
+# Page scripts: their module-level imports are what a cold page load pays before the first st.* call
+# (imports inside `if UserAuth:`, functions or page sections are deferred and not counted)
+PAGES = {
+    "home": "home.py",
+    "conference": "conference_app/app.py",
+    "resource": "resource_app/app.py",
+}
+
+# Loaded lazily: auth only when UserAuth is on, Lottie when the animation renders, requests for the
+# quote, pyarrow.parquet for the bookings snapshot
+DEFERRED = (
+    "streamlit_authenticator",
+    "yaml",
+    "bcrypt",
+    "jwt",
+    "streamlit_lottie",
+    "requests",
+    "pyarrow.parquet",
+)
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def page_imports(path: str) -> list:
+    """The top-level import statements of a page script, as source lines."""
+    with open(path, "r", encoding="utf-8") as file:
+        tree = ast.parse(file.read(), path)
+    return [
+        ast.unparse(node)
+        for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def import_times(statements) -> list:
+    """[(module, self_us, cumulative_us, depth)] from one cold interpreter running the import statements."""
+    code = "\n".join(statements)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"{code}\nfailed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cum_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cum_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def measure(statements, repeat: int) -> dict:
+    runs = [import_times(statements) for _ in range(repeat)]
+    totals = [sum(r[1] for r in rows) / 1000 for rows in runs]
+    median = statistics.median(totals)
+    rows = runs[min(range(repeat), key=lambda i: abs(totals[i] - median))]
+
+    per_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        per_package[name.split(".")[0]] += self_us
+    loaded = {name for name, _, _, _ in rows}
+    return {
+        "total_ms": round(median, 1),
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(per_package.items(), key=lambda kv: -kv[1])[:15]
+        },
+        "deferred_loaded": [m for m in DEFERRED if m in loaded],
+    }
+
+
+def compare(report, baseline, tolerance) -> list:
+    problems = []
+    for target, now in report.items():
+        before = baseline.get(target)
+        if not before:
+            continue
+        if now["total_ms"] > before["total_ms"] * (1 + tolerance):
+            problems.append(
+                f"{target}: {now['total_ms']:.0f} ms vs baseline {before['total_ms']:.0f} ms"
+            )
+        regressed = set(now["deferred_loaded"]) - set(before["deferred_loaded"])
+        if regressed:
+            problems.append(f"{target}: eagerly imports {', '.join(sorted(regressed))}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=3, help="cold runs per target")
+    parser.add_argument("--top", type=int, default=8, help="packages shown per target")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="earlier --json report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = {}
+    for target, path in PAGES.items():
+        result = report[target] = measure(page_imports(path), args.repeat)
+        print(f"{target:<11} {result['total_ms']:8.1f} ms")
+        for name, ms in list(result["packages_ms"].items())[: args.top]:
+            print(f"    {name:<28} {ms:8.1f} ms")
+        if result["deferred_loaded"]:
+            print(f"    deferred but loaded: {', '.join(result['deferred_loaded'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            problems = compare(report, json.load(file), args.tolerance)
+        for problem in problems:
+            print("REGRESSION", problem)
+        sys.exit(1 if problems else 0)
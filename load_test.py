@@ -0,0 +1,498 @@
+# load_test.py
+"""
+Concurrent-session load test: simulated users on home.py and both booking pages (streamlit.testing.v1.AppTest),
+against a seeded local SQLite database (sample_data.py) and the SMTP sink (smtp_sink.py); no MySQL, browser or network needed.
+- Each session opens home.py, switches to its page (alternating conference/resource unless --page), reruns as a
+  timeline view, changes the resource filter (resource page; the conference page has none) and submits --bookings
+  bookings. All sessions of a page submit for the same slot at the same moment, so each slot has exactly one winner.
+- Sessions run on threads in one process and share its caches, SQLAlchemy pool and outbox worker, as the sessions
+  of one Streamlit server do. A warm-up session per page runs first so the timings are steady-state reruns.
+- SQLite only: booking_lock's thread lock is exercised, its MySQL named-lock (GET_LOCK/RELEASE_LOCK) branch is not.
+- Reports: reruns/s, p50/p95/p99 rerun latency per step, booking outcomes, conflict correctness (overlapping
+  bookings for the same room/resource written by the run), confirmations delivered, and connection-pool saturation
+  (peak checked-out connections vs pool capacity, share of samples at capacity).
+--json writes the report; exits 1 on double bookings or script errors.
+Run from the repo root (reads .streamlit/secrets.toml like the apps), e.g.:
+    python load_test.py --sessions 20 --rows 10000
+    python load_test.py --sessions 40 --pool-size 2 --max-overflow 0 --json load_test.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from collections import Counter, defaultdict
+from datetime import date, datetime, time as dtime, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import event, text
+from streamlit import config as st_config
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import (
+    MemoryCacheStorageManager,
+)
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+from streamlit.util import calc_md5
+
+from conference_app import config as ccfg
+from conference_app import functions as cfn
+from resource_app import config as rcfg
+from resource_app import functions as rfn
+from sample_data import generate_bookings, make_engine, write_bookings
+from smtp_bench import OFFLINE_TABLES_SQL
+from smtp_sink import SMTPSink
+
+APPS = {"conference": (cfn, ccfg), "resource": (rfn, rcfg)}
+# booked item column per page (overlaps are checked per room / per single resource)
+ITEM_COLUMN = {"conference": "conference_type", "resource": "resource_type"}
+OUTBOX_TABLE_SQL = next(sql for sql in OFFLINE_TABLES_SQL if "email_outbox" in sql)
+
+
+# region Setup: seeded database, SMTP sink, shared AppTest runtime
+def seed_engine(path: str, rows: int, pool_size: int, max_overflow: int):
+    """SQLite file with both bookings tables (rows each) and the outbox, behind a QueuePool like get_engine's."""
+    sqlite3.register_adapter(dtime, lambda t: t.strftime("%H:%M:%S"))
+    engine = make_engine(
+        f"sqlite:///{path}",
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=ccfg.DB_TIMEOUTS["connect"],
+    )
+    for app in APPS:
+        write_bookings(engine, app, generate_bookings(app, rows))
+    with engine.begin() as conn:
+        conn.execute(text(OUTBOX_TABLE_SQL))
+    return engine
+
+
+def point_apps_at(engine, sink, snapshot_dir: str):
+    """The apps' DB, SMTP and snapshot settings redirected to the local stand-ins."""
+    for app, (fn, cfg) in APPS.items():
+        fn.QUERIES.attach(engine)
+        fn.get_engine = lambda: engine
+        # init_db reads MySQL's information_schema; seed_engine already created the tables
+        fn.init_db = lambda: None
+        # the quote API is external; the page skips the section when it returns nothing
+        fn.get_random_quote = lambda: None
+        fn.get_authenticator = SignedInAuthenticator
+        cfg.SMTP_HOST, cfg.SMTP_PORT, cfg.SMTP_STARTTLS = sink.host, sink.port, False
+        cfg.BOOKINGS_SNAPSHOT_PATH = os.path.join(snapshot_dir, f"{app}.parquet")
+
+
+def share_runtime():
+    """
+    One mock Runtime and script cache for all sessions, as in one server process.
+    - AppTest.run installs a fresh mock in the process-global Runtime._instance and clears it afterwards, so
+      concurrent sessions would pull it from under each other; here those assignments land on a stand-in class.
+    - AppTest compiles the scripts again on every run; sharing the cache compiles each page once.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    app_test.Runtime = type("Runtime", (Runtime,), {})
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    st_config.set_option("global.appTest", True)
+
+
+class SignedInAuthenticator:
+    """Stand-in for the resource page's authenticator: sessions start logged in (login itself is out of scope)."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def login(self, *args, **kwargs):
+        pass
+
+    def logout(self, *args, **kwargs):
+        pass
+
+
+def open_page(at: AppTest, url_path: str) -> AppTest:
+    """
+    Selects an st.navigation page as its URL does. AppTest.switch_page hashes the script's file name,
+    while st.Page scripts are keyed by url_path ("conference"/"resource" in home.py).
+    """
+    at._page_hash = calc_md5(url_path)
+    return at
+
+
+# endregion
+
+
+# region Sessions
+def labelled(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def booking_slot(k: int):
+    """Slot k of the run: 10:00-11:00 on a day past the seeded bookings (sample_data's future_days)."""
+    return date.today() + timedelta(days=90 + k), dtime(10, 0), dtime(11, 0)
+
+
+def fill_booking_form(at: AppTest, page: str, i: int, k: int):
+    booking_date, start, end = booking_slot(k)
+    labelled(at.date_input, "Booking Date (YYYY-MM-DD)*").set_value(booking_date)
+    labelled(at.time_input, "Start Time (24hrs Format)*").set_value(start)
+    labelled(at.time_input, "End Time (24hrs Format)*").set_value(end)
+    if page == "resource":
+        labelled(at.multiselect, "Resource Type*").set_value([rcfg.resource_list[0]])
+    # conference: the room selectbox keeps its default, so every session asks for the same room
+    labelled(at.text_input, "Person Name*").set_value(f"Load User{i}")
+    labelled(at.text_input, "Company*").set_value("Load Test")
+    labelled(at.text_input, "Email*").set_value(f"load{i}@example.com")
+
+
+def outcome(at: AppTest) -> str:
+    if at.exception:
+        return "error"
+    # conference flashes with st.success, resource with a styled st.markdown
+    alerts = " ".join([s.value for s in at.success] + [m.value for m in at.markdown])
+    if "Booking successfull" in alerts:
+        return "booked"
+    if "Time conflict" in alerts:
+        return "conflict"
+    if "booking database" in alerts:
+        return "db_error"
+    return "other"
+
+
+class Session:
+    """One simulated user: every rerun is timed and checked for script exceptions."""
+
+    def __init__(self, i: int, page: str, timeout: float):
+        self.i, self.page = i, page
+        self.at = AppTest.from_file("home.py", default_timeout=timeout)
+        # resource_app has UserAuth on: start logged in (see SignedInAuthenticator)
+        self.at.session_state["authentication_status"] = True
+        self.at.session_state["name"] = self.at.session_state["username"] = f"load{i}"
+        self.reruns = []  # (step, ms)
+        self.errors = []
+        self.outcomes = []
+
+    def step(self, name: str):
+        t = time.perf_counter()
+        self.at.run()
+        self.reruns.append((name, (time.perf_counter() - t) * 1000))
+        for e in self.at.exception:
+            self.errors.append(f"{self.page}.{name}: {e.value.splitlines()[0]}")
+
+    def browse(self, rng):
+        self.step("home")
+        open_page(self.at, self.page)
+        self.step("page")
+        self.step("view")
+        if self.page == "resource":
+            picks = rng.choice(rcfg.resource_list, size=2, replace=False)
+            labelled(self.at.multiselect, "Select resource(s) to plot data:").set_value(
+                list(picks)
+            )
+            self.step("filter")
+
+    def book(self, k: int, barrier):
+        fill_booking_form(self.at, self.page, self.i, k)
+        labelled(self.at.button, "Submit Booking").click()
+        if barrier is not None:
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                pass  # another session failed: submit unsynchronised
+        self.step("submit")
+        self.outcomes.append(outcome(self.at))
+
+
+def run_session(session: Session, bookings: int, barriers, seed: int):
+    rng = np.random.default_rng(seed + session.i)
+    try:
+        session.browse(rng)
+        for k in range(bookings):
+            session.book(k, barriers[session.page][k] if barriers else None)
+    except Exception as e:
+        session.errors.append(f"{session.page}: {type(e).__name__}: {e}")
+        for page_barriers in (barriers or {}).values():
+            for barrier in page_barriers:
+                barrier.abort()  # let the other sessions carry on unsynchronised
+
+
+# endregion
+
+
+# region Measurements
+class PoolMonitor:
+    """Checked-out connections of the engine's pool: peak (checkout events) and sampled share at capacity."""
+
+    def __init__(self, engine, capacity: int, interval: float = 0.005):
+        self.engine, self.capacity, self.interval = engine, capacity, interval
+        self.checked_out = self.peak = self.checkouts = 0
+        self.samples = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _checkout(self, dbapi_conn, record, proxy):
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.peak = max(self.peak, self.checked_out)
+
+    def _checkin(self, dbapi_conn, record):
+        with self._lock:
+            self.checked_out -= 1
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.samples.append(self.checked_out)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self) -> dict:
+        samples = np.array(self.samples or [0])
+        return {
+            "capacity": self.capacity,
+            "peak_checked_out": self.peak,
+            "mean_checked_out": round(float(samples.mean()), 2),
+            "saturated_share": round(float((samples >= self.capacity).mean()), 4),
+            "checkouts": self.checkouts,
+        }
+
+
+def latency_stats(ms) -> dict:
+    ms = np.array(ms)
+    return {
+        "reruns": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "max_ms": round(float(ms.max()), 1),
+    }
+
+
+def overlapping_bookings(engine, page: str, after_id: int, days) -> int:
+    """
+    Pairs of overlapping bookings for the same room (or the same single resource) where at least one row was
+    written by the run; comma-joined resource rows count once per resource.
+    """
+    column = ITEM_COLUMN[page]
+    sql = text(
+        f"SELECT id, booking_date, start_time, end_time, {column} AS item "
+        f"FROM {page}_bookings WHERE booking_date IN ({', '.join(f':d{j}' for j in range(len(days)))})"
+    )
+    with engine.connect() as conn:
+        df = pd.read_sql_query(
+            sql, conn, params={f"d{j}": d for j, d in enumerate(days)}
+        )
+    if df.empty:
+        return 0
+    df["item"] = df["item"].astype(str).str.split(",")
+    df = df.explode("item")
+    df["item"] = df["item"].str.strip()
+    pairs = df.merge(df, on=["booking_date", "item"], suffixes=("", "_o"))
+    pairs = pairs[
+        (pairs["id"] < pairs["id_o"])
+        & (pairs["id_o"] > after_id)
+        & (pairs["start_time"] < pairs["end_time_o"])
+        & (pairs["start_time_o"] < pairs["end_time"])
+    ]
+    return len(pairs)
+
+
+def max_ids(engine) -> dict:
+    with engine.connect() as conn:
+        return {
+            page: conn.execute(
+                text(f"SELECT COALESCE(MAX(id), 0) FROM {page}_bookings")
+            ).scalar()
+            for page in APPS
+        }
+
+
+def wait_for_outbox(engine, timeout: float = 30.0) -> int:
+    """Confirmations still queued after waiting for the outbox worker(s) to drain."""
+    deadline = time.monotonic() + timeout
+    while True:
+        with engine.connect() as conn:
+            left = conn.execute(
+                text(
+                    "SELECT COUNT(*) FROM email_outbox WHERE status IN ('pending', 'sending')"
+                )
+            ).scalar()
+        if not left or time.monotonic() > deadline:
+            return left
+        time.sleep(0.05)
+
+
+# endregion
+
+
+def run_load_test(args, engine, sink) -> dict:
+    pages = [args.page] if args.page else list(APPS)
+    for i in range(args.warmup * len(pages)):
+        warm = Session(args.sessions + i, pages[i % len(pages)], args.timeout)
+        run_session(warm, 0, None, args.seed)
+        if warm.errors:
+            print("warm-up errors:", *warm.errors[:3], sep="\n  ")
+
+    sessions = [
+        Session(i, pages[i % len(pages)], args.timeout) for i in range(args.sessions)
+    ]
+    per_page = Counter(s.page for s in sessions)
+    barriers = {
+        page: [threading.Barrier(n, timeout=args.timeout) for _ in range(args.bookings)]
+        for page, n in per_page.items()
+    }
+    before = max_ids(engine)
+    delivered_before = len(sink.messages)
+
+    capacity = args.pool_size + args.max_overflow
+    with PoolMonitor(engine, capacity) as pool:
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(
+                target=run_session, args=(s, args.bookings, barriers, args.seed)
+            )
+            for s in sessions
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+    reruns = [ms for s in sessions for _, ms in s.reruns]
+    steps = defaultdict(list)
+    for s in sessions:
+        for name, ms in s.reruns:
+            steps[f"{s.page}.{name}"].append(ms)
+
+    days = [booking_slot(k)[0] for k in range(args.bookings)]
+    bookings = {}
+    for page in per_page:
+        outcomes = Counter(o for s in sessions if s.page == page for o in s.outcomes)
+        bookings[page] = {
+            "sessions": per_page[page],
+            "slots": args.bookings,
+            "outcomes": dict(outcomes),
+            "double_bookings": overlapping_bookings(engine, page, before[page], days),
+        }
+
+    left = wait_for_outbox(engine)
+    return {
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "sessions": args.sessions,
+        "rows": args.rows,
+        "elapsed_s": round(elapsed, 2),
+        "reruns_per_s": round(len(reruns) / elapsed, 2),
+        "latency": latency_stats(reruns) if reruns else {},
+        "steps": {name: latency_stats(ms) for name, ms in sorted(steps.items())},
+        "bookings": bookings,
+        "emails": {
+            "delivered": len(sink.messages) - delivered_before,
+            "queued": left,
+        },
+        "pool": pool.report(),
+        "errors": [e for s in sessions for e in s.errors],
+    }
+
+
+def print_report(report):
+    print(
+        f"{report['sessions']} sessions, {report['rows']:,} seeded bookings per app: "
+        f"{report['latency'].get('reruns', 0)} reruns in {report['elapsed_s']:.1f} s "
+        f"({report['reruns_per_s']:.1f} reruns/s)"
+    )
+    print(f"  {'step':<22} {'reruns':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, s in [("all", report["latency"])] + list(report["steps"].items()):
+        if s:
+            print(
+                f"  {name:<22} {s['reruns']:>6} {s['p50_ms']:>7.0f}ms {s['p95_ms']:>7.0f}ms "
+                f"{s['p99_ms']:>7.0f}ms {s['max_ms']:>7.0f}ms"
+            )
+    for page, b in report["bookings"].items():
+        print(
+            f"  {page}: {b['sessions']} sessions x {b['slots']} contended slots -> "
+            f"{b['outcomes']}, double bookings {b['double_bookings']}"
+        )
+    emails, pool = report["emails"], report["pool"]
+    print(
+        f"  confirmations delivered {emails['delivered']}, still queued {emails['queued']}"
+    )
+    print(
+        f"  pool: peak {pool['peak_checked_out']}/{pool['capacity']} checked out, "
+        f"mean {pool['mean_checked_out']}, at capacity {pool['saturated_share']:.1%} of samples, "
+        f"{pool['checkouts']} checkouts"
+    )
+    for error in report["errors"][:10]:
+        print("ERROR", error)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions")
+    parser.add_argument(
+        "--page", choices=list(APPS), help="only this page (default: both, alternating)"
+    )
+    parser.add_argument(
+        "--bookings", type=int, default=1, help="contended slots each session books"
+    )
+    parser.add_argument(
+        "--rows", type=int, default=5_000, help="seeded bookings per app"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="untimed sessions per page, run first"
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=5,
+        help="SQLAlchemy pool_size (get_engine: default 5)",
+    )
+    parser.add_argument(
+        "--max-overflow",
+        type=int,
+        default=10,
+        help="SQLAlchemy max_overflow (default 10)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=120.0, help="seconds per rerun"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    engine = seed_engine(
+        os.path.join(workdir, "bookings.db"),
+        args.rows,
+        args.pool_size,
+        args.max_overflow,
+    )
+    with SMTPSink() as sink:
+        point_apps_at(engine, sink, workdir)
+        share_runtime()
+        report = run_load_test(args, engine, sink)
+        for fn, _ in APPS.values():
+            fn.get_smtp_pool().close_all()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, default=str)
+    double = sum(b["double_bookings"] for b in report["bookings"].values())
+    raise SystemExit(1 if double or report["errors"] else 0)
@@ -0,0 +1,88 @@
+# lottie_build.py
+"""
+Asset build step for the Lottie animations: writes assets/<name>.min.json next to each source file
+(rounded keyframes, no hidden layers/unused assets/editor metadata) and reports the savings.
+- "file": bytes on disk; "websocket": bytes of the JSON Streamlit sends to the browser for st_lottie
+  (json.dumps with default separators); "parse": median json.loads time.
+Each .min.json records the source's SHA-256 and the precision (build_info); the apps use it only when both
+match the source file and their config.LOTTIE_PRECISION, otherwise they optimize in-process.
+    python lottie_build.py [--precision 3] [--check]
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from resource_app.lottie_optimizer import (
+    BUILD_KEY,
+    build_info,
+    compact_json,
+    optimize_lottie,
+    optimized_path,
+)
+
+
+def parse_ms(raw: str, repeat=15) -> float:
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        json.loads(raw)
+        times.append(time.perf_counter() - t)
+    return float(np.median(times)) * 1000
+
+
+def kib(n) -> str:
+    return f"{n / 1024:8.1f} KiB"
+
+
+def build(path: str, precision: int, check: bool):
+    with open(path, "rb") as file:
+        source = file.read()
+    raw = source.decode("utf-8")
+    data = json.loads(raw)
+    optimized = optimize_lottie(data, precision)
+    out = compact_json({**optimized, BUILD_KEY: build_info(source, precision)})
+
+    before_ws, after_ws = len(json.dumps(data)), len(json.dumps(optimized))
+    before_ms, after_ms = parse_ms(raw), parse_ms(out)
+    print(os.path.basename(path))
+    print(
+        f"  file      {kib(len(raw))} -> {kib(len(out))}  ({1 - len(out) / len(raw):.0%} smaller)"
+    )
+    print(
+        f"  websocket {kib(before_ws)} -> {kib(after_ws)}  ({1 - after_ws / before_ws:.0%} smaller)"
+    )
+    print(f"  parse     {before_ms:7.2f} ms -> {after_ms:7.2f} ms")
+    print(
+        f"  layers    {len(data.get('layers', []))} -> {len(optimized['layers'])}, "
+        f"assets {len(data.get('assets', []))} -> {len(optimized['assets'])}"
+    )
+
+    target = optimized_path(path)
+    if check:
+        current = None
+        if os.path.exists(target):
+            with open(target, "r", encoding="utf-8") as file:
+                current = file.read()
+        if current != out:
+            raise SystemExit(f"{target} is out of date; run python lottie_build.py")
+        return
+    with open(target, "w", encoding="utf-8") as file:
+        file.write(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--precision", type=int, default=3, help="decimals kept in keyframe values"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="fail if a .min.json is out of date"
+    )
+    args = parser.parse_args()
+
+    for path in sorted(glob.glob("assets/*_lottie.json")):
+        build(path, args.precision, args.check)
@@ -0,0 +1,112 @@
+# memory_report.py
+"""
+Memory report for one app's cached data on synthetic bookings (sample_data.py; no MySQL needed).
+- Cached bundle: deep memory_usage per frame (and per column of the bookings frame), in-memory and
+  serialized size per figure, as the admin "Memory" panel shows them for the live caches.
+- tracemalloc: peak and top allocating source lines while loading (normalize + bundle build, what a
+  cache refresh pays) and during one rerun's display path (filter/table prep + "Today" marker).
+--json writes the report, e.g. to compare before/after a dtype change.
+Run from the repo root (reads .streamlit/secrets.toml like the apps), e.g.:
+    python memory_report.py --app resource --rows 100000 --json memory_resource.json
+"""
+import argparse
+import json
+import tracemalloc
+
+import pandas as pd
+
+from conference_app import cache as ccache
+from conference_app import functions as cfn
+from resource_app import cache as rcache
+from resource_app import functions as rfn
+from sample_data import generate_bookings
+
+APPS = {"conference": (cfn, ccache), "resource": (rfn, rcache)}
+
+
+def traced(run):
+    """(result, peak bytes, snapshot) of run() under tracemalloc."""
+    tracemalloc.start()
+    try:
+        result = run()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak, snapshot
+
+
+def load(app, raw):
+    """The load path of the bookings cache: get_bookings post-processing + bundle build."""
+    fn, _ = APPS[app]
+    return fn.build_bookings_bundle(fn.normalize_bookings(raw))
+
+
+def rerun(app, bundle):
+    """The per-rerun display path over the cached bundle."""
+    fn, _ = APPS[app]
+    if app == "conference":
+        table = fn.bookings_table(bundle["df"])
+        fig = fn.add_today_marker(bundle["fig"]) if bundle["fig"] else None
+    else:
+        selected = list(bundle["resource_index"].columns[:1])
+        df = fn.filter_by_resources(bundle["df"], bundle["resource_index"], selected)
+        table = fn.bookings_table(df)
+        fig = fn.compose_timeline_figure(bundle["traces"], bundle["layout"], selected)
+        fig = fn.add_today_marker(fig) if fig else None
+    return table, fig
+
+
+def mib(n) -> str:
+    return f"{n / 2**20:9.2f} MiB" if n is not None else " " * 13
+
+
+def print_allocations(title, peak, snapshot, cache, top):
+    print(f"\n{title}: peak {mib(peak).strip()} traced")
+    for row in cache.top_allocations(snapshot, top):
+        print(
+            f"    {row['KiB']:10.1f} KiB  {row['blocks']:7} blocks  {row['location']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--app", choices=list(APPS), default="conference")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--top", type=int, default=10, help="allocating lines shown")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    fn, cache = APPS[args.app]
+    raw = generate_bookings(args.app, args.rows)
+    bundle, load_peak, load_snapshot = traced(lambda: load(args.app, raw))
+    _, rerun_peak, rerun_snapshot = traced(lambda: rerun(args.app, bundle))
+
+    values = cache.describe_value(f"bookings:{args.app}", "db", bundle)
+    columns = cache.frame_columns(bundle["df"])
+    print(f"{args.app}: {args.rows:,} bookings")
+    for row in values:
+        print(
+            f"  {row['part']:<16} {row['kind']:<10} {mib(row['bytes'])}  "
+            f"serialized {mib(row['serialized_bytes'])}"
+        )
+    print("\n  bookings frame by column:")
+    for row in columns:
+        print(f"    {row['column']:<22} {row['dtype']:<16} {mib(row['bytes'])}")
+    print_allocations("Load", load_peak, load_snapshot, cache, args.top)
+    print_allocations("Rerun", rerun_peak, rerun_snapshot, cache, args.top)
+
+    if args.json:
+        report = {
+            "app": args.app,
+            "rows": args.rows,
+            "pandas": pd.__version__,
+            "cached": values,
+            "columns": columns,
+            "load_peak_bytes": load_peak,
+            "rerun_peak_bytes": rerun_peak,
+            "load_top": cache.top_allocations(load_snapshot, args.top),
+            "rerun_top": cache.top_allocations(rerun_snapshot, args.top),
+        }
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
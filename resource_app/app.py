@@ -1,15 +1,7 @@
 # region Chapter 1: Imports
 
 import streamlit as st
-import yaml
-from yaml.loader import SafeLoader
-from PIL import Image
-import streamlit_authenticator as stauth
 import time
-import pandas as pd
-from streamlit_lottie import st_lottie
-import plotly.graph_objects as go
-from datetime import datetime
 
 
 # Custom Modules
@@ -17,21 +9,51 @@ from resource_app import config as cfg
 
 from resource_app.functions import (
     init_db,
+    get_engine,
+    send_email,
+    get_smtp_pool,
     get_bookings,
+    normalize_bookings,
+    get_bookings_version,
+    BookingsUnavailableError,
     booking_form,
     render_header_bar,
-    build_vertical_day_time_timeline,  # using cached version from below
-    build_timeline_figure_cached,
+    compose_timeline_figure,
+    add_today_marker,
+    filter_by_resources,
+    bookings_table,
     st_red_alert,
     load_lottiefile,
+    load_page_icon,
     get_random_quote,
+    render_cache_admin,
+    render_timing_admin,
+    render_query_admin,
+    render_memory_admin,
+    start_rerun_trace,
+    finish_rerun_trace,
+    build_bookings_bundle,
+    get_authenticator,
 )
+from resource_app.outbox import EmailOutboxWorker
+from resource_app.telemetry import QUERIES, TELEMETRY, timed
+from resource_app.cache import (
+    BookingsCache,
+    BookingsSnapshot,
+    register_cache,
+    clear_caches,
+)
+
+# Per-rerun spans, queries and (on request) a tracemalloc trace; no-op unless enabled
+TELEMETRY.start_rerun()
+QUERIES.start_rerun()
+start_rerun_trace()
 
 # endregion
 
 # region Chapter 2: Page Layout
 
-icon = Image.open("assets/logo.ico")
+icon = load_page_icon("assets/logo.ico")
 
 st.set_page_config(
     page_title="Booking App",
@@ -52,15 +74,7 @@ st.set_page_config(
 UserAuth = True
 
 if UserAuth:
-    with open(".streamlit/cred.yaml") as file:
-        auth_config = yaml.load(file, Loader=SafeLoader)
-
-    authenticator = stauth.Authenticate(
-        auth_config["credentials"],
-        auth_config["cookie"]["name"],
-        auth_config["cookie"]["key"],
-        auth_config["cookie"]["expiry_days"],
-    )
+    authenticator = get_authenticator(".streamlit/cred.yaml")
 
     authenticator.login(location="sidebar")
 
@@ -94,17 +108,109 @@ render_header_bar(
 
 
 # region Chapter 5: Load the MySQL Database
-init_db()
 
 
-@st.cache_data(ttl=7 * 24 * 60 * 60)  # 1 week
+@st.cache_resource
+def ensure_db(page_id: str = "resource"):
+    """Creates the table/index once per process, on the first DB load (not on every rerun)."""
+    _ = page_id  # intentionally keep param to make cache key unique
+    try:
+        init_db()
+    except Exception as e:
+        raise BookingsUnavailableError(f"init_db: {e}") from e
+    return True
+
+
+@timed("load_bookings")
 def load_bookings(page_id: str = "resource"):
     _ = page_id  # intentionally keep param to make cache key unique
-    return get_bookings()
+    ensure_db(page_id)
+    return get_bookings(raise_errors=True)
+
+
+def load_bookings_bundle(df=None, loaded_at=None):
+    """Bookings frame + resource index + per-resource timeline traces, (re)built together by the bookings cache."""
+    if df is None:
+        df = load_bookings("resource")
+    return build_bookings_bundle(df, loaded_at)
+
+
+def snapshot_bundle(snapshot: BookingsSnapshot):
+    """Warm start: the bundle rebuilt from the on-disk snapshot, with the DB version it was taken at."""
+    loaded = snapshot.load()
+    if loaded is None:
+        return None
+    df, meta = loaded
+    # Parquet keeps the typed columns; normalizing also upgrades snapshots saved with string columns
+    df = normalize_bookings(df)
+    return load_bookings_bundle(df, meta.get("saved_at")), meta.get("version")
+
+
+@st.cache_resource
+def bookings_cache(page_id: str = "resource"):
+    """Stale-while-revalidate: reruns get the cached bundle, refreshes happen in the background."""
+    _ = page_id  # intentionally keep param to make cache key unique
+    snapshot = BookingsSnapshot(cfg.BOOKINGS_SNAPSHOT_PATH)
+    return register_cache(
+        f"bookings:{page_id}",
+        BookingsCache(
+            load_bookings_bundle,
+            version_probe=get_bookings_version,
+            soft_ttl=cfg.BOOKINGS_SOFT_TTL,
+            check_interval=cfg.BOOKINGS_VERSION_CHECK_INTERVAL,
+            error_ttl=cfg.BOOKINGS_ERROR_TTL,
+            namespace=f"bookings:{page_id}",
+            warm_start=lambda: snapshot_bundle(snapshot),
+            persist=lambda bundle, version: snapshot.save(bundle["df"], version),
+        ),
+    )
+
+
+@st.cache_resource
+def email_worker(page_id: str = "resource"):
+    """Background delivery of queued confirmation emails (one worker per process)."""
+    _ = page_id  # intentionally keep param to make cache key unique
+    return EmailOutboxWorker(
+        get_engine,
+        lambda to_email, subject, body, cc: send_email(
+            to_email, subject, body, raise_errors=True, cc=cc
+        ),
+        source=page_id,
+        poll_interval=cfg.OUTBOX_POLL_INTERVAL,
+        batch_size=cfg.OUTBOX_BATCH_SIZE,
+        max_attempts=cfg.OUTBOX_MAX_ATTEMPTS,
+        backoff_base=cfg.OUTBOX_BACKOFF_BASE,
+        backoff_max=cfg.OUTBOX_BACKOFF_MAX,
+    ).start()
+
+
+def after_booking():
+    """
+    Reloads bookings on a background thread (the submit never waits on a rebuild; the new booking shows
+    once it lands) and sends its confirmation without waiting for the next poll.
+    """
+    bookings_cache("resource").refresh(force=True)
+    email_worker("resource").wake()
 
 
 with st.spinner("Loading bookings…"):
-    df = load_bookings("resource")
+    try:
+        bookings = bookings_cache("resource").get()  # shared: treat as read-only
+    except BookingsUnavailableError as e:
+        print("load bookings error:", e)
+        st_red_alert(
+            "Booking database is unreachable and no saved snapshot exists yet."
+        )
+        st.stop()
+    df = bookings["df"]
+
+email_worker("resource")  # started once per process; drains queued confirmation emails
+
+db_offline = bookings_cache("resource").degraded
+if db_offline:
+    st.warning(
+        f"⚠️ Booking database is unreachable: showing bookings saved at {bookings['loaded_at']} (read-only)."
+    )
 
 # endregion
 
@@ -136,66 +242,22 @@ with left_col:
 
         # Apply filter for plotting & table.
         # Include ANY of the selected single resource even if DB stores rows as comma-joined strings.
-        if selected_types and "resource_type" in (df.columns if df is not None else []):
-            # Normalize selected types to lower-case trimmed tokens for comparison
-            sel_set = {str(x).strip().lower() for x in selected_types if str(x).strip()}
-
-            def row_matches_any(selected_set, row_val):
-                if row_val is None:
-                    return False
-                # split DB string on commas, strip and lowercase
-                tokens = [
-                    t.strip().lower() for t in str(row_val).split(",") if t.strip()
-                ]
-                if not tokens:
-                    return False
-                return not selected_set.isdisjoint(tokens)
-
-            # Use .apply to keep rows matching any selected resource
-            mask = df["resource_type"].apply(lambda v: row_matches_any(sel_set, v))
-            df = df[mask].copy()
-        else:
-            # Nothing selected OR column missing -> an empty frame to downstream logic
-            df = (
-                df.iloc[0:0].copy()
-                if (df is not None and not df.empty)
-                else (pd.DataFrame() if df is None else df.copy())
-            )
+        selected_types = [str(t).strip() for t in selected_types]
+        df = filter_by_resources(df, bookings["resource_index"], selected_types)
         # --- End Filter ---
 
-        # Serialize filtered df and build cached figure
-        df_json = df.to_json(date_format="iso", orient="split")
-        nrows = len(df)
-        max_created = None
-        if "created_at" in df.columns and not df["created_at"].isna().all():
-            max_created = str(df["created_at"].max())
-
-        # fig, info = build_vertical_day_time_timeline(df) --> using cached version below
-        fig, info = build_timeline_figure_cached(nrows, max_created, df_json)
+        # Compose the timeline from per-resource traces built once per data version,
+        # so changing the filter only selects traces (no re-serialization or rebuild)
+        traces, layout, info = bookings["traces"], bookings["layout"], bookings["info"]
+        fig = (
+            compose_timeline_figure(traces, layout, selected_types) if traces else None
+        )
+        if traces and fig is None:
+            info = {"reason": "no_selected_rows"}
 
         if fig is not None:
-            # creates a fresh display copy so cached figure object is left intact
-            fig_display = go.Figure(fig)
-
-            # Adds a live "Today" marker
-            now_dt = datetime.now()
-            today = now_dt.date()
-            fig_display.add_vline(
-                x=today,
-                line_width=1,
-                line_dash=cfg.LINE_STYLE,
-                line_color=cfg.LINE_COLOR,
-            )
-            fig_display.add_annotation(
-                x=today,
-                y=1,
-                xref="x",
-                yref="paper",
-                text="Today",
-                showarrow=False,
-                font=dict(color=cfg.LINE_COLOR),
-                yanchor="bottom",
-            )
+            # Adds a live "Today" marker on a shallow copy, so the cached figure dict is left intact
+            fig_display = add_today_marker(fig)
 
             st.plotly_chart(fig_display, use_container_width=True)
 
@@ -207,6 +269,10 @@ with left_col:
                 st.error(
                     f"All rows failed to parse times/dates (bad rows: {info.get('bad_count')})."
                 )
+            elif reason == "no_selected_rows":
+                st.info(
+                    "No bookings for the selected resource(s) in the current window."
+                )
             elif reason == "out_of_window":
                 st.warning(
                     f"No bookings in the current (10-days) window."
@@ -222,27 +288,7 @@ with left_col:
     st.subheader("📌 All Existing Bookings")
 
     if not df.empty:
-        st.dataframe(
-            df[
-                [
-                    "booking_date",
-                    "start_time",
-                    "end_time",
-                    "resource_type",
-                    "person_name",
-                    "company_name",
-                    "affiliation",
-                    "email",
-                    "created_at_ist",
-                    "payment_status",
-                    "payment_id",
-                    "payment_date",
-                ]
-            ]
-            .sort_values(by=["booking_date", "start_time"])
-            .reset_index(drop=True),
-            height=cfg.TABLE_HEIGHT,
-        )
+        st.dataframe(bookings_table(df), height=cfg.TABLE_HEIGHT)
     else:
         st.info("No bookings to show in the table yet.")
 
@@ -270,6 +316,8 @@ with left_col:
 
         # Lottie Animation
         with st.container(border=False):
+            from streamlit_lottie import st_lottie
+
             lottie_animation = load_lottiefile("assets/resource_lottie.json")
             if lottie_animation:
                 st_lottie(lottie_animation, speed=1, height=300, key="resource")
@@ -277,7 +325,10 @@ with left_col:
 # Right Column: Booking Form
 with right_col:
 
-    booking_form()
+    booking_form(
+        on_booked=after_booking,
+        read_only=db_offline,
+    )
     if "_flash" in st.session_state:
         flash_message = st.session_state.pop("_flash")
 
@@ -290,9 +341,20 @@ with right_col:
 
 # region Chapter 7: Clear Cache
 
+render_cache_admin()
+render_timing_admin()
+render_query_admin()
+render_memory_admin(bookings["df"])
+
 if st.button("🔄 Clear Cache"):
+    clear_caches()
     st.cache_data.clear()
-    st.cache_resource.clear()
+    # Not st.cache_resource.clear(): that also drops the outbox worker and SMTP pool (of both pages),
+    # orphaning a running worker thread while the next rerun starts a second one on the same outbox
+    bookings_cache.clear()
+    ensure_db.clear()
+    get_engine.clear()
+    get_smtp_pool().close_all()  # idle SMTP sessions reopen on demand
     st.success("All caches cleared. Refreshing the page...")
     time.sleep(3)
     st.rerun()
@@ -311,3 +373,12 @@ if quote_data:
     )
 
 # endregion
+
+
+# region Chapter 9: Rerun timings
+
+st.session_state["_rerun_spans"] = TELEMETRY.end_rerun("resource")
+st.session_state["_rerun_queries"] = QUERIES.end_rerun()
+finish_rerun_trace()
+
+# endregion
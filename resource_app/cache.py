@@ -0,0 +1,613 @@
+# region Chapter 1: Imports
+import functools
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+
+from collections import OrderedDict
+from datetime import date, datetime
+
+import pandas as pd
+
+# endregion
+
+
+# region Chapter 2: Cache registry + size estimate
+
+# namespace -> cache object with .stats() and .clear() (shown on the admin cache panel)
+CACHE_REGISTRY = {}
+
+
+def register_cache(namespace: str, cache):
+    CACHE_REGISTRY[namespace] = cache
+    return cache
+
+
+def clear_caches():
+    """Clears every registered cache namespace (used by the "Clear Cache" button)."""
+    for cache in list(CACHE_REGISTRY.values()):
+        cache.clear()
+
+
+def cache_stats() -> list:
+    return [cache.stats() for cache in list(CACHE_REGISTRY.values())]
+
+
+def estimate_nbytes(value) -> int:
+    """
+    Approximate in-memory size of a cached value.
+    - DataFrames/Series: deep memory_usage; numeric arrays: nbytes.
+    - Small containers (bundles, (fig, info) tuples) are walked; anything else is measured by its pickled size.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if hasattr(value, "nbytes") and getattr(value, "dtype", object) != object:
+        return int(value.nbytes)
+    if isinstance(value, dict) and len(value) <= 64:
+        return sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)) and len(value) <= 64:
+        return sum(estimate_nbytes(v) for v in value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+# endregion
+
+
+# region Chapter 3: Bounded LRU cache
+class LRUCache:
+    """
+    Bounded in-process cache namespace: LRU eviction by entry count and approximate bytes,
+    optional TTL, and hit/miss/eviction counters.
+    Values are shared between sessions (no copy on read) — treat them as read-only.
+    """
+
+    def __init__(self, namespace, max_entries=32, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, nbytes, stored_at)
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def lookup(self, key):
+        """Returns (found, value); a hit marks the entry most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None:
+                if time.monotonic() - entry[2] > self.ttl:
+                    self._drop(key)
+                    self.expirations += 1
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                self.evictions += 1  # larger than the whole budget: don't keep it
+                return
+            self._entries[key] = (value, nbytes, time.monotonic())
+            self._bytes += nbytes
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def items(self) -> list:
+        """[(key, value)] snapshot, for memory reports."""
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "namespace": self.namespace,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def make_cache_key(fn, args, kwargs) -> str:
+    """Compact digest key, so large arguments (e.g. JSON strings) are not kept alive as keys."""
+    raw = pickle.dumps(
+        (fn.__module__, fn.__qualname__, args, sorted(kwargs.items())),
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    return hashlib.sha1(raw).hexdigest()
+
+
+def bounded_cache(
+    namespace, max_entries=32, max_bytes=64 * 1024 * 1024, ttl=None, cache_none=True
+):
+    """
+    Memoizes a function in a registered LRUCache namespace (replaces st.cache_data where memory must stay bounded).
+    - cache_none=False: None results (failures) are returned but not cached.
+    - The wrapper exposes .cache and .clear().
+    """
+    cache = register_cache(namespace, LRUCache(namespace, max_entries, max_bytes, ttl))
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = make_cache_key(fn, args, kwargs)
+            found, value = cache.lookup(key)
+            if found:
+                return value
+            value = fn(*args, **kwargs)
+            if value is not None or cache_none:
+                cache.put(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+# endregion
+
+
+# region Chapter 4: Stale-while-revalidate bookings cache
+class BookingsCache:
+    """
+    Process-wide holder for the bookings frame and everything derived from it (timeline artifacts).
+    - get() returns the last loaded value immediately; when it is older than soft_ttl, from a previous
+      day (timeline window moved) or the DB version probe reports a change, it is reloaded on a
+      background thread. Only a cold start (nothing loaded yet) loads in the caller.
+    - refresh() reloads in the background, e.g. right after this session added a booking; a forced
+      refresh requested while another one runs is queued behind it (that load may predate the write).
+      refresh(wait=True) reloads in the caller.
+    - warm_start() -> (value, version) or None: served on a cold start instead of waiting for the DB
+      (e.g. a local snapshot), then reconciled with the DB in the background.
+    - persist(value, version): called after every successful DB load (e.g. to write that snapshot).
+    - last_error is set while the DB (probe or loader) fails; the last good value keeps being served.
+    - Failures are negative-cached for error_ttl seconds: no reload attempts (and a cold start re-raises
+      the last error) until it expires, so an outage is not hammered by every rerun.
+    """
+
+    def __init__(
+        self,
+        loader,
+        version_probe=None,
+        soft_ttl=15 * 60,
+        check_interval=60,
+        error_ttl=30,
+        namespace="bookings",
+        warm_start=None,
+        persist=None,
+    ):
+        self.namespace = namespace
+        self.loader = loader
+        self.warm_start = warm_start
+        self.persist = persist
+        self.version_probe = version_probe
+        self.soft_ttl = soft_ttl
+        self.check_interval = check_interval
+        self.error_ttl = error_ttl
+        self._refresh_lock = threading.Lock()
+        # guards _refresh_queued and the release of _refresh_lock, so a queued refresh is never dropped
+        self._queue_lock = threading.Lock()
+        self._refresh_queued = False
+        self._value = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._loaded_day = None
+        self._checked_at = 0.0
+        self.source = None  # "db" or "snapshot"
+        self.last_error = None
+        self._failure = None  # last exception, negative-cached for error_ttl
+        self._failed_at = 0.0
+        self.hits = self.misses = self.refreshes = self.errors = 0
+
+    def get(self):
+        if self._value is None:
+            self.misses += 1
+            # cold start: nothing to serve yet, concurrent callers wait for a single load
+            self._refresh_lock.acquire()
+            try:
+                if self._value is None and not self._warm_start():
+                    if self._failing():
+                        raise self._failure
+                    self._load(self._probe())
+            finally:
+                self._release_refresh()
+            if self.source == "snapshot":
+                # reconcile with the DB off the request path (reload only if the version moved)
+                self.refresh(force=self.version_probe is None or self._version is None)
+            return self._value
+
+        self.hits += 1
+        now = time.monotonic()
+        stale = (
+            now - self._loaded_at > self.soft_ttl or self._loaded_day != date.today()
+        )
+        check_due = (
+            self.version_probe is not None
+            and now - self._checked_at > self.check_interval
+        )
+        if (stale or check_due) and not self._failing():
+            self.refresh(force=stale)
+        return self._value
+
+    def refresh(self, force=True, wait=False):
+        """Reloads the value (force) or only if the version probe changed; background unless wait=True."""
+        if wait:
+            self._refresh_lock.acquire()
+            self._revalidate(force)
+            return
+        with self._queue_lock:
+            if not self._refresh_lock.acquire(blocking=False):
+                # a refresh is already running; a forced one runs again after it
+                self._refresh_queued = self._refresh_queued or force
+                return
+        self._revalidate_in_background(force)
+
+    def _revalidate_in_background(self, force):
+        threading.Thread(
+            target=self._revalidate,
+            args=(force,),
+            name="bookings-refresh",
+            daemon=True,
+        ).start()
+
+    def _release_refresh(self):
+        """Releases _refresh_lock, or hands it on to a forced refresh queued while it was held."""
+        with self._queue_lock:
+            queued, self._refresh_queued = self._refresh_queued, False
+            if not queued:
+                self._refresh_lock.release()
+                return
+        self._revalidate_in_background(True)
+
+    def _revalidate(self, force):
+        try:
+            version = self._probe()
+            self._checked_at = time.monotonic()
+            if force or (version is not None and version != self._version):
+                self._load(version)
+                self.refreshes += 1
+        except Exception as e:
+            self.errors += 1
+            print("BookingsCache refresh error:", e)
+        finally:
+            self._release_refresh()
+
+    def _probe(self):
+        if self.version_probe is None:
+            return None
+        try:
+            version = self.version_probe()
+        except Exception as e:
+            print("BookingsCache version probe error:", e)
+            self._fail(e)
+            return None
+        self.last_error = self._failure = None
+        return version
+
+    def _warm_start(self) -> bool:
+        if self.warm_start is None:
+            return False
+        try:
+            warm = self.warm_start()
+        except Exception as e:
+            print("BookingsCache warm start error:", e)
+            return False
+        if warm is None:
+            return False
+        value, version = warm
+        self._set(value, version, source="snapshot")
+        return True
+
+    def _load(self, version):
+        try:
+            value = self.loader()
+        except Exception as e:
+            self._fail(e)
+            raise
+        self.last_error = self._failure = None
+        self._set(value, version, source="db")
+        if self.persist is not None:
+            try:
+                self.persist(value, version)
+            except Exception as e:
+                print("BookingsCache persist error:", e)
+
+    def _set(self, value, version, source):
+        self._value = value
+        self._version = version
+        self.source = source
+        self._loaded_at = self._checked_at = time.monotonic()
+        self._loaded_day = date.today()
+
+    def _fail(self, error):
+        self.last_error = str(error)
+        self._failure = error
+        self._failed_at = time.monotonic()
+
+    def _failing(self) -> bool:
+        return (
+            self._failure is not None
+            and time.monotonic() - self._failed_at < self.error_ttl
+        )
+
+    @property
+    def degraded(self) -> bool:
+        """True while serving a value the DB could not confirm (DB unreachable)."""
+        return self.last_error is not None
+
+    def clear(self):
+        """Drops the value; the next get() loads again (cold start)."""
+        self._value = None
+
+    def items(self) -> list:
+        return [] if self._value is None else [(self.source, self._value)]
+
+    def stats(self) -> dict:
+        value = self._value
+        return {
+            "namespace": self.namespace,
+            "entries": int(value is not None),
+            "max_entries": 1,
+            "bytes": estimate_nbytes(value) if value is not None else 0,
+            "max_bytes": None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": 0,
+            "expirations": 0,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.errors,
+            "source": self.source,
+        }
+
+
+# endregion
+
+
+# region Chapter 5: On-disk bookings snapshot
+class BookingsSnapshot:
+    """
+    Latest bookings frame as a local Parquet file (written atomically), so a restart can serve
+    bookings in milliseconds and an unreachable DB still leaves a read-only view.
+    - The DB version and save time travel in the Parquet schema metadata.
+    """
+
+    META_KEY = b"bookings_snapshot"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def save(self, df: pd.DataFrame, version=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        meta = dict(table.schema.metadata or {})
+        meta[self.META_KEY] = json.dumps(
+            {
+                "version": list(version) if version is not None else None,
+                "saved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "rows": len(df),
+            }
+        ).encode("utf-8")
+        table = table.replace_schema_metadata(meta)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path)  # readers never see a half-written file
+
+    def load(self):
+        """Returns (df, meta) or None when there is no readable snapshot."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(self.path)
+            raw = (table.schema.metadata or {}).get(self.META_KEY)
+            meta = json.loads(raw) if raw else {}
+            if meta.get("version") is not None:
+                meta["version"] = tuple(meta["version"])
+            # Arrow-backed columns, as the bookings frame is cached (no per-column conversion)
+            return table.to_pandas(types_mapper=pd.ArrowDtype), meta
+        except Exception as e:
+            print("BookingsSnapshot load error:", e)
+            return None
+
+
+# endregion
+
+
+# region Chapter 6: File asset registry
+class FileAssetCache:
+    """
+    Process-level cache of values derived from files on disk (logo data-URI, page icon, Lottie JSON).
+    - Each (loader, path, args) is loaded once and kept until the file's mtime or size changes,
+      so reruns only pay for an os.stat().
+    - A loader that raises is not cached; the error reaches the caller.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (value, nbytes, (mtime_ns, size))
+        self.hits = self.misses = self.reloads = 0
+
+    def get(self, path, loader, *args):
+        st_ = os.stat(path)
+        stamp = (st_.st_mtime_ns, st_.st_size)
+        key = (loader.__module__, loader.__qualname__, os.path.abspath(path), args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == stamp:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            if entry is not None:
+                self.reloads += 1
+
+        value = loader(path, *args)
+        with self._lock:
+            self._entries[key] = (value, estimate_nbytes(value), stamp)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> list:
+        with self._lock:
+            return [
+                (os.path.basename(key[2]), entry[0])
+                for key, entry in self._entries.items()
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "namespace": self.namespace,
+                "entries": len(self._entries),
+                "bytes": sum(nbytes for _, nbytes, _ in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+            }
+
+
+ASSETS = register_cache("assets", FileAssetCache("assets"))
+
+
+def file_asset(loader):
+    """Decorator: loader(path, *args) is served from ASSETS, keyed by the file's mtime."""
+
+    @functools.wraps(loader)
+    def wrapper(path, *args):
+        return ASSETS.get(path, loader, *args)
+
+    wrapper.loader = loader
+    return wrapper
+
+
+# endregion
+
+
+# region Chapter 7: Memory report
+def is_figure(value) -> bool:
+    """A Plotly figure dict ({"data", "layout"}) or a {name: trace dict} mapping of prebuilt traces."""
+    if not isinstance(value, dict) or not value:
+        return False
+    if "data" in value and "layout" in value:
+        return True
+    return all(isinstance(v, dict) and "type" in v for v in value.values())
+
+
+def serialized_nbytes(value) -> int:
+    """Bytes of the JSON Plotly would send to the browser (numpy arrays included)."""
+    from plotly.io.json import to_json_plotly
+
+    return len(to_json_plotly(value))
+
+
+def describe_value(namespace: str, key: str, value) -> list:
+    """
+    Report rows for one cached value; a bundle (dict holding frames/figures) gets one row per part.
+    - frames: rows and deep memory_usage; figures: estimated in-memory bytes and serialized size.
+    """
+    parts = {"": value}
+    if isinstance(value, dict) and not is_figure(value):
+        if any(isinstance(v, pd.DataFrame) or is_figure(v) for v in value.values()):
+            parts = value
+    return [describe_part(namespace, key, part, item) for part, item in parts.items()]
+
+
+def describe_part(namespace: str, key: str, part: str, value) -> dict:
+    row = {"namespace": namespace, "key": str(key)[:60], "part": part, "rows": None}
+    if isinstance(value, pd.DataFrame):
+        row.update(kind="frame", rows=len(value), bytes=estimate_nbytes(value))
+        row["serialized_bytes"] = None
+    elif is_figure(value):
+        row.update(kind="figure", bytes=estimate_nbytes(value))
+        row["serialized_bytes"] = serialized_nbytes(value)
+    else:
+        row.update(kind=type(value).__name__, bytes=estimate_nbytes(value))
+        row["serialized_bytes"] = None
+    return row
+
+
+def memory_report() -> list:
+    """Every value held by the registered caches, largest first (see describe_value)."""
+    rows = []
+    for namespace, cache in list(CACHE_REGISTRY.items()):
+        items = cache.items() if hasattr(cache, "items") else []
+        for key, value in items:
+            rows += describe_value(namespace, key, value)
+    return sorted(rows, key=lambda r: -r["bytes"])
+
+
+def frame_columns(df: pd.DataFrame) -> list:
+    """Per column: dtype and deep bytes (where a frame's memory goes)."""
+    usage = df.memory_usage(deep=True, index=False)
+    return [
+        {"column": col, "dtype": str(df[col].dtype), "bytes": int(usage[col])}
+        for col in df.columns
+    ]
+
+
+def short_path(filename: str) -> str:
+    """Library files relative to site-packages, app files relative to the working directory."""
+    _, sep, tail = filename.rpartition("site-packages" + os.sep)
+    return tail if sep else os.path.relpath(filename)
+
+
+def top_allocations(snapshot, top: int = 15) -> list:
+    """tracemalloc snapshot -> the `top` source lines holding the most memory."""
+    stats = snapshot.filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    ).statistics("lineno")
+    return [
+        {
+            "location": f"{short_path(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+            "KiB": round(s.size / 1024, 1),
+            "blocks": s.count,
+        }
+        for s in stats[:top]
+    ]
+
+
+# endregion
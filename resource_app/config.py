@@ -4,6 +4,16 @@ from datetime import datetime, date, timedelta
 DB_NAME = "bookings.db"
 
 
+def secret_flag(key, default=False) -> bool:
+    """Boolean secret; strings (e.g. from environment variables) count as true only for 1/true/yes/on."""
+    value = st.secrets.get(key, default)
+    return (
+        value
+        if isinstance(value, bool)
+        else str(value).strip().lower() in ("1", "true", "yes", "on")
+    )
+
+
 def get_timeline_start():
     """Returns timeline start dynamically (1 day ago at midnight)"""
     _now = datetime.now()
@@ -29,6 +39,70 @@ TIMELINE_END = (_NOW + timedelta(days=10)).replace(
 )
 
 
+# Bookings cache (stale-while-revalidate)
+# Cached bookings are served immediately and refreshed in the background once older than
+# the soft TTL; the DB is probed for new bookings at most once per check interval.
+BOOKINGS_SOFT_TTL = 15 * 60  # 15 min
+BOOKINGS_VERSION_CHECK_INTERVAL = 60  # 1 min
+BOOKINGS_ERROR_TTL = (
+    30  # 30 s: failed loads are not retried (negative cache) until this passes
+)
+
+# DB retries for transient errors (exponential backoff with jitter)
+DB_RETRY_ATTEMPTS = int(st.secrets.get("db_retry_attempts", 3))
+DB_RETRY_MAX_WAIT = float(st.secrets.get("db_retry_max_wait", 2))  # seconds
+
+# DB timeout budgets (seconds; max_execution_ms is the server-side limit for the conflict check SELECT,
+# not the bulk bookings load; 0 disables it)
+DB_TIMEOUTS = {
+    "connect": int(st.secrets.get("db_connect_timeout", 5)),
+    "read": int(st.secrets.get("db_read_timeout", 15)),
+    "write": int(st.secrets.get("db_write_timeout", 15)),
+    "lock_wait": int(st.secrets.get("db_lock_wait_timeout", 5)),
+    "max_execution_ms": int(st.secrets.get("db_max_execution_ms", 10_000)),
+}
+# Last good bookings frame on local disk: instant cold start, read-only view during DB outages
+BOOKINGS_SNAPSHOT_PATH = st.secrets.get(
+    "resource_snapshot_path", ".cache/resource_bookings.parquet"
+)
+
+# In-process cache budgets (LRU per namespace; bytes are approximate)
+_MB = 1024 * 1024
+CACHE_BUDGETS = {
+    "quotes": {"max_entries": 1, "max_bytes": 1 * _MB, "ttl": 24 * 60 * 60},  # 1 day
+}
+
+# Lottie animations: decimals kept in keyframe values when optimizing at runtime (lottie_build.py --precision)
+LOTTIE_PRECISION = 3
+
+# Admin views (cache panel): usernames from cred.yaml, or ?admin=<token> when auth is off
+ADMIN_USERS = list(st.secrets.get("admin_users", []))
+ADMIN_TOKEN = st.secrets.get("admin_token")
+
+# Hot-path timings (telemetry.py): off unless telemetry_enabled = true in secrets; admins see the
+# rolling histograms, and each rerun can be exported as a JSON line and/or a Prometheus textfile
+TELEMETRY_ENABLED = secret_flag("telemetry_enabled", False)
+TELEMETRY_WINDOW = 500  # most recent durations kept per span (percentiles)
+TELEMETRY_JSONL_PATH = st.secrets.get("telemetry_jsonl_path")
+TELEMETRY_PROM_PATH = st.secrets.get(
+    "telemetry_prom_path"
+)  # e.g. node_exporter's textfile dir
+TELEMETRY_EXPORT_INTERVAL = 15  # s between Prometheus textfile rewrites
+
+# SQL query profiler (telemetry.py): per-statement and per-rerun query counts/timings plus a slow-query
+# log (statement + parameter shapes, never values); off unless query_profiler_enabled = true in secrets
+QUERY_PROFILER_ENABLED = secret_flag("query_profiler_enabled", False)
+SLOW_QUERY_MS = int(st.secrets.get("slow_query_ms", 200))
+SLOW_QUERY_ROWS = 50_000  # also log statements returning more rows (unbounded SELECTs)
+SLOW_QUERY_LOG_PATH = st.secrets.get("slow_query_log_path")
+
+# Email outbox: confirmations are queued with the booking and sent by a background worker
+OUTBOX_POLL_INTERVAL = 30  # s
+OUTBOX_BATCH_SIZE = 20
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BACKOFF_BASE = 30  # s, doubled per failed attempt
+OUTBOX_BACKOFF_MAX = 60 * 60  # 1 hour
+
 # Visual Styles
 GRAPH_HEIGHT = 400
 TABLE_HEIGHT = 250
@@ -40,12 +114,26 @@ SMTP_HOST = st.secrets.get("smtp_host")
 SMTP_PORT = int(st.secrets.get("smtp_port") or 587)
 SMTP_USER = st.secrets.get("email_user")
 SMTP_PASS = st.secrets.get("email_pass")
+SMTP_STARTTLS = secret_flag("smtp_starttls", True)  # False only for a local sink
+SMTP_TIMEOUT = 20  # s, per SMTP socket operation
 PRIMARY_CONTACT = st.secrets.get("primary_contact_for_resource")
 SECONDARY_CONTACT = st.secrets.get("secondary_contact_for_resource")
 CC_EMAILS = st.secrets[
     "cc_emails_for_resource"
 ]  # must contain at least two email addresses"
 
+# CC each confirmation (set cc_each_confirmation = false once the daily digest job is scheduled)
+CC_EACH_CONFIRMATION = secret_flag("cc_each_confirmation", True)
+
+# Reminder / digest batch job (python -m <app>.reminders)
+REMINDER_LEAD_HOURS = 24  # remind bookings starting within this many hours
+REMINDER_CHUNK_SIZE = 500  # bookings per query chunk (bounded memory)
+
+# SMTP session pool (reused across confirmations, reminders and digests)
+SMTP_POOL_SIZE = 2
+SMTP_IDLE_TIMEOUT = 60  # s; most servers drop idle clients after a few minutes
+SMTP_MAX_AGE = 10 * 60  # s
+
 
 # Resources
 
@@ -1,24 +1,47 @@
 # region Chapter 1: Imports
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import base64
-import plotly.graph_objects as go
 import tempfile, os
 import re
 import smtplib
 import datetime as _dt
-import json
-import requests
+import copy
+import threading
+import tracemalloc
 
-from io import StringIO
+# plotly.graph_objects, requests and PIL are imported where used (see import_bench.py)
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta, date, time as dtime
 from pathlib import Path
 from email.mime.text import MIMEText
 from sqlalchemy import create_engine, text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, OperationalError, InterfaceError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
 # Custom Modules
 from resource_app import config as cfg
+from resource_app.cache import (
+    bounded_cache,
+    cache_stats,
+    file_asset,
+    frame_columns,
+    memory_report,
+    top_allocations,
+)
+from resource_app.lottie_optimizer import load_optimized_lottie
+from resource_app.outbox import OUTBOX_TABLE_SQL, enqueue_email
+from resource_app.smtp_pool import SMTPPool
+from resource_app.telemetry import QUERIES, TELEMETRY, timed
 from resource_app.config import (
     resource_list,
     resource_color_map,
@@ -30,6 +53,22 @@ from resource_app.config import (
 
 
 # region Chapter 2: Initialise MySQL connection
+# Hot-path timings and SQL profiling (shared by all sessions of this process; no-op unless enabled in secrets)
+TELEMETRY.configure(
+    cfg.TELEMETRY_ENABLED,
+    window=cfg.TELEMETRY_WINDOW,
+    jsonl_path=cfg.TELEMETRY_JSONL_PATH,
+    prom_path=cfg.TELEMETRY_PROM_PATH,
+    export_interval=cfg.TELEMETRY_EXPORT_INTERVAL,
+)
+QUERIES.configure(
+    cfg.QUERY_PROFILER_ENABLED,
+    slow_ms=cfg.SLOW_QUERY_MS,
+    max_rows=cfg.SLOW_QUERY_ROWS,
+    log_path=cfg.SLOW_QUERY_LOG_PATH,
+)
+
+
 @st.cache_resource
 def get_engine():
     user = st.secrets.get("mysql_user")
@@ -52,14 +91,81 @@ def get_engine():
     else:
         ssl_args = {}
 
+    # Timeout budgets: client-side socket timeouts (PyMySQL) + a server-side lock-wait limit, so a slow
+    # or locked MySQL fails fast with OperationalError instead of hanging the script thread. The SELECT
+    # time limit is per statement (max_execution_hint), so bulk loads are not cut off by it.
+    timeouts = cfg.DB_TIMEOUTS
+    connect_args = {
+        **ssl_args,
+        "connect_timeout": timeouts["connect"],
+        "read_timeout": timeouts["read"],
+        "write_timeout": timeouts["write"],
+        "init_command": f"SET SESSION innodb_lock_wait_timeout={int(timeouts['lock_wait'])}",
+    }
+
     db_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{dbname}?charset=utf8mb4"
-    return create_engine(db_url, connect_args=ssl_args, pool_pre_ping=True)
+    engine = create_engine(
+        db_url,
+        connect_args=connect_args,
+        pool_pre_ping=True,
+        pool_timeout=timeouts["connect"],
+    )
+    return QUERIES.attach(engine)
+
+
+# Transient DB errors (lost/refused connection, server gone away, pool timeout) are retried
+# with jittered exponential backoff; anything else fails on the first attempt.
+TRANSIENT_DB_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError)
+
+db_retry = retry(
+    retry=retry_if_exception_type(TRANSIENT_DB_ERRORS),
+    stop=stop_after_attempt(cfg.DB_RETRY_ATTEMPTS),
+    wait=wait_random_exponential(multiplier=0.25, max=cfg.DB_RETRY_MAX_WAIT),
+    reraise=True,
+)
+
+
+class BookingLockTimeoutError(SQLAlchemyError):
+    """Another submit held the date's booking lock past lock_wait (not retried; the form asks to try again)."""
+
+
+def max_execution_hint() -> str:
+    """
+    Optimizer hint capping one interactive SELECT (the booking form's conflict check) at
+    DB_TIMEOUTS["max_execution_ms"]; goes right after SELECT. Other databases read it as a comment.
+    """
+    ms = int(cfg.DB_TIMEOUTS["max_execution_ms"])
+    return f"/*+ MAX_EXECUTION_TIME({ms}) */ " if ms else ""
+
+
+# MySQL/PyMySQL error codes for: lock wait timeout, lost connection (read timeout), max_execution_time hit
+DB_TIMEOUT_CODES = {1205, 2013, 3024}
+
+
+def is_db_timeout(e) -> bool:
+    orig = getattr(e, "orig", None)
+    code = orig.args[0] if orig is not None and orig.args else None
+    return (
+        code in DB_TIMEOUT_CODES
+        or isinstance(e, PoolTimeoutError)
+        or "timed out" in str(e).lower()
+    )
+
+
+def db_error_message(e) -> str:
+    """User-facing (degraded mode) message for a failed DB step in the booking form."""
+    if isinstance(e, BookingLockTimeoutError):
+        return "⏳ Another booking for this date is being saved. Your booking was not saved, please try again."
+    if is_db_timeout(e):
+        return "⏳ The booking database did not respond in time. Your booking was not saved, please try again."
+    return "⚠️ The booking database is unreachable. Your booking was not saved, please try again later."
 
 
 # endregion
 
 
 # region  Chapter 3: Initialise MySQL database
+@timed("init_db")
 def init_db():
     engine = get_engine()
     create_table_sql = """
@@ -84,6 +190,7 @@ def init_db():
     try:
         with engine.begin() as conn:
             conn.execute(text(create_table_sql))
+            conn.execute(text(OUTBOX_TABLE_SQL))
             # create index if missing
             schema = st.secrets.get("mysql_db") or engine.url.database
             idx_check = text(
@@ -101,6 +208,7 @@ def init_db():
 
 
 # region Chapter 4: Add Booking function
+@timed("add_booking")
 def add_booking(
     booking_date: date,
     start_time: dtime,
@@ -110,9 +218,14 @@ def add_booking(
     company_name: str,
     affiliation: str,
     email: str,
+    confirmation=None,
+    conn=None,
 ):
     """
     Inserts python date/time objects directly - SQLAlchemy will bind them to DATE/TIME.
+    - confirmation: optional (subject, body) queued in email_outbox in the same transaction.
+    - conn: run on this connection inside the caller's transaction (booking_lock commits it); otherwise in
+      a transaction of its own.
     """
     engine = get_engine()
     insert_sql = text(
@@ -133,8 +246,12 @@ def add_booking(
         "email": email,
     }
     try:
-        with engine.begin() as conn:
+        with nullcontext(conn) if conn is not None else engine.begin() as conn:
             conn.execute(insert_sql, params)
+            if confirmation is not None:
+                subject, body = confirmation
+                cc = cfg.CC_EMAILS if cfg.CC_EACH_CONFIRMATION else None
+                enqueue_email(conn, "resource", email, subject, body, cc=cc)
     except SQLAlchemyError as e:
         print("add_booking error:", e)
         raise
@@ -144,9 +261,31 @@ def add_booking(
 
 
 # region Chapter 5: Get Bookings function
-def get_bookings() -> pd.DataFrame:
+class BookingsUnavailableError(RuntimeError):
+    """Bookings could not be read from the DB (after retries); callers keep their last good frame."""
+
+
+@db_retry
+def read_sql_with_retry(sql, engine) -> pd.DataFrame:
+    """
+    Query rows straight into Arrow arrays: pyarrow infers date/duration/timestamp/string columns from the
+    DB-API values, and the frame wraps those arrays (no object columns or pandas type inference in between).
+    """
+    with engine.connect() as conn:
+        result = conn.execute(text(sql))
+        names = list(result.keys())
+        rows = result.fetchall()
+    columns = zip(*rows) if rows else [[] for _ in names]
+    table = pa.table([pa.array(column) for column in columns], names=names)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+@timed("get_bookings")
+def get_bookings(raise_errors: bool = False) -> pd.DataFrame:
     """
     Returns a dataframe of bookings. Assumes rows were inserted from the controlled streamlit form (date/time objects).
+    - Transient DB errors are retried (db_retry).
+    - raise_errors=True raises BookingsUnavailableError instead of returning an empty frame (so cached/snapshot data is kept).
     """
     engine = get_engine()
     sql = """
@@ -156,10 +295,12 @@ def get_bookings() -> pd.DataFrame:
         ORDER BY booking_date ASC, start_time ASC, id ASC
     """
     try:
-        df = pd.read_sql_query(sql, con=engine)
+        df = read_sql_with_retry(sql, engine)
     except Exception as e:
         print("get_bookings() sql error:", e)
-        return pd.DataFrame(
+        if raise_errors:
+            raise BookingsUnavailableError(f"get_bookings: {e}") from e
+        empty = pd.DataFrame(
             columns=[
                 "id",
                 "booking_date",
@@ -176,7 +317,88 @@ def get_bookings() -> pd.DataFrame:
                 "payment_date",
             ]
         )
+        return normalize_bookings(empty)
+
+    return normalize_bookings(df)
+
+
+# Typed, Arrow-backed bookings frame (normalize_bookings): every column is a pyarrow array, so the cache,
+# the Parquet snapshot and st.dataframe take it without conversion. Repeated text is dictionary-encoded,
+# times are time32[s], dates date32 and created_at a UTC timestamp.
+CATEGORY_COLUMNS = ["resource_type", "company_name", "affiliation", "payment_status"]
+TEXT_COLUMNS = ["person_name", "email", "payment_id"]
+DATE_COLUMNS = ["booking_date", "payment_date"]
+TIME_COLUMNS = ["start_time", "end_time"]
+
+ID_DTYPE = pd.ArrowDtype(pa.int64())
+CATEGORY_DTYPE = pd.ArrowDtype(pa.dictionary(pa.int32(), pa.string()))
+TEXT_DTYPE = pd.ArrowDtype(pa.string())
+DATE_DTYPE = pd.ArrowDtype(pa.date32())
+TIME_DTYPE = pd.ArrowDtype(pa.time32("s"))
+TIMESTAMP_DTYPE = pd.ArrowDtype(pa.timestamp("us", tz="UTC"))
+
+
+def to_times(values: pd.Series) -> pd.Series:
+    """
+    Times -> Arrow time32[s] (null when unparsable).
+    Accepts Arrow times/durations (PyMySQL TIME), timedeltas, datetime.time, 'HH:MM[:SS]' / '0 days HH:MM:SS'
+    strings or seconds since midnight.
+    """
+    arrow_type = getattr(values.dtype, "pyarrow_dtype", None)
+    if arrow_type is not None and pa.types.is_time(arrow_type):
+        return values.astype(TIME_DTYPE)
+    if arrow_type is not None and pa.types.is_duration(arrow_type):
+        seconds = values.dt.total_seconds()
+    elif pd.api.types.is_numeric_dtype(values):
+        seconds = values
+    elif pd.api.types.is_timedelta64_dtype(values):
+        seconds = values.dt.total_seconds()
+    else:
+        # Parse each distinct string once: bookings repeat a few dozen slot times
+        codes, uniques = pd.factorize(values)
+        s = (
+            pd.Series(uniques, dtype="string")
+            .str.strip()
+            .str.replace(".", ":", regex=False)
+        )
+        s = s.where(s.str.count(":") != 1, s + ":00")
+        parsed = pd.to_timedelta(s, errors="coerce").dt.total_seconds()
+        seconds = parsed.reindex(codes).set_axis(values.index)
+    return seconds.round().astype(pd.ArrowDtype(pa.int32())).astype(TIME_DTYPE)
+
+
+def to_dates(values: pd.Series) -> pd.Series:
+    """Dates -> Arrow date32 (null when unparsable)."""
+    try:
+        # date objects, timestamps and 'YYYY-MM-DD' strings cast directly
+        return values.astype(DATE_DTYPE)
+    except (TypeError, ValueError, pa.ArrowException):
+        return pd.to_datetime(values, errors="coerce").dt.normalize().astype(DATE_DTYPE)
+
+
+def to_categories(values: pd.Series) -> pd.Series:
+    """Text -> dictionary-encoded Arrow strings (int32 indices)."""
+    arrow_type = getattr(values.dtype, "pyarrow_dtype", None)
+    if arrow_type is not None and arrow_type != pa.string():
+        # pandas' astype treats dictionary dtypes as equal whatever their index/value types: decode first
+        values = values.astype(TEXT_DTYPE)
+    return values.astype(CATEGORY_DTYPE)
 
+
+def to_timestamps(values: pd.Series) -> pd.Series:
+    """Timestamps -> Arrow timestamp[us, UTC]; naive values are taken as UTC (null when unparsable)."""
+    arrow_type = getattr(values.dtype, "pyarrow_dtype", None)
+    if arrow_type is not None and pa.types.is_timestamp(arrow_type):
+        return values.astype(TIMESTAMP_DTYPE)
+    return pd.to_datetime(values, utc=True, errors="coerce").astype(TIMESTAMP_DTYPE)
+
+
+def normalize_bookings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Post-processing of the raw bookings query (get_bookings), kept DB-free so it can be benchmarked:
+    missing columns are added and every column becomes Arrow-backed (see CATEGORY_COLUMNS / TEXT_COLUMNS /
+    DATE_COLUMNS / TIME_COLUMNS). Idempotent, so typed frames and older snapshots both come out the same.
+    """
     expected_cols = [
         "id",
         "booking_date",
@@ -196,72 +418,43 @@ def get_bookings() -> pd.DataFrame:
         if c not in df.columns:
             df[c] = None
 
-    if "created_at" in df.columns:
-        try:
-            # Ensure created_at is timezone-aware UTC
-            df["created_at"] = pd.to_datetime(df["created_at"], utc=True)
-
-            # Add a new column with IST time
-            df["created_at_ist"] = (
-                df["created_at"]
-                .dt.tz_convert("Asia/Kolkata")
-                .dt.tz_localize(None)  # drop tz info, keep clean local datetime
-            )
-        except Exception as e:
-            print("created_at IST conversion error:", e)
-
-    # Converts start_time/end_time to strings 'HH:MM:SS' for consistent downstream use (plotting & tooltip)
-    def to_hhmmss(v):
-        # use module alias _dt (imported at top) to access timedelta safely
-        if pd.isna(v):
-            return None
-
-        # pandas Timedelta or datetime.timedelta (use _dt.timedelta)
-        if isinstance(v, (pd.Timedelta, _dt.timedelta)):
-            total_seconds = int(pd.Timedelta(v).total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
-        # datetime.time or datetime.datetime
-        if hasattr(v, "strftime") and not isinstance(v, str):
-            return v.strftime("%H:%M:%S")
-
-        s = str(v).strip()
-        s = s.replace(".", ":")
-        # If format like '0 days HH:MM:SS', takes last token
-        if "days" in s:
-            parts = s.split()
-            s = parts[-1]
-
-        parts = s.split(":")
-        if len(parts) == 2:
-            return f"{int(parts[0]):02d}:{int(parts[1]):02d}:00"
-
-        # Fallback: tries parsing with pandas datetime
-        try:
-            t = pd.to_datetime(s, errors="coerce")
-            if not pd.isna(t):
-                return t.strftime("%H:%M:%S")
-        except Exception:
-            pass
-
-        return s
-
-    df["start_time"] = df["start_time"].apply(to_hhmmss)
-    df["end_time"] = df["end_time"].apply(to_hhmmss)
-    return df
+    df["id"] = df["id"].astype(ID_DTYPE)
+    for c in DATE_COLUMNS:
+        df[c] = to_dates(df[c])
+    for c in TIME_COLUMNS:
+        df[c] = to_times(df[c])
+    # Stored in UTC; shown in IST by bookings_table
+    df["created_at"] = to_timestamps(df["created_at"])
+    for c in CATEGORY_COLUMNS:
+        df[c] = to_categories(df[c])
+    for c in TEXT_COLUMNS:
+        df[c] = df[c].astype(TEXT_DTYPE)
+    return df.drop(columns=["created_at_ist"], errors="ignore")
+
+
+@db_retry
+def get_bookings_version():
+    """
+    Cheap data-version probe (row count, max id, max created_at) used to decide when cached bookings are outdated.
+    Note: in-place UPDATEs don't change it; the soft TTL covers those.
+    """
+    engine = get_engine()
+    sql = text("SELECT COUNT(*), MAX(id), MAX(created_at) FROM resource_bookings")
+    with engine.connect() as conn:
+        row = conn.execute(sql).one()
+    return tuple(str(v) for v in row)
 
 
 # endregion
 
 
 # region Chapter 6: Check Conflict function
-def check_conflict(booking_date, start_time, end_time, requested_resources):
+@timed("check_conflict")
+def check_conflict(booking_date, start_time, end_time, requested_resources, conn=None):
     """
     Checks overlaps for the same date *only* for rows that share at least one resource.
     - requested_resources may be a list of strings or a single comma-joined string.
+    - conn: run on this connection (booking_lock's) instead of checking one out.
     Returns (bool_conflict, details_or_None)
     """
     # Normalize requested_resources into a set of trimmed lowercase tokens
@@ -287,31 +480,32 @@ def check_conflict(booking_date, start_time, end_time, requested_resources):
         return True, "End time must be after start time."
 
     sql = text(
-        """
-        SELECT booking_date, start_time, end_time, resource_type, person_name, company_name
+        f"""
+        SELECT {max_execution_hint()}booking_date, start_time, end_time, resource_type, person_name, company_name
         FROM resource_bookings
         WHERE booking_date = :bdate
     """
     )
 
     try:
-        with engine.connect() as conn:
+        with nullcontext(conn) if conn is not None else engine.connect() as conn:
             rows = conn.execute(sql, {"bdate": booking_date}).mappings().all()
     except Exception as e:
         print("check_conflict DB error:", e)
-        return False, None
-
-    for r in rows:
-        # Parse stored resource_type CSV into a set of tokens (lowercased)
-        raw = r.get("resource_type") or ""
-        existing_set = {t.strip().lower() for t in str(raw).split(",") if t.strip()}
-
-        # If no intersection, skip this row (different resources)
-        if req_set and existing_set and req_set.isdisjoint(existing_set):
+        raise  # fail closed: booking_form reports the DB error instead of skipping the check
+
+    # Rows sharing at least one requested resource, read off the same multi-hot resource index the
+    # page filter and timeline use. Rows without any resource tokens (or an empty request) are kept
+    # as potential conflicts (conservative).
+    raw_types = pd.Series([r.get("resource_type") for r in rows], dtype=object)
+    req_cols = sorted(req_set)
+    shared = build_resource_index(raw_types, req_cols)
+    no_tokens = ~raw_types.fillna("").astype(str).str.contains(r"[^,\s]", regex=True)
+    candidates = (shared.any(axis=1) | no_tokens) if req_cols else no_tokens | True
+
+    for i, r in enumerate(rows):
+        if not candidates.iat[i]:
             continue
-        # If both sets empty, treat as potential conflict (conservative)
-        # If req_set empty (shouldn't happen since form validates), treat as potential conflict
-        # Proceed to time overlap check
 
         db_start = r.get("start_time")
         db_end = r.get("end_time")
@@ -365,10 +559,17 @@ def check_conflict(booking_date, start_time, end_time, requested_resources):
         if new_start < exist_end and new_end > exist_start:
             # build details showing which resource(s) intersected
             intersect = (
-                ", ".join(sorted(req_set.intersection(existing_set)))
-                if req_set and existing_set
-                else (", ".join(sorted(existing_set)) if existing_set else "")
+                ", ".join(shared.columns[shared.iloc[i].to_numpy(dtype=bool)])
+                if req_cols
+                else ""
             )
+            if not intersect:
+                raw = r.get("resource_type") or ""
+                intersect = ", ".join(
+                    sorted(
+                        {t.strip().lower() for t in str(raw).split(",") if t.strip()}
+                    )
+                )
             details = (
                 f"Existing booking for [{intersect or r.get('resource_type','')}] "
                 f"by [{r.get('person_name','')} ({r.get('company_name','')})] "
@@ -379,45 +580,53 @@ def check_conflict(booking_date, start_time, end_time, requested_resources):
     return False, None
 
 
-# endregion
+# Serialises check_conflict + add_booking per booking date, so sessions submitting the same free slot
+# at once can't both pass the check (found by load_test.py): a striped thread lock (hash of the date, a fixed
+# set) for the sessions of this process, plus a MySQL named lock (GET_LOCK) for other app processes on the
+# same database. The named lock, the conflict SELECT and the INSERT share one pooled connection, and the
+# insert is committed before the named lock is released. load_test.py runs on SQLite, so the GET_LOCK
+# branch is only exercised against MySQL.
+BOOKING_LOCK_STRIPES = 64
+_booking_locks = [threading.Lock() for _ in range(BOOKING_LOCK_STRIPES)]
 
 
-# region Chapter 7: Fractional Hours functions
-def to_fractional_hours(val):
-    """Convert time value (string or datetime.time) into fractional hours (float)."""
-    if val is None or (isinstance(val, float) and pd.isna(val)):
-        return None
+@contextmanager
+def booking_lock(booking_date):
+    """Yields the connection to run check_conflict + add_booking on; commits when the block exits cleanly."""
+    key = f"resource_bookings:{booking_date}"
+    with _booking_locks[hash(key) % BOOKING_LOCK_STRIPES]:
+        engine = get_engine()
+        named = engine.dialect.name == "mysql"
+        with engine.connect() as conn:
+            if named:
+                acquired = conn.execute(
+                    text("SELECT GET_LOCK(:key, :timeout)"),
+                    {"key": key, "timeout": cfg.DB_TIMEOUTS["lock_wait"]},
+                ).scalar()
+                if acquired != 1:
+                    raise BookingLockTimeoutError(f"booking lock {key} timed out")
+                conn.commit()  # the check's snapshot (REPEATABLE READ) starts after the lock is held
+            try:
+                yield conn
+                conn.commit()
+            finally:
+                if named:
+                    try:
+                        conn.rollback()  # no-op after the commit; ends a failed transaction first
+                        conn.execute(text("SELECT RELEASE_LOCK(:key)"), {"key": key})
+                        conn.commit()
+                    except SQLAlchemyError as e:
+                        # a dropped session releases its named locks on the server
+                        print("booking_lock release error:", e)
 
-    # pandas Timedelta or datetime.timedelta
-    if isinstance(val, (pd.Timedelta, _dt.timedelta)):
-        total_seconds = int(pd.Timedelta(val).total_seconds())
-        return total_seconds / 3600.0
 
-    # datetime.time or datetime.datetime (has hour attribute)
-    if hasattr(val, "hour") and not isinstance(val, str):
-        try:
-            h = int(val.hour)
-            m = int(getattr(val, "minute", 0))
-            s = int(getattr(val, "second", 0))
-            return h + m / 60.0 + s / 3600.0
-        except Exception:
-            pass
+# endregion
 
-    try:
-        s = str(val)
-        # handle '0 days HH:MM:SS'
-        if "days" in s:
-            s = s.split()[-1]
-        t = pd.to_datetime(s, format="%H:%M:%S", errors="coerce")
-        if pd.isna(t):
-            t = pd.to_datetime(s, format="%H:%M", errors="coerce")
-        if pd.isna(t):
-            t = pd.to_datetime(s, errors="coerce")
-            if pd.isna(t):
-                return None
-        return float(t.hour + t.minute / 60.0 + t.second / 3600.0)
-    except Exception:
-        return None
+
+# region Chapter 7: Fractional Hours functions
+def fractional_hours(times: pd.Series) -> pd.Series:
+    """Arrow time32[s] times (normalize_bookings) -> float64 fractional hours; nulls become NaN."""
+    return times.astype(pd.ArrowDtype(pa.int32())).astype("float64") / 3600.0
 
 
 # endregion
@@ -447,8 +656,58 @@ def st_red_alert(msg: str):
 
 
 # region Chapter 9: Booking Form function
-def booking_form():
+def submit_booking(
+    booking_date,
+    start_time,
+    end_time,
+    resource_types,
+    person_name,
+    company_name,
+    affiliation,
+    email,
+    confirmation=None,
+    on_booked=None,
+):
+    """
+    The booking form's submit path once the input is valid (resource_types: list of resources).
+    - Conflict check + insert run under the date's booking lock, so concurrent submits can't both take a free slot.
+    - confirmation=(subject, body) is queued in email_outbox with the booking; on_booked runs after a booking is saved.
+    - Returns (conflict, details); DB errors propagate (SQLAlchemyError).
+    """
+    with booking_lock(booking_date) as conn:
+        conflict, details = check_conflict(
+            booking_date, start_time, end_time, resource_types, conn=conn
+        )
+        if not conflict:
+            add_booking(
+                booking_date,
+                start_time,
+                end_time,
+                ", ".join(resource_types),
+                person_name,
+                company_name,
+                affiliation,
+                email,
+                confirmation=confirmation,
+                conn=conn,
+            )
+    if not conflict and on_booked is not None:
+        on_booked()
+    return conflict, details
+
+
+def booking_form(on_booked=None, read_only=False):
+    """
+    - on_booked: optional callback run after a booking is saved (e.g. to refresh cached bookings).
+    - read_only: the database is unreachable; shows a notice instead of the form.
+    """
     st.subheader(":red[**👉 Book a Resource**]")
+    if read_only:
+        st.info(
+            "New bookings are paused while the booking database is unreachable. Please try again later."
+        )
+        return
+
     with st.form("booking_form"):
         with st.popover("Check Pricing ₹ (per hour)"):
             st.write(resource_price_list)
@@ -518,74 +777,81 @@ def booking_form():
                     st_red_alert("Company Name is too long (max 100 characters).")
                     return
 
+                resource_type_str = ", ".join(resource_types)
+
+                subject = f"Booking confirmation for resource(s) on {booking_date}"
+                body = (
+                    f"Hello {person_name},\n\n"
+                    f"Your booking for resources has been confirmed (subject to the receipt of payment).\n\n"
+                    f"Date: {booking_date} (YYYY/MM/DD)\n"
+                    f"From: {start_time}\n"
+                    f"To: {end_time}\n"
+                    f"Company: {company_name}\n"
+                    f"Affiliation: {affiliation}\n\n"
+                    f"Resources Booked: {resource_type_str}.\n\n"
+                    ""
+                    "Thank you!"
+                    f"\n\nPrimary Contact: {cfg.PRIMARY_CONTACT}\n"
+                    f"Secondary Contact: {cfg.SECONDARY_CONTACT}\n\n"
+                    f"------------------------------------------------------------\n"
+                    f"NOTE: To enable us process this booking, please pay via: {payment_link} (comment your name during payment) and share the payment reference.\n"
+                )
+
                 with st.spinner("Checking conflict…"):
-                    conflict, details = check_conflict(
-                        booking_date, start_time, end_time, resource_types
-                    )
+                    try:
+                        conflict, details = submit_booking(
+                            booking_date,
+                            start_time,
+                            end_time,
+                            resource_types,
+                            person_name,
+                            company_name,
+                            affiliation,
+                            email,
+                            confirmation=(subject, body),
+                            on_booked=on_booked,
+                        )
+                    except SQLAlchemyError as e:
+                        st_red_alert(db_error_message(e))
+                        return
 
                 if conflict:
                     st_red_alert(f"❌ Time conflict! {details}")
-                else:
-                    resource_type_str = ", ".join(resource_types)
-
-                    add_booking(
-                        booking_date,
-                        start_time,
-                        end_time,
-                        resource_type_str,
-                        person_name,
-                        company_name,
-                        affiliation,
-                        email,
-                    )
-
-                    subject = f"Booking confirmation for resource(s) on {booking_date}"
-                    body = (
-                        f"Hello {person_name},\n\n"
-                        f"Your booking for resources has been confirmed (subject to the receipt of payment).\n\n"
-                        f"Date: {booking_date} (YYYY/MM/DD)\n"
-                        f"From: {start_time}\n"
-                        f"To: {end_time}\n"
-                        f"Company: {company_name}\n"
-                        f"Affiliation: {affiliation}\n\n"
-                        f"Resources Booked: {resource_type_str}.\n\n"
-                        ""
-                        "Thank you!"
-                        f"\n\nPrimary Contact: {cfg.PRIMARY_CONTACT}\n"
-                        f"Secondary Contact: {cfg.SECONDARY_CONTACT}\n\n"
-                        f"------------------------------------------------------------\n"
-                        f"NOTE: To enable us process this booking, please pay via: {payment_link} (comment your name during payment) and share the payment reference.\n"
-                    )
-
-                    with st.spinner("Sending confirmation email..."):
-                        # uses send_email unction defined at last
-                        email_ok = send_email(email, subject, body)
+                    return
 
-                    if not email_ok:
-                        st.warning(
-                            "Booking saved, but confirmation email could not be sent."
-                        )
-                    else:
-                        st.success("Confirmation email sent.")
-                    st.session_state["_flash"] = (
-                        f"✅ Booking successfull, check email!<br><br>To proceed further, please pay via: {payment_link}"
-                    )
-                    st.cache_data.clear()
-                    st.rerun()
+                st.session_state["_flash"] = (
+                    f"✅ Booking successfull, check email!<br><br>To proceed further, please pay via: {payment_link}"
+                )
+                st.rerun()
 
 
 # endregion
 
 
 # region Chapter 10: Header Bar function
+@file_asset
+def logo_data_uri(path: str) -> str:
+    """Logo file -> base64 data-URI for inline <img> tags (encoded once per file version)."""
+    b64 = base64.b64encode(Path(path).read_bytes()).decode()
+    return f"data:image/png;base64,{b64}"
+
+
+@file_asset
+def load_page_icon(path: str):
+    """Page icon for st.set_page_config, decoded once per file version (not on every rerun)."""
+    from PIL import Image
+
+    icon = Image.open(path)
+    icon.load()
+    return icon
+
+
 def render_header_bar(
     title: str, logo_path: str, logo_height: int = 50, bg_color: str = "#1E3A8A"
 ):
-    p = Path(logo_path)
     logo_html = ""
-    if p.exists():
-        b64 = base64.b64encode(p.read_bytes()).decode()
-        logo_html = f"<img src='data:image/png;base64,{b64}' height='{logo_height}'>"
+    if Path(logo_path).exists():
+        logo_html = f"<img src='{logo_data_uri(logo_path)}' height='{logo_height}'>"
 
     st.markdown(
         f"""
@@ -611,15 +877,28 @@ def render_header_bar(
 
 
 # region Chapter 11: Plotting function
-def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
+def to_epoch_ms(values: pd.Series):
+    """Datetime series -> float64 numpy array of epoch milliseconds (plotly date axes accept these)."""
+    if isinstance(values.dtype, pd.ArrowDtype):
+        # Arrow dates/timestamps: a cast, no per-value conversion
+        ms = values.astype(pd.ArrowDtype(pa.timestamp("ms")))
+        return ms.astype(pd.ArrowDtype(pa.int64())).to_numpy(dtype="float64")
+    return (
+        (pd.to_datetime(values) - pd.Timestamp("1970-01-01"))
+        / pd.Timedelta(milliseconds=1)
+    ).to_numpy(dtype="float64")
+
+
+@timed("build_timeline_traces")
+def build_timeline_traces(df: pd.DataFrame, default_color="#E53935"):
     """
-    Timeline builder:
-    - Explodes rows so each canonical resource becomes its own row (prevents overlap).
-    - Computes a per-day slot index and shifts x (date) by a tiny fraction of a day so bars sit side-by-side.
-    - Dynamically computes bar width but keeps it thinner by default.
+    Per-resource timeline traces:
+    - Explodes rows so each canonical resource becomes its own row (via the multi-hot resource index).
+    - Returns ({resource: bar trace dict}, layout dict, info). Traces carry no lane offset/width;
+      compose_timeline_figure() places the selected ones side-by-side.
     """
     if df is None or df.empty:
-        return None, {"reason": "empty_df"}
+        return {}, None, {"reason": "empty_df"}
 
     required = {
         "booking_date",
@@ -632,19 +911,19 @@ def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
         "email",
     }
     if not required.issubset(set(df.columns)):
-        return None, {"reason": "missing_columns"}
+        return {}, None, {"reason": "missing_columns"}
 
     df = df.copy()
 
-    # Convert booking_date to normalized datetime (midnight) and compute start/end in fractional hours
-    df["DateOnly"] = pd.to_datetime(df["booking_date"], errors="coerce").dt.normalize()
-    df["StartH"] = df["start_time"].apply(to_fractional_hours)
-    df["EndH"] = df["end_time"].apply(to_fractional_hours)
+    # Arrow-backed frame (normalize_bookings): booking_date is already a date; start/end in fractional hours
+    df["DateOnly"] = df["booking_date"]
+    df["StartH"] = fractional_hours(df["start_time"])
+    df["EndH"] = fractional_hours(df["end_time"])
 
     mask = df["DateOnly"].notna() & df["StartH"].notna() & df["EndH"].notna()
     df = df[mask]
     if df.empty:
-        return None, {"reason": "all_rows_unparsable"}
+        return {}, None, {"reason": "all_rows_unparsable"}
 
     df["DurH_raw"] = df["EndH"] - df["StartH"]
     invalid_count = int((df["DurH_raw"] <= 0).sum())
@@ -656,157 +935,91 @@ def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
 
     # Ensure start_window < end_window
     if pd.isna(start_window) or pd.isna(end_window) or start_window >= end_window:
-        return None, {
-            "reason": "invalid_window",
-            "start": str(start_window),
-            "end": str(end_window),
-        }
+        return (
+            {},
+            None,
+            {
+                "reason": "invalid_window",
+                "start": str(start_window),
+                "end": str(end_window),
+            },
+        )
 
     # Filter to window (include start, exclude end)
     dfw = df[(df["DateOnly"] >= start_window) & (df["DateOnly"] < end_window)]
     if dfw.empty:
-        return None, {
-            "reason": "out_of_window",
-            "window_start": start_window.strftime("%Y-%m-%d"),
-            "window_end": end_window.strftime("%Y-%m-%d"),
-            "min_date": df["DateOnly"].min(),
-            "max_date": df["DateOnly"].max(),
-        }
-
-    # --- Compute how many bars will be placed per day ---
-    # For each row, count how many canonical resources it maps to (so multi-resource rows count multiple bars).
-    canonical = [r.strip() for r in getattr(cfg, "resource_list", [])]
-    canonical_lower = [r.lower() for r in canonical]
+        return (
+            {},
+            None,
+            {
+                "reason": "out_of_window",
+                "window_start": start_window.strftime("%Y-%m-%d"),
+                "window_end": end_window.strftime("%Y-%m-%d"),
+                "min_date": df["DateOnly"].min(),
+                "max_date": df["DateOnly"].max(),
+            },
+        )
 
-    def extract_canonical_tokens(row_val):
-        if not row_val:
-            return []
-        toks = [t.strip() for t in str(row_val).split(",") if t.strip()]
-        # keep only tokens that match canonical list (exact match case-insensitive)
-        return [t for t in toks if t.lower() in canonical_lower]
+    # --- One bar per canonical resource a row maps to (multi-resource rows give multiple bars) ---
+    canonical = [r.strip() for r in getattr(cfg, "resource_list", None) or []]
 
     # reset_index so we can keep original row identity for tooltip info
     dfw = dfw.reset_index(drop=True)
     dfw["_orig_idx"] = dfw.index
+    # 'HH:MM:SS' hover strings (Arrow cast): Plotly would turn times into full datetimes (adding today's date)
+    dfw["_start_disp"] = dfw["start_time"].astype(TEXT_DTYPE)
+    dfw["_end_disp"] = dfw["end_time"].astype(TEXT_DTYPE)
 
-    # build exploded dataframe
-    exploded_rows = []
-    for _, row in dfw.iterrows():
-        tokens = extract_canonical_tokens(row["resource_type"])
-        if not tokens:
-            # keep rows with no canonical match as-is (optional: skip them)
-            continue
-        for tok in tokens:
-            exploded_rows.append(
-                {
-                    "_orig_idx": row["_orig_idx"],
-                    "DateOnly": row["DateOnly"],
-                    "StartH": row["StartH"],
-                    "DurH": row["DurH"],
-                    "person_name": row.get("person_name"),
-                    "company_name": row.get("company_name"),
-                    "start_time": row.get("start_time"),
-                    "end_time": row.get("end_time"),
-                    "ResourceCanonical": tok,  # keeps original capitalization from token
-                }
-            )
-
-    if not exploded_rows:
-        return None, {"reason": "no_canonical_rows"}
-
-    df_exp = pd.DataFrame(exploded_rows)
-
-    # Standardize ResourceCanonical to canonical capitalization by mapping lowercase -> canonical
-    canon_map = {r.lower(): r for r in canonical}
-    df_exp["ResourceCanonical"] = (
-        df_exp["ResourceCanonical"]
-        .str.strip()
-        .str.lower()
-        .map(lambda v: canon_map.get(v, v))
+    # build exploded dataframe: one row per (booking, canonical resource) hit in the resource index
+    hit_rows, hit_cols = np.nonzero(
+        build_resource_index(dfw["resource_type"], canonical).to_numpy()
     )
+    if len(hit_rows) == 0:
+        return {}, None, {"reason": "no_canonical_rows"}
+
+    df_exp = dfw.iloc[hit_rows][
+        [
+            "_orig_idx",
+            "DateOnly",
+            "StartH",
+            "DurH",
+            "person_name",
+            "company_name",
+            "_start_disp",
+            "_end_disp",
+        ]
+    ].reset_index(drop=True)
+    df_exp["ResourceCanonical"] = np.asarray(canonical, dtype=object)[hit_cols]
 
-    # Compute slots per day: each row on same DateOnly gets a unique slot index (0..n-1)
-    df_exp["slot_idx"] = df_exp.groupby("DateOnly").cumcount()
-    slot_counts = (
-        df_exp.groupby("DateOnly")["slot_idx"].max().add(1).to_dict()
-    )  # number of bars per day
-
-    # --- compute width per bar dynamically so they fit side-by-side ---
-    ms_per_day = 24 * 60 * 60 * 1000
-    # reserve 80% of day width to hold bars, leave 20% for breathing room
-    usable_fraction = 0.60
-
-    max_bars_per_day = max([int(v) for v in slot_counts.values()] + [1])
-    bar_width_ms = int(ms_per_day * (usable_fraction / max_bars_per_day))
-    # sensible caps (smaller max width)
-    min_width_ms = int(ms_per_day * 0.0025)
-    max_width_ms = int(ms_per_day * 0.35)
-    bar_width_ms = max(min_width_ms, min(bar_width_ms, max_width_ms))
-
-    # spacing multiplier between adjacent slots (slightly larger than width to avoid touching)
-    spacing_factor = 1.08
-    width_days = bar_width_ms / ms_per_day
-
-    # compute offset in fractional days for each row: center the group on the date
-    def compute_offset_days(row):
-        count = slot_counts.get(row["DateOnly"], 1)
-        idx = row["slot_idx"]
-        center = (count - 1) / 2.0
-        # per-slot shift in days
-        per_slot = width_days * spacing_factor
-        return (idx - center) * per_slot
-
-    df_exp["offset_days"] = df_exp.apply(compute_offset_days, axis=1)
-    # final x positions: DateOnly + offset_days
-    df_exp["x_pos"] = pd.to_datetime(df_exp["DateOnly"]) + pd.to_timedelta(
-        df_exp["offset_days"], unit="D"
-    )
-
-    fig = go.Figure()
-
-    # Build one trace per resource (clean legend)
-    for resource in canonical:
+    traces = {}
+    for resource, subset in df_exp.groupby("ResourceCanonical", sort=False):
         color = getattr(cfg, "resource_color_map", {}).get(resource, default_color)
 
-        subset = df_exp[df_exp["ResourceCanonical"] == resource]
-        if subset.empty:
-            continue
-
-        xs = list(subset["x_pos"])
-        ys = list(subset["DurH"])
-        bases = list(subset["StartH"])
-        customdata = [
-            [
-                row.get("person_name"),
-                row.get("company_name"),
-                row.get("start_time"),
-                row.get("end_time"),
-            ]
-            for _, row in subset.iterrows()
-        ]
-
-        fig.add_bar(
-            x=xs,
-            y=ys,
-            base=bases,
-            marker_color=color,
-            width=[bar_width_ms] * len(xs),
+        # NumPy-backed arrays (x as epoch ms) so Plotly ships them as base64 typed arrays
+        traces[resource] = dict(
+            type="bar",
+            x=to_epoch_ms(subset["DateOnly"]),
+            y=subset["DurH"].to_numpy(dtype="float64"),
+            base=subset["StartH"].to_numpy(dtype="float64"),
+            marker=dict(color=color, line=dict(width=0)),
             name=resource,
-            offsetgroup=resource,
-            customdata=customdata,
+            customdata=subset[
+                ["person_name", "company_name", "_start_disp", "_end_disp"]
+            ].to_numpy(dtype=object),
             hovertemplate=(
                 "<b>%{customdata[0]}</b> (%{customdata[1]})<br>Date: %{x|%Y-%m-%d}<br>From: %{customdata[2]}<br>To: %{customdata[3]}<extra></extra>"
             ),
             showlegend=True,
-            marker_line_width=0,
         )
+    # Keep one trace per resource in canonical order (clean legend)
+    traces = {r: traces[r] for r in canonical if r in traces}
 
     # Y axis simple ticks (every 2 hours)
     tick_vals = list(range(0, 25, 2))
     tick_text = [f"{h:02d}:00" for h in tick_vals]
 
     # Force daily ticks: dtick in milliseconds = 24 * 60 * 60 * 1000
-    one_day_ms = ms_per_day
+    one_day_ms = 24 * 60 * 60 * 1000
 
     # set tick0 to the epoch of start_window so ticks start exactly there
     # convert to milliseconds epoch for tick0 accepted formats: use ISO string as safe option
@@ -814,17 +1027,16 @@ def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
 
     # Layout: horizontal legend at bottom, leave ample bottom margin so legend does not overlap
     # If you need more space for a long legend, increase 'b' or reduce legend.font.size.
-
-    fig.update_layout(
+    # barmode overlay: lanes are placed explicitly through each trace's offset.
+    layout = dict(
         height=getattr(cfg, "GRAPH_HEIGHT", 620),
         bargap=0.02,
-        bargroupgap=0.01,
-        barmode="group",
+        barmode="overlay",
         xaxis=dict(
             type="date",
-            range=[start_window, end_window],
+            range=[tick0_iso, end_window.strftime("%Y-%m-%dT%H:%M:%S")],
             fixedrange=True,
-            title="Date",
+            title=dict(text="Date"),
             tickangle=-90,
             tickfont=dict(size=10),
             dtick=one_day_ms,  # one tick per day
@@ -838,14 +1050,14 @@ def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
             tickvals=tick_vals,
             ticktext=tick_text,
             fixedrange=True,
-            title="Time",
+            title=dict(text="Time"),
             automargin=True,
         ),
         margin=dict(
             l=40, r=20, t=40, b=130
         ),  # <-- reserve big bottom margin for horizontal legend
         legend=dict(
-            title="Resource Type",
+            title=dict(text="Resource Type"),
             orientation="h",
             yanchor="top",
             y=-0.40,  # place legend below the plot area (negative y)
@@ -853,70 +1065,189 @@ def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
             x=0.5,
             traceorder="normal",
         ),
-    ),
+    )
 
-    return fig, {
-        "reason": "ok",
-        "rows_plotted": int(len(dfw)),
-        "invalid_durations": invalid_count,
-    }
+    return (
+        traces,
+        layout,
+        {
+            "reason": "ok",
+            "rows_plotted": int(len(dfw)),
+            "invalid_durations": invalid_count,
+        },
+    )
 
 
-# endregion
+@timed("compose_timeline_figure")
+def compose_timeline_figure(traces: dict, layout: dict, selected=None):
+    """
+    Assembles a figure dict from per-resource traces (all of them when selected is None).
+    - Each selected resource gets its own lane per day, centred on the date; only the scalar
+      offset/width of shallow trace copies change, so a filter change never rebuilds trace data.
+    - Returns None when none of the selected resources has bars.
+    """
+    names = [r for r in traces if selected is None or r in selected]
+    if not names:
+        return None
+
+    # --- compute width per bar dynamically so they fit side-by-side ---
+    ms_per_day = 24 * 60 * 60 * 1000
+    # reserve 60% of day width to hold bars, leave the rest for breathing room
+    usable_fraction = 0.60
+    bar_width_ms = int(ms_per_day * (usable_fraction / len(names)))
+    # sensible caps (smaller max width)
+    min_width_ms = int(ms_per_day * 0.0025)
+    max_width_ms = int(ms_per_day * 0.35)
+    bar_width_ms = max(min_width_ms, min(bar_width_ms, max_width_ms))
 
-# region Chapter 12: Cached wrapper to build the timeline figure
+    # spacing multiplier between adjacent lanes (slightly larger than width to avoid touching)
+    per_lane = bar_width_ms * 1.08
+    center = (len(names) - 1) / 2.0
 
+    data = [
+        {
+            **traces[r],
+            "width": bar_width_ms,
+            "offset": (i - center) * per_lane - bar_width_ms / 2,
+        }
+        for i, r in enumerate(names)
+    ]
+    return {"data": data, "layout": layout}
 
-@st.cache_data(ttl=7 * 24 * 60 * 60)  # 1 week
-def build_timeline_figure_cached(n_rows: int, max_created_at: str, df_json: str):
+
+def build_vertical_day_time_timeline(df: pd.DataFrame, default_color="#E53935"):
     """
-    - n_rows and max_created_at are cheap cache keys (fingerprint).
-    - df_json: small JSON serialization of the dataframe (orient='split' recommended).
+    Timeline builder (all resources). Returns (go.Figure or None, info).
+    See build_timeline_traces() and compose_timeline_figure().
     """
-    try:
-        # Recreate DataFrame (orient='split')
-        df = pd.read_json(StringIO(df_json), orient="split")
-    except Exception as e:
-        # If reconstruction fails, pass None so plotting function can handle it
-        print("build_timeline_figure_cached: failed to read df_json:", e)
-        return None, {"reason": "invalid_df_json"}
+    import plotly.graph_objects as go
+
+    traces, layout, info = build_timeline_traces(df, default_color)
+    if not traces:
+        return None, info
+    return go.Figure(compose_timeline_figure(traces, layout)), info
+
+
+# endregion
+
+
+# region Chapter 12: Cached timeline bundle and Today marker
+def add_today_marker(fig_dict: dict, today=None) -> dict:
+    """
+    Returns a display copy of a cached figure dict with a live "Today" marker.
+    Only the layout and the trace dicts are shallow-copied (trace arrays are shared), so the cost does not
+    grow with bookings. Plotly pops and restores each trace's "type" while validating, so sessions rendering
+    the same cached trace dicts concurrently could see a type-less trace (found by load_test.py).
+    """
+    day = str(today or datetime.now().date())
+    layout = dict(fig_dict.get("layout") or {})
+    layout["shapes"] = list(layout.get("shapes") or []) + [
+        {
+            "type": "line",
+            "x0": day,
+            "x1": day,
+            "xref": "x",
+            "y0": 0,
+            "y1": 1,
+            "yref": "y domain",
+            "line": {"width": 1, "dash": cfg.LINE_STYLE, "color": cfg.LINE_COLOR},
+        }
+    ]
+    layout["annotations"] = list(layout.get("annotations") or []) + [
+        {
+            "x": day,
+            "y": 1,
+            "xref": "x",
+            "yref": "paper",
+            "text": "Today",
+            "showarrow": False,
+            "font": {"color": cfg.LINE_COLOR},
+            "yanchor": "bottom",
+        }
+    ]
+    data = [dict(trace) for trace in fig_dict.get("data") or []]
+    return {**fig_dict, "data": data, "layout": layout}
 
-    # Calls the main plotting function
-    return build_vertical_day_time_timeline(df)
+
+def build_bookings_bundle(df: pd.DataFrame, loaded_at=None) -> dict:
+    """
+    What the bookings cache holds: the frame + resource index + per-resource timeline traces,
+    built together once per data version.
+    """
+    traces, layout, info = build_timeline_traces(df)
+    return {
+        "df": df,
+        "resource_index": build_resource_index(df["resource_type"]),
+        "traces": traces,
+        "layout": layout,
+        "info": info,
+        "loaded_at": loaded_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
 
 
 # endregion
 
 
 # region Chapter 13: Send Email function
-def send_email(to_email, subject, body):
-    """Sends an email using SMTP settings from config."""
+def open_smtp_connection():
+    """New logged-in SMTP session: SSL on port 465, otherwise plain + STARTTLS (unless disabled, e.g. a local sink)."""
+    if cfg.SMTP_PORT == 465:
+        # Uses SSL for port 465
+        server = smtplib.SMTP_SSL(
+            cfg.SMTP_HOST, cfg.SMTP_PORT, timeout=cfg.SMTP_TIMEOUT
+        )
+    else:
+        # Default: connects plain + upgrade to TLS
+        server = smtplib.SMTP(cfg.SMTP_HOST, cfg.SMTP_PORT, timeout=cfg.SMTP_TIMEOUT)
+        if cfg.SMTP_STARTTLS:
+            server.starttls()
+    try:
+        if cfg.SMTP_USER and cfg.SMTP_PASS:
+            server.login(cfg.SMTP_USER, cfg.SMTP_PASS)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+@st.cache_resource
+def get_smtp_pool():
+    """Process-wide pool of authenticated SMTP sessions (shared by the form and the outbox worker)."""
+    return SMTPPool(
+        open_smtp_connection,
+        max_size=cfg.SMTP_POOL_SIZE,
+        idle_timeout=cfg.SMTP_IDLE_TIMEOUT,
+        max_age=cfg.SMTP_MAX_AGE,
+    )
+
+
+@timed("send_email")
+def send_email(to_email, subject, body, raise_errors=False, cc=None):
+    """
+    Sends an email using SMTP settings from config.
+    - raise_errors=True re-raises SMTP errors (the outbox worker retries them) instead of returning False.
+    - cc: CC addresses; None means the confirmation CC list (config.CC_EMAILS).
+    """
 
     msg = MIMEText(body, "plain")
     msg["Subject"] = subject
     msg["From"] = cfg.SMTP_USER
     msg["To"] = to_email
 
-    cc_list = cfg.CC_EMAILS
-    msg["Cc"] = ", ".join(cc_list)
+    cc_list = list(cfg.CC_EMAILS if cc is None else cc)
+    if cc_list:
+        msg["Cc"] = ", ".join(cc_list)
 
     recipients = [to_email] + cc_list
 
     try:
-        if cfg.SMTP_PORT == 465:
-            # Uses SSL for port 465
-            with smtplib.SMTP_SSL(cfg.SMTP_HOST, cfg.SMTP_PORT) as server:
-                server.login(cfg.SMTP_USER, cfg.SMTP_PASS)
-                server.sendmail(cfg.SMTP_USER, recipients, msg.as_string())
-        else:
-            # Default: connects plain + upgrade to TLS
-            with smtplib.SMTP(cfg.SMTP_HOST, cfg.SMTP_PORT) as server:
-                server.starttls()
-                server.login(cfg.SMTP_USER, cfg.SMTP_PASS)
-                server.sendmail(cfg.SMTP_USER, recipients, msg.as_string())
+        # Reuses a pooled, already logged-in session (no TLS handshake/login per email)
+        get_smtp_pool().send(cfg.SMTP_USER, recipients, msg.as_string())
         return True
     except Exception as e:
         print("Email sending failed:", e)
+        if raise_errors:
+            raise
         return False
 
 
@@ -926,12 +1257,17 @@ def send_email(to_email, subject, body):
 # region Chapter 14: Lottie Animation function
 
 
-@st.cache_data(ttl=7 * 24 * 60 * 60)  # 1 week
+@file_asset
+def read_lottie_json(path: str) -> dict:
+    """Compacted animation (prebuilt assets/*.min.json, or optimized here when that is missing/stale)."""
+    return load_optimized_lottie(path, cfg.LOTTIE_PRECISION)
+
+
 def load_lottiefile(filepath: str, page_id: str = "resource"):
-    _ = page_id  # intentionally keep param to make cache key unique
+    """Parsed Lottie animation, loaded once per file version (kept when the data caches are cleared)."""
+    _ = page_id  # kept for existing callers; assets are keyed by path
     try:
-        with open(filepath, "r", encoding="utf-8") as file:
-            return json.load(file)
+        return read_lottie_json(filepath)
     except Exception as e:
         st.error(f"Error loading local Lottie file: {e}")
         return None
@@ -943,9 +1279,12 @@ def load_lottiefile(filepath: str, page_id: str = "resource"):
 # region Chapter 15: Random Quotes function
 
 
-@st.cache_data(ttl=24 * 60 * 60)  # Cache for 1 day
+@timed("get_random_quote")
+@bounded_cache("quotes", **cfg.CACHE_BUDGETS["quotes"])
 def get_random_quote():
     """Fetch a random quote from Quotable API"""
+    import requests
+
     try:
         response = requests.get(
             "https://api.quotable.io/random?tags=technology",
@@ -984,3 +1323,279 @@ def get_random_quote():
 
 
 # endregion
+
+
+# region Chapter 16: Resource Index functions
+def build_resource_index(values: pd.Series, resources=None) -> pd.DataFrame:
+    """
+    Multi-hot boolean matrix (rows x resources) from comma-joined resource_type strings.
+    - resources defaults to the canonical cfg.resource_list; tokens match trimmed + case-insensitive.
+    - Columns keep the spelling given in `resources`; the index is aligned with `values`.
+    """
+    if resources is None:
+        resources = getattr(cfg, "resource_list", None) or []
+    cols = [str(r).strip() for r in resources]
+
+    # Tokenise each distinct value once (resource_type is dictionary-encoded), then expand by codes;
+    # missing values (code -1) map to the trailing "" entry
+    codes, uniques = pd.factorize(values)
+    distinct = pd.Series(np.append(np.asarray(uniques, dtype=object), ""))
+
+    tokens = (
+        distinct.fillna("")
+        .astype(str)
+        .str.lower()
+        .str.replace(r"\s*,\s*", ",", regex=True)
+        .str.strip(", ")
+        .str.get_dummies(sep=",")
+    )
+    index = tokens.reindex(columns=[c.lower() for c in cols], fill_value=0).astype(bool)
+    return pd.DataFrame(index.to_numpy()[codes], index=values.index, columns=cols)
+
+
+def filter_by_resources(df: pd.DataFrame, resource_index, selected) -> pd.DataFrame:
+    """
+    Rows booking ANY of the selected resources (also when stored as comma-joined strings).
+    Vectorised: any() over the selected columns of the multi-hot resource index, which is
+    tokenised once per data version (not on every rerun/filter change).
+    Nothing selected OR column missing -> an empty frame to downstream logic.
+    """
+    if df is None:
+        return pd.DataFrame()
+    if selected and "resource_type" in df.columns:
+        return df[resource_index[list(selected)].any(axis=1)].copy()
+    return df.iloc[0:0].copy() if not df.empty else df.copy()
+
+
+TABLE_COLUMNS = [
+    "booking_date",
+    "start_time",
+    "end_time",
+    "resource_type",
+    "person_name",
+    "company_name",
+    "affiliation",
+    "email",
+    "created_at_ist",
+    "payment_status",
+    "payment_id",
+    "payment_date",
+]
+
+
+def bookings_table(df: pd.DataFrame, columns=None) -> pa.Table:
+    """
+    The "All Existing Bookings" table: display columns, sorted by date and start time.
+    - A pyarrow Table taken from the Arrow-backed frame without copying columns; st.dataframe serializes it
+      as is (dates and times display natively, no strings are made).
+    - created_at_ist is derived here from the UTC created_at.
+    """
+    columns = columns or TABLE_COLUMNS
+    source = ["created_at" if c == "created_at_ist" else c for c in columns]
+    source = list(dict.fromkeys(source + ["booking_date", "start_time"]))
+    table = pa.Table.from_pandas(df[source], preserve_index=False).sort_by(
+        [("booking_date", "ascending"), ("start_time", "ascending")]
+    )
+    # No index to describe, and pandas can't parse back its metadata for dictionary columns
+    table = table.replace_schema_metadata(None)
+    if "created_at_ist" in columns:
+        ist = table["created_at"].cast(pa.timestamp("us", tz="Asia/Kolkata"))
+        table = table.append_column("created_at_ist", pc.local_timestamp(ist))
+    return table.select(columns)
+
+
+# endregion
+
+
+# region Chapter 17: Admin cache panel
+def is_admin() -> bool:
+    """True for logged-in users listed in admin_users, or when ?admin=<admin_token> is in the URL."""
+    username = st.session_state.get("username")
+    if username and username in cfg.ADMIN_USERS:
+        return True
+    token = st.query_params.get("admin")
+    return bool(cfg.ADMIN_TOKEN) and token == cfg.ADMIN_TOKEN
+
+
+def render_cache_admin():
+    """Per-namespace cache size and hit/miss/eviction counters (admins only)."""
+    if not is_admin():
+        return
+    with st.expander("🧮 Cache stats (admin)"):
+        stats = pd.DataFrame(cache_stats())
+        if stats.empty:
+            st.info("No caches registered yet.")
+            return
+        stats["hit_rate"] = (
+            stats["hits"] / (stats["hits"] + stats["misses"]).where(lambda n: n > 0)
+        ).round(3)
+        stats["MiB"] = (stats["bytes"] / (1024 * 1024)).round(2)
+        stats["budget_MiB"] = (stats["max_bytes"] / (1024 * 1024)).round(2)
+        st.dataframe(stats.drop(columns=["bytes", "max_bytes"]), hide_index=True)
+
+
+# endregion
+
+
+# region Chapter 18: Cached authenticator setup
+@file_asset
+def load_auth_config(path: str) -> dict:
+    """
+    cred.yaml parsed once per file version (reloaded when its mtime changes).
+    Plain-text passwords are bcrypt-hashed here, once, instead of by every Authenticate() (auto_hash).
+    """
+    import yaml
+    from yaml.loader import SafeLoader
+    from streamlit_authenticator import Hasher
+
+    with open(path) as file:
+        config = yaml.load(file, Loader=SafeLoader)
+    for user in (config["credentials"].get("usernames") or {}).values():
+        if "password" in user and not Hasher.is_hash(user["password"]):
+            user["password"] = Hasher.hash(user["password"])
+    return config
+
+
+def get_authenticator(path: str = ".streamlit/cred.yaml"):
+    """
+    The session's stauth.Authenticate, built from the process-cached cred.yaml.
+    - Each session gets its own copy of the credentials: login/logout update them (failed attempts,
+      logged_in), which must not leak between sessions.
+    - Logged-in reruns reuse the session's authenticator while cred.yaml is unchanged; login() has
+      nothing to check then (no YAML, cookie or bcrypt work).
+    - Logged-out reruns build a fresh one: its cookie component must render to read the re-auth cookie.
+    """
+    import streamlit_authenticator as stauth
+
+    config = load_auth_config(path)
+    cached = st.session_state.get("_authenticator")
+    if (
+        cached is not None
+        and cached[0] is config
+        and st.session_state.get("authentication_status")
+    ):
+        return cached[1]
+
+    authenticator = stauth.Authenticate(
+        copy.deepcopy(config["credentials"]),
+        config["cookie"]["name"],
+        config["cookie"]["key"],
+        config["cookie"]["expiry_days"],
+        auto_hash=False,
+    )
+    st.session_state["_authenticator"] = (config, authenticator)
+    return authenticator
+
+
+# endregion
+
+
+# region Chapter 19: Admin timing panels
+def render_timing_admin():
+    """Rolling hot-path timings and the previous rerun's spans (admins only, when telemetry is enabled)."""
+    if not (TELEMETRY.enabled and is_admin()):
+        return
+    with st.expander("⏱️ Rerun timings (admin)"):
+        summary = pd.DataFrame(TELEMETRY.summary())
+        if summary.empty:
+            st.info("No spans recorded yet.")
+            return
+        st.dataframe(summary, hide_index=True)
+        spans = st.session_state.get("_rerun_spans")
+        if spans:
+            st.caption("Previous rerun (start_ms: offset from the start of the rerun)")
+            st.dataframe(pd.DataFrame(spans).sort_values("start_ms"), hide_index=True)
+        st.download_button(
+            "Prometheus metrics",
+            TELEMETRY.prometheus_text(),
+            file_name=f"{TELEMETRY.app}_metrics.prom",
+            mime="text/plain",
+        )
+
+
+def render_query_admin():
+    """SQL statements by total time, the previous rerun's queries and the slow-query log (admins only)."""
+    if not (QUERIES.enabled and is_admin()):
+        return
+    with st.expander("🗄️ SQL queries (admin)"):
+        queries = st.session_state.get("_rerun_queries") or []
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Queries (previous rerun)", len(queries))
+        col2.metric("DB time (ms)", round(sum(q["ms"] for q in queries), 1))
+        col3.metric("Rows fetched", sum(q["rows"] or 0 for q in queries))
+        summary = pd.DataFrame(QUERIES.summary())
+        if summary.empty:
+            st.info("No queries recorded yet.")
+        else:
+            st.dataframe(summary, hide_index=True)
+        if QUERIES.slow:
+            st.caption(
+                f"Slow-query log (> {QUERIES.slow_ms} ms or > {QUERIES.max_rows:,} rows)"
+            )
+            st.dataframe(pd.DataFrame(list(QUERIES.slow)[::-1]), hide_index=True)
+
+
+# endregion
+
+
+# region Chapter 20: Admin memory panel
+def start_rerun_trace():
+    """Starts tracemalloc for this rerun when an admin asked for it on the previous one."""
+    if st.session_state.pop("_tracing_rerun", False) and tracemalloc.is_tracing():
+        # the traced rerun was cut short (st.rerun/st.stop): don't leave tracing on
+        tracemalloc.stop()
+    if (
+        st.session_state.pop("_trace_next_rerun", False)
+        and not tracemalloc.is_tracing()
+    ):
+        tracemalloc.start()
+        st.session_state["_tracing_rerun"] = True
+
+
+def finish_rerun_trace():
+    """Stops the rerun trace and keeps its peak and top allocators for the memory panel."""
+    if not st.session_state.pop("_tracing_rerun", False):
+        return
+    snapshot = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    st.session_state["_rerun_allocations"] = {
+        "peak_MiB": round(peak / (1024 * 1024), 2),
+        "top": top_allocations(snapshot),
+    }
+
+
+def render_memory_admin(df: pd.DataFrame = None):
+    """Cached frames (deep bytes) and figures (serialized size), plus a traced rerun (admins only)."""
+    if not is_admin():
+        return
+    with st.expander("📦 Memory (admin)"):
+        report = pd.DataFrame(memory_report())
+        if report.empty:
+            st.info("Nothing cached yet.")
+        else:
+            report["MiB"] = (report["bytes"] / (1024 * 1024)).round(2)
+            report["serialized_MiB"] = (
+                report["serialized_bytes"] / (1024 * 1024)
+            ).round(2)
+            st.caption(f"Cached values: {report['MiB'].sum():.1f} MiB in memory")
+            st.dataframe(
+                report.drop(columns=["bytes", "serialized_bytes"]), hide_index=True
+            )
+        if df is not None and not df.empty:
+            st.caption("Bookings frame by column")
+            st.dataframe(pd.DataFrame(frame_columns(df)), hide_index=True)
+
+        if st.button("Trace next rerun (tracemalloc)"):
+            st.session_state["_trace_next_rerun"] = True
+            st.rerun()
+        traced = st.session_state.get("_rerun_allocations")
+        if traced:
+            st.caption(
+                f"Last traced rerun: peak {traced['peak_MiB']} MiB traced "
+                "(all threads of the process, so concurrent sessions are included)"
+            )
+            st.dataframe(pd.DataFrame(traced["top"]), hide_index=True)
+
+
+# endregion
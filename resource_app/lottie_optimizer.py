@@ -0,0 +1,219 @@
+# region Chapter 1: Imports
+import hashlib
+import json
+import os
+import re
+
+# endregion
+
+
+# region Chapter 2: Lottie payload optimizer
+
+# Editor-only keys: names, match names, CSS class/id hints. The player needs them only for expressions.
+METADATA_KEYS = ("nm", "mn", "cl", "ln", "meta")
+
+
+def has_expressions(node) -> bool:
+    """True if any animated property carries an After Effects expression (a string "x")."""
+    if isinstance(node, dict):
+        if isinstance(node.get("x"), str):
+            return True
+        return any(has_expressions(v) for v in node.values())
+    if isinstance(node, list):
+        return any(has_expressions(v) for v in node)
+    return False
+
+
+LAYER_REF = re.compile(r"thisComp\.layer\((['\"])(.+?)\1\)")
+
+
+def drop_dead_expressions(node, layer_names):
+    """
+    Removes Bodymovin expressions that can only ever return the keyframed value: every
+    thisComp.layer('...') they read is missing from the composition and the exporter's
+    try/catch falls back to `value`. The player then skips evaluating them on every frame.
+    """
+    if isinstance(node, dict):
+        expr = node.get("x")
+        if isinstance(expr, str):
+            refs = [name for _, name in LAYER_REF.findall(expr)]
+            falls_back = re.search(r"catch\s*\(\w+\)\s*\{\s*\$bm_rt\s*=\s*value;", expr)
+            if refs and falls_back and not set(refs) & layer_names:
+                node = {k: v for k, v in node.items() if k != "x"}
+        return {k: drop_dead_expressions(v, layer_names) for k, v in node.items()}
+    if isinstance(node, list):
+        return [drop_dead_expressions(v, layer_names) for v in node]
+    return node
+
+
+def drop_comp_dead_expressions(data: dict) -> dict:
+    """drop_dead_expressions per composition (thisComp is the root or the precomp holding the layer)."""
+
+    def comp_layers(layers):
+        names = {layer.get("nm") for layer in layers}
+        return [drop_dead_expressions(layer, names) for layer in layers]
+
+    data = dict(data, layers=comp_layers(data.get("layers", [])))
+    data["assets"] = [
+        dict(a, layers=comp_layers(a["layers"])) if "layers" in a else a
+        for a in data.get("assets", [])
+    ]
+    return data
+
+
+def round_numbers(node, precision: int):
+    """Rounds every float (keyframe coordinates, tangents, colours, times); whole numbers become ints."""
+    if isinstance(node, float):
+        value = round(node, precision)
+        return int(value) if value.is_integer() else value
+    if isinstance(node, dict):
+        return {k: round_numbers(v, precision) for k, v in node.items()}
+    if isinstance(node, list):
+        return [round_numbers(v, precision) for v in node]
+    return node
+
+
+def strip_metadata(node):
+    """Drops METADATA_KEYS, plus "hd": false (the player's default)."""
+    if isinstance(node, dict):
+        return {
+            k: strip_metadata(v)
+            for k, v in node.items()
+            if k not in METADATA_KEYS and not (k == "hd" and v is False)
+        }
+    if isinstance(node, list):
+        return [strip_metadata(v) for v in node]
+    return node
+
+
+def referenced_layers(layers, i, by_ind) -> list:
+    """
+    Positions of the layers that layers[i] needs to render: its parent (transforms are inherited, even from a
+    hidden null) and its track-matte source ("tp" by ind, otherwise the layer right above a "tt" layer).
+    by_ind: layer ind -> position in `layers`.
+    """
+    layer = layers[i]
+    refs = []
+    if layer.get("parent") in by_ind:
+        refs.append(by_ind[layer["parent"]])
+    if layer.get("tt"):
+        if layer.get("tp") in by_ind:
+            refs.append(by_ind[layer["tp"]])
+        elif i > 0:
+            refs.append(i - 1)
+    return refs
+
+
+def visible_layers(layers, ip=float("-inf"), op=float("inf")) -> list:
+    """
+    Drops hidden layers and layers whose in/out range never overlaps the composition's [ip, op), except the
+    ones a remaining layer still uses as parent or matte source. Order is kept (mattes apply to the next layer).
+    """
+    kept = {
+        i
+        for i, layer in enumerate(layers)
+        if not layer.get("hd") and layer.get("ip", ip) < op and layer.get("op", op) > ip
+    }
+    by_ind = {layer.get("ind"): i for i, layer in enumerate(layers) if "ind" in layer}
+    pending = list(kept)
+    while pending:
+        for j in referenced_layers(layers, pending.pop(), by_ind):
+            if j not in kept:
+                kept.add(j)
+                pending.append(j)
+    pruned = [layer for i, layer in enumerate(layers) if i in kept]
+    check_parents(layers, pruned)
+    return pruned
+
+
+def check_parents(layers, pruned):
+    """Every parent a kept layer had in the source composition must still be in the same composition."""
+    before = {l.get("ind") for l in layers if "ind" in l}
+    after = {l.get("ind") for l in pruned if "ind" in l}
+    for layer in pruned:
+        parent = layer.get("parent")
+        if parent in before and parent not in after:
+            raise ValueError(f"layer {layer.get('ind')} lost its parent layer {parent}")
+
+
+def prune_layers(data: dict) -> dict:
+    """Removes invisible layers (top level and precomps) and the assets no remaining layer references."""
+    data = dict(data)
+    ip, op = data.get("ip", 0), data.get("op", float("inf"))
+    data["layers"] = visible_layers(data.get("layers", []), ip, op)
+
+    assets = {a.get("id"): a for a in data.get("assets", [])}
+    used, pending = set(), [data["layers"]]
+    while pending:
+        for layer in pending.pop():
+            ref = layer.get("refId")
+            if ref in assets and ref not in used:
+                used.add(ref)
+                if "layers" in assets[ref]:
+                    pending.append(assets[ref]["layers"])
+
+    kept = []
+    for asset in data.get("assets", []):
+        if asset.get("id") not in used:
+            continue
+        if "layers" in asset:
+            # precomp layers are timed in the precomp's own frame range
+            asset = dict(asset, layers=visible_layers(asset["layers"]))
+        kept.append(asset)
+    data["assets"] = kept
+    if not data.get("markers"):
+        data.pop("markers", None)
+    return data
+
+
+def optimize_lottie(data: dict, precision: int = 3) -> dict:
+    """
+    Compacted copy of a parsed Lottie animation:
+    - floats rounded to `precision` decimals (sub-pixel at the sizes the apps render),
+    - hidden/out-of-range layers (unless used as a parent or matte) and unreferenced assets removed,
+    - expressions that always fall back to the keyframed value removed,
+    - names and other editor metadata stripped (kept when live expressions remain, which look layers up by name).
+    """
+    data = drop_comp_dead_expressions(prune_layers(data))
+    if not has_expressions(data):
+        data = strip_metadata(data)
+    return round_numbers(data, precision)
+
+
+def compact_json(data) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+# Top-level key of a prebuilt .min.json recording what it was built from (popped before it reaches the player)
+BUILD_KEY = "_build"
+
+
+def build_info(source: bytes, precision: int) -> dict:
+    """What a prebuilt .min.json was built from: the source file's SHA-256 and the rounding precision."""
+    return {"source_sha256": hashlib.sha256(source).hexdigest(), "precision": precision}
+
+
+def optimized_path(path: str) -> str:
+    """assets/x.json -> assets/x.min.json (output of the lottie_build.py asset step)."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.min{ext}"
+
+
+def load_optimized_lottie(path: str, precision: int = 3) -> dict:
+    """
+    Parsed, compacted animation for `path`: the prebuilt .min.json when it was built from this exact source
+    at this precision (its build_info; file mtimes are arbitrary after a checkout), otherwise the source
+    optimized in-process.
+    """
+    with open(path, "rb") as file:
+        source = file.read()
+    built = optimized_path(path)
+    if os.path.exists(built):
+        with open(built, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data.pop(BUILD_KEY, None) == build_info(source, precision):
+            return data
+    return optimize_lottie(json.loads(source), precision)
+
+
+# endregion
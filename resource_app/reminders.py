@@ -0,0 +1,202 @@
+# region Chapter 1: Imports
+import argparse
+
+from datetime import datetime, timedelta, time as dtime
+
+import pandas as pd
+from sqlalchemy import text
+
+# Custom Modules
+from resource_app import config as cfg
+from resource_app.functions import get_engine, send_email
+from resource_app.outbox import EmailOutboxWorker, enqueue_email, queued_dedupe_keys
+
+SOURCE = "resource"
+
+# endregion
+
+
+# region Chapter 2: Streaming bookings query
+def iter_bookings_on(day, chunk_size=None):
+    """
+    Yields the bookings of one day in chunks of chunk_size rows (keyset pagination on the booking_date
+    index, whose InnoDB entries end with the primary key id), so memory stays bounded however many bookings
+    the day has.
+    """
+    chunk_size = chunk_size or cfg.REMINDER_CHUNK_SIZE
+    sql = text(
+        """
+        SELECT id, booking_date, start_time, end_time, resource_type, person_name, company_name, email
+        FROM resource_bookings
+        WHERE booking_date = :day AND id > :after_id
+        ORDER BY id
+        LIMIT :limit
+    """
+    )
+    engine = get_engine()
+    after_id = 0
+    while True:
+        with engine.connect() as conn:
+            rows = (
+                conn.execute(
+                    sql, {"day": day, "after_id": after_id, "limit": chunk_size}
+                )
+                .mappings()
+                .all()
+            )
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1]["id"]
+
+
+def to_time(v):
+    """MySQL TIME comes back as timedelta; also accepts time objects and 'HH:MM[:SS]' strings."""
+    if isinstance(v, (pd.Timedelta, timedelta)):
+        total = int(pd.Timedelta(v).total_seconds())
+        return dtime((total // 3600) % 24, (total % 3600) // 60, total % 60)
+    if isinstance(v, dtime):
+        return v
+    parts = [int(p) for p in str(v).split(":")]
+    return dtime(*parts[:3])
+
+
+# endregion
+
+
+# region Chapter 3: Reminder + digest emails
+def reminder_email(row, start):
+    subject = f"Reminder: resource booking on {row['booking_date']} at {start:%H:%M}"
+    body = (
+        f"Hello {row['person_name']},\n\n"
+        f"This is a reminder of your upcoming resource booking.\n\n"
+        f"Date: {row['booking_date']} (YYYY/MM/DD)\n"
+        f"From: {start:%H:%M}\n"
+        f"To: {to_time(row['end_time']):%H:%M}\n"
+        f"Resources Booked: {row['resource_type']}.\n\n"
+        "Need to cancel? Reply to this email."
+        f"\n\nPrimary Contact: {cfg.PRIMARY_CONTACT}\n"
+        f"Secondary Contact: {cfg.SECONDARY_CONTACT}\n"
+    )
+    return subject, body
+
+
+def queue_reminders(now=None, dry_run=False) -> int:
+    """
+    Queues one reminder per booking that starts within the next REMINDER_LEAD_HOURS hours.
+    Safe to run repeatedly (e.g. hourly): each booking is reminded once (outbox dedupe key).
+    """
+    now = now or datetime.now()
+    horizon = now + timedelta(hours=cfg.REMINDER_LEAD_HOURS)
+    engine = get_engine()
+    queued = 0
+
+    day = now.date()
+    while day <= horizon.date():
+        for rows in iter_bookings_on(day):
+            due = []
+            for row in rows:
+                start = to_time(row["start_time"])
+                if now < datetime.combine(day, start) <= horizon and row["email"]:
+                    due.append((f"reminder:{SOURCE}:{row['id']}", row, start))
+            if not due:
+                continue
+
+            with engine.begin() as conn:
+                done = queued_dedupe_keys(conn, [key for key, _, _ in due])
+                for key, row, start in due:
+                    if key in done:
+                        continue
+                    queued += 1
+                    if not dry_run:
+                        subject, body = reminder_email(row, start)
+                        enqueue_email(
+                            conn, SOURCE, row["email"], subject, body, dedupe_key=key
+                        )
+        day += timedelta(days=1)
+    return queued
+
+
+def queue_digest(day=None, dry_run=False) -> int:
+    """
+    Queues one email to the CC list (CC_EMAILS) listing all bookings of `day` (default: tomorrow).
+    Returns the number of bookings in it; nothing is queued for a day without bookings or when CC_EMAILS is
+    empty.
+    """
+    if not cfg.CC_EMAILS:
+        print("digest skipped: CC_EMAILS is empty")
+        return 0
+    day = day or (datetime.now() + timedelta(days=1)).date()
+    key = f"digest:{SOURCE}:{day}"
+    engine = get_engine()
+    with engine.connect() as conn:
+        if queued_dedupe_keys(conn, [key]):
+            return 0
+
+    lines = []
+    for rows in iter_bookings_on(day):
+        for row in rows:
+            lines.append(
+                (
+                    to_time(row["start_time"]),
+                    f"{to_time(row['start_time']):%H:%M}-{to_time(row['end_time']):%H:%M}  "
+                    f"{row['resource_type']}  |  {row['person_name']} ({row['company_name']}), {row['email']}",
+                )
+            )
+    if not lines:
+        return 0
+
+    lines.sort(key=lambda item: item[0])
+    subject = f"Resource bookings for {day} ({len(lines)})"
+    body = (
+        f"Bookings for {day} (YYYY/MM/DD):\n\n"
+        + "\n".join(line for _, line in lines)
+        + f"\n\nTotal: {len(lines)} booking(s)\n"
+    )
+    if not dry_run:
+        to_email, *cc = cfg.CC_EMAILS
+        with engine.begin() as conn:
+            enqueue_email(conn, SOURCE, to_email, subject, body, cc=cc, dedupe_key=key)
+    return len(lines)
+
+
+def deliver_queued():
+    """Sends everything due in the outbox now (for cron runs without a running app worker)."""
+    worker = EmailOutboxWorker(
+        get_engine,
+        lambda to_email, subject, body, cc: send_email(
+            to_email, subject, body, raise_errors=True, cc=cc
+        ),
+        source=SOURCE,
+        batch_size=cfg.OUTBOX_BATCH_SIZE,
+        max_attempts=cfg.OUTBOX_MAX_ATTEMPTS,
+        backoff_base=cfg.OUTBOX_BACKOFF_BASE,
+        backoff_max=cfg.OUTBOX_BACKOFF_MAX,
+    )
+    while worker.drain() == worker.batch_size:
+        pass
+    return worker.stats()
+
+
+# endregion
+
+
+# region Chapter 4: Command line (cron)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Queue 24h booking reminders and tomorrow's digest for the CC list"
+    )
+    parser.add_argument("--no-digest", action="store_true")
+    parser.add_argument("--send", action="store_true", help="deliver queued emails now")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="count, don't queue anything"
+    )
+    args = parser.parse_args()
+
+    print("reminders queued:", queue_reminders(dry_run=args.dry_run))
+    if not args.no_digest:
+        print("digest bookings:", queue_digest(dry_run=args.dry_run))
+    if args.send and not args.dry_run:
+        print("delivery:", deliver_queued())
+
+# endregion
@@ -0,0 +1,402 @@
+# region Chapter 1: Imports
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+from collections import deque
+
+from sqlalchemy import event
+
+# endregion
+
+
+# region Chapter 2: Span recorder
+# Histogram bucket bounds (ms) for the Prometheus export; percentiles use the rolling window instead
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# (rerun start, [span dicts]) for the script thread of the current rerun; unset in worker threads
+_RERUN = contextvars.ContextVar("telemetry_rerun", default=None)
+
+
+class SpanStats:
+    """Counters for one span name: the last `window` durations, cumulative histogram buckets, errors."""
+
+    def __init__(self, window: int):
+        self.recent = deque(maxlen=window)
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = self.errors = 0
+        self.total_ms = self.max_ms = 0.0
+
+    def add(self, ms: float, error: bool):
+        self.recent.append(ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.errors += error
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+
+class Telemetry:
+    """
+    In-process timings of the apps' hot paths (see timed):
+    - every span feeds a rolling window (percentiles) and cumulative histogram buckets per name,
+    - spans on the script thread are also collected per rerun (start_rerun/end_rerun),
+    - end_rerun appends one JSON line per rerun and rewrites a Prometheus textfile (throttled), when configured.
+    Disabled (the default), timed blocks and functions cost one attribute check.
+    """
+
+    def __init__(self, app: str):
+        self.app = app
+        self.enabled = False
+        self.window = 500
+        self.jsonl_path = self.prom_path = None
+        self.export_interval = 15
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._exported_at = 0.0
+
+    def configure(
+        self, enabled, window=500, jsonl_path=None, prom_path=None, export_interval=15
+    ):
+        self.enabled = bool(enabled)
+        self.window = window
+        self.jsonl_path, self.prom_path = jsonl_path, prom_path
+        self.export_interval = export_interval
+
+    def record(self, name: str, ms: float, error: bool = False):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = SpanStats(self.window)
+            stats.add(ms, error)
+        rerun = _RERUN.get()
+        if rerun is not None:
+            started, spans = rerun
+            offset = (time.perf_counter() - started) * 1000 - ms
+            spans.append(
+                {
+                    "span": name,
+                    "start_ms": round(offset, 2),
+                    "ms": round(ms, 2),
+                    "error": error,
+                }
+            )
+
+    # -- per rerun --
+    def start_rerun(self):
+        if self.enabled:
+            _RERUN.set((time.perf_counter(), []))
+
+    def end_rerun(self, page: str = None) -> list:
+        """Records the "rerun" span, exports, and returns this rerun's spans (in completion order)."""
+        rerun = _RERUN.get()
+        if not self.enabled or rerun is None:
+            return []
+        _RERUN.set(None)
+        started, spans = rerun
+        total_ms = (time.perf_counter() - started) * 1000
+        self.record("rerun", total_ms)
+        if self.jsonl_path:
+            self.write_jsonl(
+                {
+                    "ts": time.time(),
+                    "app": self.app,
+                    "page": page,
+                    "total_ms": round(total_ms, 2),
+                    "spans": spans,
+                }
+            )
+        if (
+            self.prom_path
+            and time.monotonic() - self._exported_at > self.export_interval
+        ):
+            self._exported_at = time.monotonic()
+            self.write_prometheus(self.prom_path)
+        return spans
+
+    # -- reports --
+    def summary(self) -> list:
+        """Per span: calls, errors, mean/max overall and p50/p95/p99 over the rolling window (ms)."""
+        rows = []
+        with self._lock:
+            items = [(name, s, sorted(s.recent)) for name, s in self._spans.items()]
+        for name, s, recent in items:
+
+            def pct(q):
+                if not recent:
+                    return None
+                return round(recent[min(len(recent) - 1, int(q * len(recent)))], 2)
+
+            rows.append(
+                {
+                    "span": name,
+                    "calls": s.count,
+                    "errors": s.errors,
+                    "mean_ms": round(s.total_ms / s.count, 2) if s.count else None,
+                    "p50_ms": pct(0.5),
+                    "p95_ms": pct(0.95),
+                    "p99_ms": pct(0.99),
+                    "max_ms": round(s.max_ms, 2),
+                }
+            )
+        return sorted(rows, key=lambda r: -(r["p95_ms"] or 0))
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition: one histogram (seconds) and one error counter per span."""
+        metric = "booking_app_span_seconds"
+        lines = [
+            f"# HELP {metric} Duration of instrumented hot-path calls.",
+            f"# TYPE {metric} histogram",
+        ]
+        errors = [
+            "# HELP booking_app_span_errors_total Instrumented calls that raised.",
+            "# TYPE booking_app_span_errors_total counter",
+        ]
+        with self._lock:
+            items = [
+                (name, list(s.buckets), s.count, s.total_ms, s.errors)
+                for name, s in sorted(self._spans.items())
+            ]
+        for name, buckets, count, total_ms, n_errors in items:
+            labels = f'app="{self.app}",span="{name}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS_MS, buckets):
+                cumulative += n
+                lines.append(
+                    f'{metric}_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}'
+                )
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{metric}_sum{{{labels}}} {total_ms / 1000:.6f}")
+            lines.append(f"{metric}_count{{{labels}}} {count}")
+            errors.append(f"booking_app_span_errors_total{{{labels}}} {n_errors}")
+        return "\n".join(lines + errors) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomic rewrite, for node_exporter's textfile collector."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as file:
+                file.write(self.prometheus_text())
+            os.replace(tmp, path)
+        except OSError as e:
+            print("telemetry prometheus export error:", e)
+
+    def write_jsonl(self, record: dict):
+        try:
+            with self._lock, open(self.jsonl_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print("telemetry jsonl export error:", e)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+
+
+TELEMETRY = Telemetry("resource")
+
+
+class timed:
+    """
+    Times a block (`with timed("name"):`) or every call of a function (`@timed("name")`) into TELEMETRY.
+    Calls that raise are counted as errors.
+    """
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter() if TELEMETRY.enabled else None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start is not None:
+            ms = (time.perf_counter() - self._start) * 1000
+            TELEMETRY.record(self.name, ms, isinstance(exc, Exception))
+        return False
+
+    def __call__(self, fn):
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TELEMETRY.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            error = False
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                TELEMETRY.record(name, (time.perf_counter() - start) * 1000, error)
+
+        return wrapper
+
+
+# endregion
+
+
+# region Chapter 3: SQL query profiler
+# [statement dicts] for the script thread of the current rerun; unset in worker threads
+_QUERIES = contextvars.ContextVar("telemetry_queries", default=None)
+
+
+def value_shape(value) -> str:
+    """Type (and length) of one bound parameter; values themselves are never logged."""
+    name = type(value).__name__
+    if isinstance(value, (str, bytes, list, tuple)):
+        return f"{name}[{len(value)}]"
+    return name
+
+
+def param_shape(parameters, executemany: bool = False):
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {param_shape(rows[0]) if rows else None}"
+    if isinstance(parameters, dict):
+        return {key: value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [value_shape(value) for value in parameters]
+    return value_shape(parameters)
+
+
+class QueryProfiler:
+    """
+    SQLAlchemy cursor-level profiler for the engine from get_engine():
+    - per statement (whitespace-collapsed SQL): calls, total/max time and rows returned,
+    - per rerun: the statements the script thread ran (start_rerun/end_rerun),
+    - slow-query log: statements over slow_ms, or returning more than max_rows rows (unbounded SELECTs),
+      with their parameters' shapes; printed, kept for the admin panel and optionally appended as JSON lines.
+    Attaching is a no-op while disabled.
+    """
+
+    def __init__(self, app: str):
+        self.app = app
+        self.enabled = False
+        self.slow_ms = 200
+        self.max_rows = 50_000
+        self.log_path = None
+        self.slow = deque(maxlen=50)
+        self._lock = threading.Lock()
+        self._statements = {}
+
+    def configure(self, enabled, slow_ms=200, max_rows=50_000, log_path=None):
+        self.enabled = bool(enabled)
+        self.slow_ms, self.max_rows, self.log_path = slow_ms, max_rows, log_path
+
+    def attach(self, engine):
+        if self.enabled and not event.contains(
+            engine, "before_cursor_execute", self._before
+        ):
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+            event.listen(engine, "handle_error", self._failed)
+        return engine
+
+    # -- event hooks --
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        # Rows returned (result sets only): PyMySQL buffers them, so rowcount is exact; -1 when unknown
+        returned = cursor.description is not None and cursor.rowcount >= 0
+        rows = cursor.rowcount if returned else None
+        self.record(statement, parameters, executemany, ms, rows)
+
+    def _failed(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    def record(self, statement, parameters, executemany, ms, rows):
+        key = " ".join(statement.split())
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = {
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                }
+            stats["calls"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["rows"] += rows or 0
+        queries = _QUERIES.get()
+        if queries is not None:
+            queries.append({"statement": key, "ms": round(ms, 2), "rows": rows})
+        if ms > self.slow_ms or (rows or 0) > self.max_rows:
+            self.log_slow(key, param_shape(parameters, executemany), ms, rows)
+
+    def log_slow(self, statement, shape, ms, rows):
+        entry = {
+            "ts": time.time(),
+            "app": self.app,
+            "ms": round(ms, 2),
+            "rows": rows,
+            "statement": statement,
+            "params": shape,
+        }
+        self.slow.append(entry)
+        print(
+            f"slow query ({ms:.0f} ms, {rows} rows): {statement[:200]} params={shape}"
+        )
+        if self.log_path:
+            try:
+                with self._lock, open(self.log_path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(entry) + "\n")
+            except OSError as e:
+                print("slow query log error:", e)
+
+    # -- per rerun --
+    def start_rerun(self):
+        if self.enabled:
+            _QUERIES.set([])
+
+    def end_rerun(self) -> list:
+        """This rerun's statements (in execution order)."""
+        queries = _QUERIES.get()
+        if queries is None:
+            return []
+        _QUERIES.set(None)
+        return queries
+
+    # -- reports --
+    def summary(self) -> list:
+        """Per statement, slowest total first: calls, total/mean/max ms and rows returned."""
+        with self._lock:
+            items = [(key, dict(stats)) for key, stats in self._statements.items()]
+        rows = [
+            {
+                "statement": key,
+                "calls": s["calls"],
+                "total_ms": round(s["total_ms"], 2),
+                "mean_ms": round(s["total_ms"] / s["calls"], 2),
+                "max_ms": round(s["max_ms"], 2),
+                "rows": s["rows"],
+            }
+            for key, s in items
+        ]
+        return sorted(rows, key=lambda r: -r["total_ms"])
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+        self.slow.clear()
+
+
+QUERIES = QueryProfiler("resource")
+
+
+# endregion
@@ -0,0 +1,347 @@
+# sample_data.py
+"""
+Synthetic bookings shaped like production data, for benchmarks and local testing (no MySQL needed).
+- generate_bookings(app, n): a frame as get_bookings' pd.read_sql returns it for that app
+  (DATE -> date objects, TIME -> timedelta64, created_at -> naive datetime64), with
+  years of history, weekday/peak-hour skew, variable durations, repeat bookers,
+  overlapping slots, multi-resource combos from resource_list, payment states and descriptions.
+- seed_database(app, n, url): writes the rows in chunks to <app>_bookings (created if missing) in
+  a local SQLite file, or any SQLAlchemy URL such as a local MySQL stand-in.
+    python sample_data.py --app resource -n 1000000 --url sqlite:///sample_bookings.db
+"""
+import argparse
+import sqlite3
+import time
+
+from itertools import combinations
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+# region Distributions
+CONFERENCE_TYPES = {"I-HUB 1st floor": 0.45, "I-HUB 5th floor": 0.35, "Mendeleev": 0.2}
+AFFILIATIONS = {
+    "conference": {"I-HUB": 0.7, "AIC": 0.3},
+    "resource": {"I-HUB": 0.55, "IISER": 0.3, "Other": 0.15},
+}
+COMPANIES = [
+    "Acme",
+    "Globex",
+    "Initech",
+    "Umbrella",
+    "Hooli",
+    "Stark",
+    "Wayne",
+    "Soylent",
+]
+
+# Start hour (24 h) weights: morning and early-afternoon peaks, a few early/late slots
+START_HOUR_WEIGHTS = {
+    8: 2, 9: 8, 10: 14, 11: 12, 12: 5, 13: 6, 14: 12, 15: 11, 16: 7, 17: 3, 18: 1, 19: 1,
+}  # fmt: skip
+START_MINUTE_WEIGHTS = {0: 0.6, 30: 0.3, 15: 0.05, 45: 0.05}
+# Duration (minutes) weights: mostly 1 h, a long tail up to a full day
+DURATION_WEIGHTS = {
+    30: 0.12,
+    60: 0.4,
+    90: 0.12,
+    120: 0.16,
+    180: 0.09,
+    240: 0.07,
+    480: 0.04,
+}
+WEEKDAY_WEIGHTS = [1, 1, 1, 1, 0.9, 0.15, 0.05]
+# Resources per booking (resource app): 1, 2 or 3+
+COMBO_SIZE_WEIGHTS = {1: 0.7, 2: 0.2, 3: 0.1}
+PAYMENT_WEIGHTS = {"Paid": 0.75, "Pending": 0.15, "Refunded": 0.03, None: 0.07}
+DESCRIPTIONS = [
+    "Team sync", "Client demo", "Interview", "Board meeting", "Workshop", "Investor call",
+    "Weekly review with the mentors and the incubation team, please keep the projector on",
+]  # fmt: skip
+DESCRIPTION_RATE = 0.6
+
+BOOKING_COLUMNS = {
+    "conference": [
+        "id", "booking_date", "start_time", "end_time", "conference_type", "person_name",
+        "company_name", "affiliation", "email", "booking_description", "created_at",
+    ],
+    "resource": [
+        "id", "booking_date", "start_time", "end_time", "resource_type", "person_name",
+        "company_name", "affiliation", "email", "created_at", "payment_status", "payment_id",
+        "payment_date",
+    ],
+}  # fmt: skip
+
+
+def weighted(rng, weights: dict, n: int) -> np.ndarray:
+    keys = list(weights)
+    p = np.array(list(weights.values()), dtype=float)
+    return np.array(keys, dtype=object)[rng.choice(len(keys), n, p=p / p.sum())]
+
+
+# endregion
+
+
+# region Generator
+def booking_days(rng, n, history_days, future_days) -> np.ndarray:
+    """Day offsets from today: weekday-weighted, with volume growing towards the present."""
+    offsets = np.arange(-history_days, future_days + 1)
+    weekday = (np.datetime64(date.today()) + offsets).astype("datetime64[D]")
+    weekday = (weekday.view("int64") - 4) % 7  # 1970-01-01 was a Thursday
+    growth = 0.3 + 0.7 * (offsets + history_days) / max(history_days, 1)
+    # most bookings are made a few days ahead: the near future is busier than later weeks
+    ahead = np.where(offsets > 0, np.exp(-offsets / 14), 1.0)
+    p = np.array(WEEKDAY_WEIGHTS)[weekday] * np.minimum(growth, 1) * ahead
+    return rng.choice(offsets, n, p=p / p.sum())
+
+
+def resource_combos(rng, n, resources) -> np.ndarray:
+    """
+    Comma-joined resource_type values (resources in list order): COMBO_SIZE_WEIGHTS picks how many,
+    earlier resources in the list are more popular.
+    """
+    popularity = 1 / np.arange(1, len(resources) + 1)
+    combos, p = [], []
+    for size, weight in COMBO_SIZE_WEIGHTS.items():
+        if size > len(resources):
+            continue
+        picks = list(combinations(range(len(resources)), size))
+        scores = np.array([popularity[list(pick)].prod() for pick in picks])
+        combos += [", ".join(resources[j] for j in pick) for pick in picks]
+        p += list(weight * scores / scores.sum())
+    p = np.array(p)
+    return np.array(combos, dtype=object)[rng.choice(len(combos), n, p=p / p.sum())]
+
+
+def generate_bookings(
+    app: str,
+    n: int,
+    seed: int = 0,
+    history_days: int = 3 * 365,
+    future_days: int = 60,
+    overlap_rate: float = 0.05,
+    people: int = None,
+    resources=None,
+) -> pd.DataFrame:
+    """
+    n bookings for "conference" or "resource", sorted by created_at (ids increase with it, like AUTO_INCREMENT).
+    - history_days/future_days: date range around today; overlap_rate: share of rows that copy another
+      row's date, slot and room/resources (double bookings from before the conflict check, admin edits).
+    - people: size of the booker pool (default ~n/20); regulars book far more often than most.
+    - resources: resource names for the resource app (default: resource_list from secrets).
+    """
+    rng = np.random.default_rng(seed)
+    day = booking_days(rng, n, history_days, future_days)
+    start_min = weighted(rng, START_HOUR_WEIGHTS, n).astype(int) * 60 + weighted(
+        rng, START_MINUTE_WEIGHTS, n
+    ).astype(int)
+    end_min = np.minimum(
+        start_min + weighted(rng, DURATION_WEIGHTS, n).astype(int), 22 * 60
+    )
+
+    if app == "conference":
+        what = weighted(rng, CONFERENCE_TYPES, n)
+    else:
+        if resources is None:
+            from resource_app import config as rcfg
+
+            resources = rcfg.resource_list
+        what = resource_combos(
+            rng, n, list(resources or ["ResourceA", "ResourceB", "ResourceC"])
+        )
+
+    overlap = np.flatnonzero(rng.random(n) < overlap_rate)
+    source = rng.integers(0, n, overlap.size)
+    day[overlap], what[overlap] = day[source], what[source]
+    start_min[overlap] = start_min[source] + rng.choice([-30, 0, 30], overlap.size)
+    end_min[overlap] = np.maximum(end_min[source], start_min[overlap] + 30)
+
+    people = people or max(n // 20, 10)
+    share = 1 / (np.arange(people) + 5)
+    person = rng.choice(people, n, p=share / share.sum())
+    company = np.array(COMPANIES, dtype=object)[person % len(COMPANIES)]
+
+    today = np.datetime64(date.today(), "D")
+    booking_date = today + day.astype("timedelta64[D]")
+    # booked 0-30 days ahead (mostly a few days), during office hours
+    lead = np.minimum(rng.exponential(4, n), 30).astype("timedelta64[D]")
+    created_at = (booking_date - lead).astype("datetime64[s]") + rng.integers(
+        8 * 3600, 20 * 3600, n
+    ).astype("timedelta64[s]")
+    order = np.argsort(created_at, kind="stable")
+
+    df = pd.DataFrame(
+        {
+            "booking_date": booking_date.astype(object),
+            "start_time": pd.to_timedelta(start_min, unit="m"),
+            "end_time": pd.to_timedelta(end_min, unit="m"),
+            f"{app}_type": what,
+            "person_name": [f"User{p}" for p in person],
+            "company_name": company,
+            "affiliation": weighted(rng, AFFILIATIONS[app], n),
+            "email": [f"user{p}@example.com" for p in person],
+            "created_at": pd.to_datetime(created_at),
+        }
+    )
+    if app == "conference":
+        descriptions = np.array(DESCRIPTIONS + [""], dtype=object)
+        df["booking_description"] = np.where(
+            rng.random(n) < DESCRIPTION_RATE,
+            descriptions[rng.integers(0, len(DESCRIPTIONS), n)],
+            "",
+        )
+    else:
+        # future bookings are mostly unpaid; Paid rows carry a reference and a payment date
+        status = weighted(rng, PAYMENT_WEIGHTS, n)
+        status[(day > 0) & (rng.random(n) < 0.7)] = None
+        paid = status == "Paid"
+        df["payment_status"] = status
+        df["payment_id"] = np.where(
+            paid, [f"pay_{seed}_{i:08d}" for i in range(n)], None
+        )
+        paid_on = created_at.astype("datetime64[D]") + rng.integers(0, 5, n).astype(
+            "timedelta64[D]"
+        )
+        df["payment_date"] = np.where(paid, paid_on.astype(object), None)
+
+    df = df.iloc[order].reset_index(drop=True)
+    df.insert(0, "id", np.arange(1, n + 1))
+    return df[BOOKING_COLUMNS[app]]
+
+
+# endregion
+
+
+# region Database loader
+def hhmmss(values: pd.Series) -> pd.Series:
+    return (pd.Timestamp("1970-01-01") + values).dt.strftime("%H:%M:%S")
+
+
+def make_engine(url: str = "sqlite://", **pool_args):
+    """
+    Engine for a seeded database. SQLite columns declared DATE/TIME come back as date/timedelta
+    objects (like PyMySQL returns them); in-memory SQLite keeps a single shared connection.
+    - pool_args: create_engine pool settings (pool_size, max_overflow, pool_timeout) for file/server databases.
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(url, **pool_args)
+    sqlite3.register_converter(
+        "TIME", lambda b: pd.Timedelta(b.decode()).to_pytimedelta()
+    )
+    in_memory = url in ("sqlite://", "sqlite:///:memory:")
+    return create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "detect_types": sqlite3.PARSE_DECLTYPES,
+        },
+        **({"poolclass": StaticPool} if in_memory else pool_args),
+    )
+
+
+def table_sql(app: str, dialect: str) -> list:
+    """The apps' init_db schema, portable to SQLite."""
+    id_col = (
+        "INT AUTO_INCREMENT PRIMARY KEY"
+        if dialect == "mysql"
+        else "INTEGER PRIMARY KEY"
+    )
+    extra = (
+        "conference_type VARCHAR(100)"
+        if app == "conference"
+        else "resource_type VARCHAR(1000)"
+    )
+    tail = (
+        "booking_description TEXT, created_at TIMESTAMP"
+        if app == "conference"
+        else "created_at TIMESTAMP, payment_status VARCHAR(100), payment_id VARCHAR(100), payment_date DATE"
+    )
+    indexes = (
+        [
+            "CREATE INDEX idx_booking_date_conference_type ON conference_bookings (booking_date, conference_type)",
+            "CREATE INDEX idx_booking_date_id ON conference_bookings (booking_date, id)",
+        ]
+        if app == "conference"
+        else ["CREATE INDEX idx_booking_date ON resource_bookings (booking_date)"]
+    )
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {app}_bookings (
+            id {id_col}, booking_date DATE, start_time TIME, end_time TIME, {extra},
+            person_name VARCHAR(100), company_name VARCHAR(100), affiliation VARCHAR(100),
+            email VARCHAR(100), {tail}
+        )
+        """,
+        *indexes,
+    ]
+
+
+def write_bookings(engine, app: str, df: pd.DataFrame, chunksize: int = 50_000):
+    """Appends df to <app>_bookings (creating it and its index if missing), chunk by chunk."""
+    table = f"{app}_bookings"
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(table):
+            for sql in table_sql(app, engine.dialect.name):
+                conn.execute(text(sql))
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        for start in range(0, len(df), chunksize):
+            chunk = df.iloc[start : start + chunksize]
+            rows = chunk.assign(
+                booking_date=chunk["booking_date"].astype(str),
+                start_time=hhmmss(chunk["start_time"]),
+                end_time=hhmmss(chunk["end_time"]),
+                created_at=chunk["created_at"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+            if "payment_date" in rows:
+                rows["payment_date"] = rows["payment_date"].map(
+                    lambda d: None if d is None else str(d)
+                )
+            rows.to_sql(table, conn, index=False, if_exists="append")
+
+
+def seed_database(app: str, n: int, url: str = "sqlite://", seed: int = 0, **spec):
+    """generate_bookings(app, n, seed, **spec) written to a fresh database at `url`; returns the engine."""
+    engine = make_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {app}_bookings"))
+    write_bookings(engine, app, generate_bookings(app, n, seed, **spec))
+    return engine
+
+
+# endregion
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--app", choices=["conference", "resource"], default="resource")
+    parser.add_argument("-n", type=int, default=1_000_000, help="rows to generate")
+    parser.add_argument("--url", default="sqlite:///sample_bookings.db")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history-days", type=int, default=3 * 365)
+    parser.add_argument("--future-days", type=int, default=60)
+    parser.add_argument("--overlap-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    df = generate_bookings(
+        args.app,
+        args.n,
+        args.seed,
+        history_days=args.history_days,
+        future_days=args.future_days,
+        overlap_rate=args.overlap_rate,
+    )
+    print(
+        f"Generated {len(df):,} {args.app} bookings in {time.perf_counter() - t:.1f} s"
+    )
+    t = time.perf_counter()
+    engine = make_engine(args.url)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {args.app}_bookings"))
+    write_bookings(engine, args.app, df)
+    print(f"Wrote {args.app}_bookings to {args.url} in {time.perf_counter() - t:.1f} s")
@@ -0,0 +1,218 @@
+# smtp_bench.py
+"""
+Email delivery benchmarks against the local SMTP sink (smtp_sink.py), no live SMTP server or MySQL needed.
+1. Session reuse: a new SMTP session per email (old send_email) versus the pooled sessions send_email uses now.
+2. Booking submit path: p50/p95 latency of booking_form's submit (submit_booking: booking lock, conflict check,
+   insert, then the on_booked background cache refresh + worker wake the page runs) with the email sent inline
+   after it (old booking_form) versus queued in email_outbox with the booking, then confirmations/s for the
+   outbox worker to deliver them all (with the sink's injected latency and failures, every confirmation must
+   still arrive).
+Run from the repo root (reads .streamlit/secrets.toml like the apps), e.g.:
+    python smtp_bench.py -n 200 --latency 0.005 --fail-rate 0.05
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from datetime import date, time as dtime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from resource_app import config as cfg
+from resource_app import functions as fn
+from resource_app.cache import BookingsCache
+from resource_app.outbox import EmailOutboxWorker
+from smtp_sink import SMTPSink
+
+# SQLite stand-ins for the MySQL tables add_booking writes (offline runs only)
+OFFLINE_TABLES_SQL = [
+    """
+    CREATE TABLE resource_bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, booking_date DATE, start_time TIME, end_time TIME,
+        resource_type TEXT, person_name TEXT, company_name TEXT, affiliation TEXT, email TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, payment_status TEXT, payment_id TEXT, payment_date DATE
+    )
+    """,
+    """
+    CREATE TABLE email_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL, to_email TEXT NOT NULL, cc_emails TEXT,
+        subject TEXT NOT NULL, body TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending',
+        attempts INT NOT NULL DEFAULT 0, next_attempt_at TIMESTAMP NOT NULL, last_error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, sent_at TIMESTAMP, dedupe_key TEXT UNIQUE
+    )
+    """,
+]
+
+
+def percentiles(seconds) -> str:
+    ms = np.array(seconds) * 1000
+    return f"p50 {np.percentile(ms, 50):7.2f} ms   p95 {np.percentile(ms, 95):7.2f} ms"
+
+
+def send_unpooled(to_email, subject, body):
+    """Old send_email path: connect (+ login) per email, then tear down."""
+    server = fn.open_smtp_connection()
+    try:
+        server.sendmail(cfg.SMTP_USER, [to_email] + cfg.CC_EMAILS, body)
+    finally:
+        server.quit()
+
+
+def send_pooled(to_email, subject, body):
+    fn.send_email(to_email, subject, body, raise_errors=True)
+
+
+def bench_sessions(label, send, n):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        try:
+            send(f"user{i}@example.com", f"Booking confirmation #{i}", "Confirmed.\n")
+        except Exception:
+            pass  # injected failure; counted by the sink
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {n / elapsed:8.1f} emails/s   {percentiles(latencies)}")
+
+
+def offline_engine():
+    sqlite3.register_adapter(dtime, lambda t: t.strftime("%H:%M:%S"))
+    path = os.path.join(tempfile.mkdtemp(prefix="smtp_bench_"), "bench.db")
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    with engine.begin() as conn:
+        for sql in OFFLINE_TABLES_SQL:
+            conn.execute(text(sql))
+    return engine
+
+
+def submit(i, first_day, inline: bool, on_booked):
+    """One valid booking through booking_form's submit path (a free slot per i, from first_day on)."""
+    booking_date = date.today() + timedelta(days=first_day + i // 8)
+    start = dtime(9 + i % 8, 0)
+    email = f"user{i}@example.com"
+    subject = f"Booking confirmation for resource(s) on {booking_date}"
+    body = f"Hello User{i},\n\nYour booking for resources has been confirmed.\n"
+    conflict, details = fn.submit_booking(
+        booking_date, start, dtime(start.hour + 1, 0), ["ResourceA"],
+        f"User{i}", "Acme", "I-HUB", email,
+        confirmation=None if inline else (subject, body), on_booked=on_booked,
+    )  # fmt: skip
+    if conflict:
+        raise RuntimeError(f"submit {i}: unexpected conflict: {details}")
+    if inline:
+        fn.send_email(email, subject, body)
+
+
+def bench_submit_path(n, sink):
+    engine = offline_engine()
+    # the submit path, bookings cache and worker all use the SQLite stand-in
+    fn.get_engine = lambda: engine
+    cache = BookingsCache(
+        lambda: fn.build_bookings_bundle(fn.get_bookings(raise_errors=True)),
+        version_probe=fn.get_bookings_version,
+        namespace="bookings:smtp_bench",
+    )
+    cache.get()
+    worker = EmailOutboxWorker(
+        lambda: engine,
+        lambda to_email, subject, body, cc: fn.send_email(
+            to_email, subject, body, raise_errors=True, cc=cc
+        ),
+        source="resource",
+        poll_interval=0.05,
+        batch_size=cfg.OUTBOX_BATCH_SIZE,
+        max_attempts=cfg.OUTBOX_MAX_ATTEMPTS,
+        backoff_base=0.02,  # compressed backoff so retries fit in the run
+        backoff_max=0.5,
+    )
+
+    def on_booked():
+        # the page's after_booking; the worker is started below, so the wake only sets its event
+        cache.refresh(force=True)
+        worker.wake()
+
+    for label, inline, first_day in (
+        ("inline", True, 1),
+        ("outbox", False, 2 + n // 8),
+    ):
+        fn.get_smtp_pool().close_all()
+        latencies = []
+        for i in range(n):
+            t = time.perf_counter()
+            submit(i, first_day, inline, on_booked)
+            latencies.append(time.perf_counter() - t)
+        print(f"  {label:<10} submit {percentiles(latencies)}")
+
+    received_before = len(sink.messages)
+    start = time.perf_counter()
+    worker.start()
+    while True:
+        with engine.connect() as conn:
+            left = conn.execute(
+                text(
+                    "SELECT COUNT(*) FROM email_outbox WHERE status IN ('pending', 'sending')"
+                )
+            ).scalar()
+        if not left or time.perf_counter() - start > 120:
+            break
+        time.sleep(0.02)
+    elapsed = time.perf_counter() - start
+    worker.stop()
+
+    delivered = len(sink.messages) - received_before
+    print(
+        f"  outbox worker {delivered / elapsed:8.1f} confirmations/s   "
+        f"delivered {delivered}/{n}, retried {worker.retried}, failed {worker.failed}, pending {left}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=200, help="emails / bookings per run")
+    parser.add_argument(
+        "--greeting-delay",
+        type=float,
+        default=0.05,
+        help="seconds per new session, standing in for TCP + TLS + login round trips",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="seconds per SMTP command"
+    )
+    parser.add_argument(
+        "--fail-rate", type=float, default=0.0, help="share of 451 rejections"
+    )
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="share of cut connections"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with SMTPSink(
+        greeting_delay=args.greeting_delay,
+        latency=args.latency,
+        fail_rate=args.fail_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+    ) as sink:
+        # Point the app's SMTP settings at the sink (no TLS locally)
+        cfg.SMTP_HOST, cfg.SMTP_PORT, cfg.SMTP_STARTTLS = sink.host, sink.port, False
+
+        print("Session reuse:")
+        bench_sessions("unpooled", send_unpooled, args.n)
+        connections = sink.connections
+        bench_sessions("pooled", send_pooled, args.n)
+        print(
+            f"  SMTP sessions opened: unpooled {connections}, "
+            f"pooled {sink.connections - connections}"
+        )
+
+        print("Booking submit path:")
+        bench_submit_path(args.n, sink)
+        print(f"Sink: rejected {sink.rejected}, dropped {sink.dropped} (injected)")
+        fn.get_smtp_pool().close_all()
@@ -0,0 +1,183 @@
+# smtp_sink.py
+"""
+Local SMTP stand-in for benchmarks and offline runs: accepts EHLO/AUTH/MAIL/RCPT/DATA on localhost
+and keeps the messages in memory (nothing is delivered). No STARTTLS: set smtp_starttls = false.
+- greeting_delay: seconds before the 220 greeting, to emulate the TCP + TLS + login cost of a real server.
+- latency: seconds before each reply to MAIL/RCPT/DATA (server round trip + processing).
+- fail_rate: share of messages rejected with a temporary 451 error after DATA.
+- drop_rate: share of messages where the connection is cut instead of replying to DATA.
+- seed: makes the injected failures reproducible.
+"""
+import random
+import socketserver
+import threading
+import time
+
+AUTH_LOGIN_PROMPTS = ("VXNlcm5hbWU6", "UGFzc3dvcmQ6")  # base64 "Username:", "Password:"
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode("utf-8"))
+
+    def handle(self):
+        sink = self.server.sink
+        sink.connections += 1
+        if sink.greeting_delay:
+            time.sleep(sink.greeting_delay)
+        self.reply("220 localhost smtp-sink ready")
+        mail_from, rcpt_to = None, []
+
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "AUTH":
+                parts = line.split()
+                if len(parts) > 1 and parts[1].upper() == "LOGIN":
+                    for prompt in AUTH_LOGIN_PROMPTS:
+                        self.reply(f"334 {prompt}")
+                        self.rfile.readline()
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                sink.delay()
+                mail_from, rcpt_to = line[10:].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                sink.delay()
+                rcpt_to.append(line[8:].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    data.append(chunk)
+                sink.delay()
+                outcome = sink.outcome()
+                if outcome == "drop":
+                    sink.dropped += 1
+                    return  # connection cut mid-transaction
+                if outcome == "fail":
+                    sink.rejected += 1
+                    self.reply("451 4.3.0 Temporary failure, try again later")
+                    continue
+                sink.store(mail_from, rcpt_to, b"".join(data))
+                self.reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """In-process SMTP server on 127.0.0.1 (port=0 picks a free port). Use as a context manager."""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        greeting_delay=0.0,
+        latency=0.0,
+        fail_rate=0.0,
+        drop_rate=0.0,
+        seed=None,
+    ):
+        self.greeting_delay = greeting_delay
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self._rng = random.Random(seed)
+        self.messages = []
+        self.connections = self.rejected = self.dropped = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _SMTPHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def outcome(self) -> str:
+        """'ok', 'fail' (451) or 'drop' (connection cut) for the next message."""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.drop_rate:
+            return "drop"
+        if roll < self.drop_rate + self.fail_rate:
+            return "fail"
+        return "ok"
+
+    def store(self, mail_from, rcpt_to, data: bytes):
+        with self._lock:
+            self.messages.append((mail_from, list(rcpt_to), data))
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="smtp-sink", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Local SMTP sink (prints a line per message)"
+    )
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--greeting-delay", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with SMTPSink(
+        port=args.port,
+        greeting_delay=args.greeting_delay,
+        latency=args.latency,
+        fail_rate=args.fail_rate,
+        drop_rate=args.drop_rate,
+    ) as sink:
+        print(f"SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+        seen = 0
+        try:
+            while True:
+                time.sleep(0.5)
+                for mail_from, rcpt_to, _ in sink.messages[seen:]:
+                    print(f"message from {mail_from} to {', '.join(rcpt_to)}")
+                seen = len(sink.messages)
+        except KeyboardInterrupt:
+            pass
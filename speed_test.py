@@ -1,64 +1,280 @@
 # speed_test.py
+"""
+Benchmark suite for the data path of both apps, on synthetic bookings from sample_data.py (no MySQL or network needed).
+- Cases: get_bookings post-processing (normalize_bookings) and the whole read (against SQLite), check_conflict,
+  fractional_hours, both timeline builders, the table/display preparation and the table as st.dataframe
+  serializes it (Arrow IPC bytes).
+- Each case runs at every size (default 100 .. 100k rows): median and p95 wall time, then peak traced memory
+  (tracemalloc) in a separate run so tracing doesn't skew the timings. Cases returning a figure (the timelines)
+  also report its payload: the plotly.io.to_json size Streamlit ships over the websocket.
+- --json writes the results; --baseline compares medians, peak memory and figure payloads against an earlier
+  --json file and exits 1 on regressions beyond --tolerance. --profile <case> writes speed_test.prof for that case at the largest size.
+Run from the repo root (reads .streamlit/secrets.toml like the apps). The full default run takes ~10 min,
+mostly seeding and reading the 100k-row SQLite databases; use --sizes/--cases for quick checks, e.g.:
+    python speed_test.py --json speed_test.baseline.json
+    python speed_test.py --sizes 100,10000 --cases timeline --baseline speed_test.baseline.json
+"""
+import argparse
 import cProfile
-import pstats
 import io
+import json
+import platform
+import pstats
+import time
+import tracemalloc
+
+from datetime import date, datetime, time as dtime, timedelta
+
+import numpy as np
 import pandas as pd
-from datetime import datetime, time, date, timedelta
-
-
-from resource_app.functions import build_vertical_day_time_timeline
-
-
-def make_sample_df(n=200):
-    """Creates a small synthetic dataframe matching get_bookings() output shape."""
-    rows = []
-    base_date = date.today()
-    for i in range(n):
-        booking_date = base_date + timedelta(days=(i % 28))
-        start = time(9 + (i % 8), 0, 0)  # 9:00..16:00
-        end = time((start.hour + 1) % 24, 0, 0)
-        resource_type = "ResourceA, ResourceB" if i % 3 == 0 else "ResourceA"
-        rows.append(
-            {
-                "id": i + 1,
-                "booking_date": booking_date,
-                "start_time": start.strftime("%H:%M:%S"),
-                "end_time": end.strftime("%H:%M:%S"),
-                "resource_type": resource_type,
-                "person_name": f"User{i}",
-                "company_name": "Acme",
-                "affiliation": "I-HUB",
-                "email": f"user{i}@example.com",
-                "created_at": pd.Timestamp.utcnow(),
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from streamlit import dataframe_util
+
+from conference_app import functions as cfn
+from resource_app import functions as rfn
+from sample_data import generate_bookings, make_engine, write_bookings
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+
+
+# region Cases: setup(n) -> zero-argument callable timed by the runner
+def case_normalize(fn, app):
+    def setup(n):
+        raw = generate_bookings(app, n)
+        return lambda: fn.normalize_bookings(raw.copy())
+
+    return setup
+
+
+def case_get_bookings(fn, app):
+    """read_sql (Arrow-backed) + normalize_bookings against SQLite."""
+
+    def setup(n):
+        engine = make_engine()
+        write_bookings(engine, app, generate_bookings(app, n))
+        fn.get_engine = lambda: engine
+        return lambda: fn.get_bookings(raise_errors=True)
+
+    return setup
+
+
+def case_check_conflict(fn, app):
+    def setup(n):
+        engine = make_engine()
+        write_bookings(engine, app, generate_bookings(app, n))
+        fn.get_engine = lambda: engine
+        day = date.today() + timedelta(days=3)
+        what = "Mendeleev" if app == "conference" else ["ResourceA", "ResourceC"]
+        return lambda: fn.check_conflict(day, dtime(12, 30), dtime(13, 0), what)
+
+    return setup
+
+
+def case_fractional_hours(fn, app):
+    def setup(n):
+        times = fn.normalize_bookings(generate_bookings(app, n))["start_time"]
+        return lambda: fn.fractional_hours(times)
+
+    return setup
+
+
+def app_frame(app: str, n: int) -> pd.DataFrame:
+    """The frame each app caches: the typed get_bookings() frame."""
+    return (cfn if app == "conference" else rfn).normalize_bookings(
+        generate_bookings(app, n)
+    )
+
+
+def case_timeline(fn, app):
+    def setup(n):
+        df = app_frame(app, n)
+        return lambda: fn.build_vertical_day_time_timeline(df)[0]
+
+    return setup
+
+
+def case_display(app):
+    def setup(n):
+        df = app_frame(app, n)
+        if app == "conference":
+            return lambda: cfn.bookings_table(df)
+        index = rfn.build_resource_index(df["resource_type"])
+        selected = list(index.columns[:2])
+        return lambda: rfn.bookings_table(rfn.filter_by_resources(df, index, selected))
+
+    return setup
+
+
+def case_st_dataframe(app):
+    """The display table serialized the way st.dataframe does (Arrow tables as is, anything else via pandas)."""
+
+    def setup(n):
+        table = case_display(app)(n)
+        return lambda: dataframe_util.convert_anything_to_arrow_bytes(table())
+
+    return setup
+
+
+CASES = {}
+for _app, _fn in (("conference", cfn), ("resource", rfn)):
+    CASES[f"{_app}.normalize_bookings"] = case_normalize(_fn, _app)
+    CASES[f"{_app}.get_bookings"] = case_get_bookings(_fn, _app)
+    CASES[f"{_app}.check_conflict"] = case_check_conflict(_fn, _app)
+    CASES[f"{_app}.fractional_hours"] = case_fractional_hours(_fn, _app)
+    CASES[f"{_app}.timeline"] = case_timeline(_fn, _app)
+    CASES[f"{_app}.display"] = case_display(_app)
+    CASES[f"{_app}.st_dataframe"] = case_st_dataframe(_app)
+
+# endregion
+
+
+# region Runner
+def time_case(run, repeat: int, budget: float) -> list:
+    """Wall times (s): at least 3 runs, up to `repeat`, stopping early once `budget` seconds are spent."""
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeat:
+        t = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t)
+        if len(times) >= 3 and time.perf_counter() - start > budget:
+            break
+    return times
+
+
+def figure_payload_bytes(output):
+    """Size of the figure JSON as Streamlit ships it over the websocket (plotly.io.to_json); None if no figure."""
+    if not isinstance(output, go.Figure):
+        return None
+    return len(pio.to_json(output, validate=False).encode("utf-8"))
+
+
+def peak_memory(run) -> int:
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(cases, sizes, repeat, budget) -> list:
+    results = []
+    for name in cases:
+        for n in sizes:
+            run = CASES[name](n)
+            output = run()  # warm-up (imports, first-call caches)
+            times = np.array(time_case(run, repeat, budget)) * 1000
+            result = {
+                "case": name,
+                "rows": n,
+                "runs": len(times),
+                "median_ms": round(float(np.median(times)), 3),
+                "p95_ms": round(float(np.percentile(times, 95)), 3),
+                "peak_mib": round(peak_memory(run) / 2**20, 2),
+                "payload_bytes": figure_payload_bytes(output),
             }
-        )
-    return pd.DataFrame(rows)
+            results.append(result)
+            payload = result["payload_bytes"]
+            print(
+                f"{name:<36} {n:>7} rows  median {result['median_ms']:10.2f} ms  "
+                f"p95 {result['p95_ms']:10.2f} ms  peak {result['peak_mib']:8.2f} MiB"
+                + (
+                    f"  payload {payload / 1024:8.1f} KiB"
+                    if payload is not None
+                    else ""
+                )
+            )
+    return results
 
 
-def main():
-    # Builds synthetic data (avoid DB/network)
-    df = make_sample_df(500)  # adjust size to stress-test vs keep quick
+def compare(results, baseline, tolerance) -> list:
+    """Regressions against a baseline report: slower median, higher peak memory or larger figure payload beyond tolerance."""
+    before = {(r["case"], r["rows"]): r for r in baseline["results"]}
+    problems = []
+    for r in results:
+        b = before.get((r["case"], r["rows"]))
+        if b is None:
+            continue
+        if r["median_ms"] > b["median_ms"] * (1 + tolerance) and r["median_ms"] > 1:
+            problems.append(
+                f"{r['case']} @ {r['rows']}: median {r['median_ms']:.2f} ms vs {b['median_ms']:.2f} ms"
+            )
+        if r["peak_mib"] > b["peak_mib"] * (1 + tolerance) and r["peak_mib"] > 1:
+            problems.append(
+                f"{r['case']} @ {r['rows']}: peak {r['peak_mib']:.2f} MiB vs {b['peak_mib']:.2f} MiB"
+            )
+        now, then = r.get("payload_bytes"), b.get("payload_bytes")
+        if now is not None and then is not None and now > then * (1 + tolerance):
+            problems.append(
+                f"{r['case']} @ {r['rows']}: payload {now / 1024:.1f} KiB vs {then / 1024:.1f} KiB"
+            )
+    return problems
 
-    # Profiles the call
+
+def profile_case(name, n):
+    """cProfile of one case (replaces the old single-function speed_test run)."""
+    run = CASES[name](n)
     profiler = cProfile.Profile()
     profiler.enable()
-
-    # Calls the function under test:
-    fig, info = build_vertical_day_time_timeline(df)
-
+    run()
     profiler.disable()
 
-    # Print stats to stdout
     s = io.StringIO()
-    ps = pstats.Stats(profiler, stream=s).strip_dirs().sort_stats("cumtime")
-    ps.print_stats(40)  # show top 40 lines
+    pstats.Stats(profiler, stream=s).strip_dirs().sort_stats("cumtime").print_stats(40)
     print(s.getvalue())
-
-    # Save binary .prof file for GUI viewers
     profiler.dump_stats("speed_test.prof")
-    print("Wrote speed_test.prof (open with snakeviz or pstats).")
-    print("Returned info summary:", info)
+    print(
+        f"Wrote speed_test.prof for {name} @ {n} rows (open with snakeviz or pstats)."
+    )
+
+
+# endregion
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="comma-separated row counts",
+    )
+    parser.add_argument(
+        "--cases", default="", help="only cases whose name contains this text"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="max timed runs")
+    parser.add_argument(
+        "--budget", type=float, default=3.0, help="seconds per case and size"
+    )
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier --json file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--profile", help="cProfile this case at the largest size")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    if args.profile:
+        profile_case(args.profile, max(sizes))
+        raise SystemExit(0)
+
+    cases = [name for name in CASES if args.cases in name]
+    results = run_suite(cases, sizes, args.repeat, args.budget)
+
+    if args.json:
+        report = {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            problems = compare(results, json.load(file), args.tolerance)
+        for problem in problems:
+            print("REGRESSION", problem)
+        raise SystemExit(1 if problems else 0)